@@ -1,11 +1,30 @@
 from pyrogram import Client, filters
 from pyrogram.types import InlineKeyboardMarkup, InlineKeyboardButton
-import os, json, time, shutil
+import os, json, time, math, shutil, asyncio
 from datetime import datetime
 
+from Youtube.workers import pool_status_text
+from Youtube.cache import cache_status_text
+from Youtube.scheduler import scheduler_status_text
+from Youtube.singleflight import flight_status_text
+from Youtube.fileid_cache import fileid_status_text
+from Youtube.storage import storage_status_text
+from Youtube.transcode import ffmpeg_status_text
+from Youtube.downloader import downloader_status_text
+from Youtube.journal import journal_status_text
+from Youtube.watchdog import watchdog_status_text
+from Youtube.throttle import throttle_status_text
+from Youtube.negative_cache import negative_status_text
+from Youtube.user_store import UserStore
+from Youtube.config_store import ConfigStore
+from Youtube.blocklist import Blocklist, parse_target, RULE_USERNAME, RULE_RANGE
+from Youtube.ratelimit import TokenBucketLimiter, ACTIONS, ACTION_LINK, ACTION_DOWNLOAD
+from Youtube.config import Config
+
 # ====== Paths & constants ======
 DATA_DIR = "data"
 USERS_FILE = os.path.join(DATA_DIR, "users.json")
+USERS_DB = os.path.join(DATA_DIR, "users.db")
 SERVICES_FILE = os.path.join(DATA_DIR, "services.json")
 CONFIG_FILE = os.path.join(DATA_DIR, "config.json")
 LOG_FILE = os.path.join(DATA_DIR, "logs.txt")
@@ -17,6 +36,14 @@ ADMINS = [2136583087]
 os.makedirs(DATA_DIR, exist_ok=True)
 os.makedirs(BACKUP_DIR, exist_ok=True)
 
+# Users SQLite me (pehli baar purani users.json migrate ho jati hai)
+USERS = UserStore(USERS_DB, legacy_json=USERS_FILE)
+# Blocked ids / usernames / id ranges memory me (hot path = set lookup)
+BLOCKLIST = Blocklist(USERS)
+
+# Roles + custom messages memory me (disk pe sirf change hone par)
+CONFIG = ConfigStore(CONFIG_FILE, ADMINS)
+
 
 # ====== Generic helpers ======
 def load_json(path, default):
@@ -40,37 +67,16 @@ def now_str():
 
 # ====== Config & roles ======
 def get_config():
-    cfg = load_json(CONFIG_FILE, {})
-    if "roles" not in cfg:
-        cfg["roles"] = {}
-    if "messages" not in cfg:
-        cfg["messages"] = {}
-    save_config(cfg)
-    return cfg
-
-
-def save_config(cfg):
-    save_json(CONFIG_FILE, cfg)
+    """config.json ka current snapshot (read-only copy)."""
+    return CONFIG.snapshot()
 
 
 def get_role(user_id: int) -> str:
-    uid = str(user_id)
-    cfg = get_config()
-    roles = cfg.get("roles", {})
-    if user_id in ADMINS or uid in [str(x) for x in ADMINS]:
-        return "owner"
-    return roles.get(uid, "none")
+    return CONFIG.role(user_id)
 
 
 def set_role(user_id: int, role: str):
-    uid = str(user_id)
-    cfg = get_config()
-    roles = cfg.setdefault("roles", {})
-    if role == "none":
-        roles.pop(uid, None)
-    else:
-        roles[uid] = role
-    save_config(cfg)
+    CONFIG.set_role(user_id, role)
 
 
 def is_admin_id(user_id: int) -> bool:
@@ -97,78 +103,71 @@ admin_cq_only = filters.create(admin_cq_filter)
 
 
 # ====== Users ======
-def load_users():
-    return load_json(USERS_FILE, {})
-
-
-def save_users(data):
-    save_json(USERS_FILE, data)
-
-
 def register_user(user):
     if user is None:
         return
-    data = load_users()
-    uid = str(user.id)
-    if uid not in data:
-        data[uid] = {
-            "first_name": user.first_name or "",
-            "last_name": user.last_name or "",
-            "username": user.username or "",
-            "language": getattr(user, "language_code", "") or "",
-            "joined_at": now_str(),
-            "last_active": now_str(),
-            "total_downloads": 0,
-            "total_mb": 0,
-            "blocked": False,
-        }
-    else:
-        data[uid]["last_active"] = now_str()
-        data[uid]["first_name"] = user.first_name or ""
-        data[uid]["last_name"] = user.last_name or ""
-        data[uid]["username"] = user.username or ""
-    save_users(data)
+    USERS.register(
+        user.id,
+        first_name=user.first_name or "",
+        last_name=user.last_name or "",
+        username=user.username or "",
+        language=getattr(user, "language_code", "") or "",
+    )
 
 
 def add_download_stat(user_id: int, file_size_bytes: int):
-    data = load_users()
-    uid = str(user_id)
-    if uid not in data:
-        data[uid] = {
-            "first_name": "",
-            "last_name": "",
-            "username": "",
-            "language": "",
-            "joined_at": now_str(),
-            "last_active": now_str(),
-            "total_downloads": 0,
-            "total_mb": 0,
-            "blocked": False,
-        }
-    data[uid]["total_downloads"] += 1
-    data[uid]["total_mb"] += round(file_size_bytes / (1024 * 1024))
-    data[uid]["last_active"] = now_str()
-    save_users(data)
-
-
-def is_blocked(user_id: int) -> bool:
-    data = load_users()
-    return data.get(str(user_id), {}).get("blocked", False)
-
-
-# simple in-memory rate limit
-RATE_LIMIT = {}
-MAX_REQ_PER_MIN = 10
-WINDOW_SEC = 60
-
-
-def is_rate_limited(user_id: int) -> bool:
-    now = time.time()
-    lst = RATE_LIMIT.get(user_id, [])
-    lst = [t for t in lst if now - t < WINDOW_SEC]
-    lst.append(now)
-    RATE_LIMIT[user_id] = lst
-    return len(lst) > MAX_REQ_PER_MIN
+    USERS.add_download(user_id, round(file_size_bytes / (1024 * 1024)))
+
+
+def is_blocked(user_id: int, username: str = None) -> bool:
+    return BLOCKLIST.is_blocked(user_id, username)
+
+
+# ====== Rate limit (token bucket, per action + role) ======
+ROLES = ("none", "mod", "admin", "owner")
+
+# requests / minute – 0 = unlimited. config.json ke "rate_limits" se override.
+RATE_DEFAULTS = {
+    ACTION_LINK: {"none": Config.RATE_LINK_PER_MIN, "mod": Config.RATE_LINK_PER_MIN * 3, "admin": 0, "owner": 0},
+    ACTION_DOWNLOAD: {"none": Config.RATE_DOWNLOAD_PER_MIN, "mod": Config.RATE_DOWNLOAD_PER_MIN * 3, "admin": 0, "owner": 0},
+}
+
+
+def rate_limit_for(action: str, role: str) -> int:
+    custom = CONFIG.get("rate_limits", {}).get(action, {})
+    if role in custom:
+        return custom[role]
+    defaults = RATE_DEFAULTS.get(action, RATE_DEFAULTS[ACTION_LINK])
+    return defaults.get(role, defaults["none"])
+
+
+def set_rate_limit(action: str, role: str, per_min: int):
+    limits = {a: dict(r) for a, r in CONFIG.get("rate_limits", {}).items()}
+    limits.setdefault(action, {})[role] = int(per_min)
+    CONFIG.set("rate_limits", limits)
+
+
+RATE_LIMITER = TokenBucketLimiter(rate_limit_for)
+
+
+def is_rate_limited(user_id: int, action: str = ACTION_LINK) -> bool:
+    return not RATE_LIMITER.allow(user_id, action, get_role(user_id))
+
+
+def rate_limit_wait(user_id: int, action: str = ACTION_LINK) -> int:
+    """Agla request kitne sec baad allowed (deny message ke liye, min 1)."""
+    return max(1, math.ceil(RATE_LIMITER.retry_after(user_id, action, get_role(user_id))))
+
+
+def rate_limits_text() -> str:
+    lines = []
+    for action in ACTIONS:
+        parts = []
+        for role in ROLES:
+            per_min = rate_limit_for(action, role)
+            parts.append(f"{role} `{per_min or '∞'}`")
+        lines.append(f"• {action}: " + ", ".join(parts) + " /min\n")
+    return "".join(lines)
 
 
 # ====== Services ======
@@ -182,16 +181,11 @@ def save_services(data):
 
 # ====== Messages helpers ======
 def get_message(key: str, default: str) -> str:
-    cfg = get_config()
-    msgs = cfg.setdefault("messages", {})
-    return msgs.get(key, default)
+    return CONFIG.message(key, default)
 
 
 def set_message(key: str, value: str):
-    cfg = get_config()
-    msgs = cfg.setdefault("messages", {})
-    msgs[key] = value
-    save_config(cfg)
+    CONFIG.set_message(key, value)
 
 
 # ====== Admin panel keyboard helpers ======
@@ -229,8 +223,7 @@ async def edit_admin_panel(message_obj, text: str):
 
 @Client.on_message(filters.command("admins") & admin_only)
 async def cmd_admins(client, message):
-    cfg = get_config()
-    roles = cfg.get("roles", {})
+    roles = CONFIG.roles()
     text = "🛡 **Admins & Mods**\n\n"
     text += "Owner(s):\n"
     for x in ADMINS:
@@ -282,11 +275,9 @@ async def cmd_removeadmin(client, message):
 
 @Client.on_message(filters.command("users") & admin_only)
 async def cmd_users(client, message):
-    data = load_users()
-    total = len(data)
-    blocked = sum(1 for u in data.values() if u.get("blocked"))
-    total_downloads = sum(u.get("total_downloads", 0) for u in data.values())
-    total_mb = sum(u.get("total_mb", 0) for u in data.values())
+    t = USERS.totals()
+    total, blocked = t["users"], t["blocked"]
+    total_downloads, total_mb = t["downloads"], t["mb"]
     text = (
         "👥 **Users Stats**\n\n"
         f"• Total Users: `{total}`\n"
@@ -317,23 +308,31 @@ def format_user(uid, info):
 
 @Client.on_message(filters.command("user") & admin_only)
 async def cmd_user(client, message):
-    data = load_users()
     if len(message.command) > 1:
         uid = message.command[1]
     elif message.reply_to_message and message.reply_to_message.from_user:
         uid = str(message.reply_to_message.from_user.id)
     else:
         return await message.reply("Use: `/user user_id` ya reply karke `/user` likho.")
-    if uid not in data:
+    # `/user @username` bhi chalega (indexed lookup)
+    if uid.startswith("@"):
+        found = USERS.find_username(uid)
+        uid, info = (str(found[0]), found[1]) if found else (uid, None)
+    else:
+        info = USERS.get(uid) if uid.lstrip("-").isdigit() else None
+    if info is None:
         return await message.reply("❌ User record nahi mila.")
-    await message.reply(format_user(uid, data[uid]))
+    await message.reply(format_user(uid, info))
 
 
 @Client.on_message(filters.command("export_users") & admin_only)
 async def cmd_export_users(client, message):
-    if not os.path.exists(USERS_FILE):
-        return await message.reply("Users file nahi mili.")
-    await message.reply_document(USERS_FILE, caption="📁 users.json")
+    # DB se wahi purana users.json shape (thread me – bada ho sakta hai)
+    export_path = os.path.join(DATA_DIR, "users_export.json")
+    count = await asyncio.to_thread(USERS.export_json, export_path)
+    if not count:
+        return await message.reply("Abhi koi user record nahi hai.")
+    await message.reply_document(export_path, file_name="users.json", caption="📁 users.json")
 
 
 # services
@@ -390,60 +389,123 @@ async def cmd_delservice(client, message):
 
 @Client.on_message(filters.command("stats") & admin_only)
 async def cmd_stats(client, message):
-    users = load_users()
-    total = len(users)
-    today = datetime.now().strftime("%Y-%m-%d")
-    today_new = sum(1 for u in users.values() if u.get("joined_at", "").startswith(today))
-    total_downloads = sum(u.get("total_downloads", 0) for u in users.values())
-    total_mb = sum(u.get("total_mb", 0) for u in users.values())
+    t = USERS.totals()
+    total, today_new = t["users"], t["joined_today"]
+    total_downloads, total_mb = t["downloads"], t["mb"]
     text = (
         "📊 **Bot Stats**\n\n"
         f"• Total Users: `{total}`\n"
         f"• New Today: `{today_new}`\n"
         f"• Total Downloads: `{total_downloads}`\n"
+        f"• Downloads Today: `{t['downloads_today']}` (`{t['mb_today']}` MB)\n"
         f"• Total Data: `{total_mb}` MB\n"
     )
     await message.reply(text)
 
 
+@Client.on_message(filters.command("rebuildstats") & filters.user(ADMINS))
+async def cmd_rebuildstats(client, message):
+    m = await message.reply("🔄 Stats counters dobara gin rahe hain...")
+    before = USERS.totals()
+    after = await asyncio.to_thread(USERS.rebuild_stats)
+    changed = [
+        f"• {k}: `{before[k]}` → `{after[k]}`"
+        for k in ("users", "blocked", "downloads", "mb", "joined_today")
+        if before[k] != after[k]
+    ]
+    await m.edit(
+        "✅ **Stats rebuilt.**\n\n"
+        + ("\n".join(changed) if changed else "Sab counters pehle se sahi the.")
+    )
+
+
 @Client.on_message(filters.command("topusers") & admin_only)
 async def cmd_topusers(client, message):
-    users = load_users()
-    ranked = sorted(users.items(), key=lambda kv: kv[1].get("total_downloads", 0), reverse=True)[:10]
+    ranked = USERS.top(10)
     if not ranked:
         return await message.reply("No data.")
     text = "🏆 **Top Users (Downloads)**\n\n"
-    for uid, info in ranked:
-        text += f"• `{uid}` → {info.get('total_downloads', 0)} downloads\n"
+    for uid, downloads in ranked:
+        text += f"• `{uid}` → {downloads} downloads\n"
     await message.reply(text)
 
 
 # security block/unblock
 
+BLOCK_USAGE = "Use: `/{cmd} user_id` ya `/{cmd} @username` ya `/{cmd} 100-200` (id range)"
+
+
 @Client.on_message(filters.command("block") & admin_only)
 async def cmd_block(client, message):
     if len(message.command) < 2:
-        return await message.reply("Use: /block user_id")
-    uid = message.command[1]
-    data = load_users()
-    if uid not in data:
+        return await message.reply(BLOCK_USAGE.format(cmd="block"))
+    try:
+        kind, target = parse_target(message.command[1])
+    except ValueError:
+        return await message.reply(BLOCK_USAGE.format(cmd="block"))
+    if kind == RULE_USERNAME:
+        BLOCKLIST.block_username(target)
+        return await message.reply(f"🚫 Username `@{target}` blocked.")
+    if kind == RULE_RANGE:
+        BLOCKLIST.block_range(*target)
+        return await message.reply(f"🚫 User ids `{target[0]}`–`{target[1]}` blocked.")
+    if not BLOCKLIST.block_id(target):
         return await message.reply("User record nahi mila.")
-    data[uid]["blocked"] = True
-    save_users(data)
-    await message.reply(f"🚫 User `{uid}` blocked.")
+    await message.reply(f"🚫 User `{target}` blocked.")
 
 
 @Client.on_message(filters.command("unblock") & admin_only)
 async def cmd_unblock(client, message):
     if len(message.command) < 2:
-        return await message.reply("Use: /unblock user_id")
-    uid = message.command[1]
-    data = load_users()
-    if uid not in data:
+        return await message.reply(BLOCK_USAGE.format(cmd="unblock"))
+    try:
+        kind, target = parse_target(message.command[1])
+    except ValueError:
+        return await message.reply(BLOCK_USAGE.format(cmd="unblock"))
+    if kind == RULE_USERNAME:
+        if not BLOCKLIST.unblock_username(target):
+            return await message.reply("Ye username blocklist me nahi hai.")
+        return await message.reply(f"✅ Username `@{target}` unblocked.")
+    if kind == RULE_RANGE:
+        if not BLOCKLIST.unblock_range(*target):
+            return await message.reply("Ye id range blocklist me nahi hai.")
+        return await message.reply(f"✅ User ids `{target[0]}`–`{target[1]}` unblocked.")
+    if not BLOCKLIST.unblock_id(target):
         return await message.reply("User record nahi mila.")
-    data[uid]["blocked"] = False
-    save_users(data)
-    await message.reply(f"✅ User `{uid}` unblocked.")
+    await message.reply(f"✅ User `{target}` unblocked.")
+
+
+# rate limits
+
+@Client.on_message(filters.command("limits") & admin_only)
+async def cmd_limits(client, message):
+    r = RATE_LIMITER.stats()
+    await message.reply(
+        "📏 **Rate Limits**\n\n"
+        + rate_limits_text()
+        + f"\nActive buckets: `{r['active']}`, denied `{r['denied']}`, evicted `{r['evicted']}`"
+    )
+
+
+@Client.on_message(filters.command("setlimit") & filters.user(ADMINS))
+async def cmd_setlimit(client, message):
+    usage = (
+        "Use: `/setlimit <link|download> <none|mod|admin> <per_min>`\n"
+        "Example: `/setlimit link none 15` (0 = unlimited)"
+    )
+    if len(message.command) < 4:
+        return await message.reply(usage)
+    action, role = message.command[1].lower(), message.command[2].lower()
+    if action not in ACTIONS or role not in ROLES or role == "owner":
+        return await message.reply(usage)
+    try:
+        per_min = int(message.command[3])
+        if per_min < 0:
+            raise ValueError
+    except ValueError:
+        return await message.reply(usage)
+    set_rate_limit(action, role, per_min)
+    await message.reply(f"✅ `{action}` limit for `{role}`: `{per_min or '∞'}` / min")
 
 
 # debug / tools
@@ -458,11 +520,23 @@ async def cmd_ping(client, message):
 
 @Client.on_message(filters.command("server") & admin_only)
 async def cmd_server(client, message):
-    total_users = len(load_users())
+    total_users = USERS.count()
     text = (
         "🖥 **Server Info (basic)**\n\n"
         f"• Tracked users: `{total_users}`\n"
         f"• Time: `{now_str()}`\n"
+        + scheduler_status_text()
+        + throttle_status_text()
+        + flight_status_text()
+        + fileid_status_text()
+        + storage_status_text()
+        + pool_status_text()
+        + downloader_status_text()
+        + journal_status_text()
+        + watchdog_status_text()
+        + ffmpeg_status_text()
+        + cache_status_text()
+        + negative_status_text()
     )
     await message.reply(text)
 
@@ -496,7 +570,8 @@ async def cmd_backupnow(client, message):
     ts = datetime.now().strftime("%Y%m%d_%H%M%S")
     folder_name = os.path.join(BACKUP_DIR, f"backup_{ts}")
     os.makedirs(folder_name, exist_ok=True)
-    for f in [USERS_FILE, SERVICES_FILE, CONFIG_FILE, LOG_FILE]:
+    await asyncio.to_thread(USERS.backup, os.path.join(folder_name, "users.db"))
+    for f in [SERVICES_FILE, CONFIG_FILE, LOG_FILE]:
         if os.path.exists(f):
             shutil.copy(f, folder_name)
     zip_path = folder_name + ".zip"
@@ -524,20 +599,18 @@ async def cmd_admin_panel(client, message):
 # 📊 Dashboard
 @Client.on_callback_query(filters.regex("^adm_dash$") & admin_cq_only)
 async def cb_adm_dash(client, cq):
-    users = load_users()
-    total = len(users)
-    today = datetime.now().strftime("%Y-%m-%d")
-    today_new = sum(1 for u in users.values() if u.get("joined_at", "").startswith(today))
-    total_downloads = sum(u.get("total_downloads", 0) for u in users.values())
-    total_mb = sum(u.get("total_mb", 0) for u in users.values())
+    t = USERS.totals()
+    total, today_new = t["users"], t["joined_today"]
+    total_downloads, total_mb = t["downloads"], t["mb"]
 
     text = (
         "🛡 **ADMIN CONTROL SYSTEM – Dashboard**\n\n"
         f"👥 Total Users: `{total}`\n"
         f"🆕 New Today: `{today_new}`\n"
-        f"⬇️ Total Downloads: `{total_downloads}`\n"
+        f"⬇️ Total Downloads: `{total_downloads}` (today `{t['downloads_today']}`)\n"
         f"📦 Total Data: `{total_mb}` MB\n\n"
-        "ℹ️ Detailed stats ke liye: `/stats` use karo."
+        "ℹ️ Detailed stats ke liye: `/stats` use karo.\n"
+        "Counters galat lagen to: `/rebuildstats` (owner)."
     )
     await edit_admin_panel(cq.message, text)
 
@@ -545,11 +618,9 @@ async def cb_adm_dash(client, cq):
 # 👥 Users
 @Client.on_callback_query(filters.regex("^adm_users$") & admin_cq_only)
 async def cb_adm_users(client, cq):
-    users = load_users()
-    total = len(users)
-    blocked = sum(1 for u in users.values() if u.get("blocked"))
-    total_downloads = sum(u.get("total_downloads", 0) for u in users.values())
-    total_mb = sum(u.get("total_mb", 0) for u in users.values())
+    t = USERS.totals()
+    total, blocked = t["users"], t["blocked"]
+    total_downloads, total_mb = t["downloads"], t["mb"]
 
     text = (
         "👥 **Users Panel**\n\n"
@@ -592,16 +663,20 @@ async def cb_adm_services(client, cq):
 # 🛡 Security
 @Client.on_callback_query(filters.regex("^adm_sec$") & admin_cq_only)
 async def cb_adm_sec(client, cq):
-    users = load_users()
-    blocked = sum(1 for u in users.values() if u.get("blocked"))
+    b = BLOCKLIST.stats()
     text = (
         "🛡 **Security & Abuse Control**\n\n"
-        f"🚫 Blocked Users: `{blocked}`\n"
-        f"📏 Rate-limit: 10 requests / 60 sec per user (in-code)\n\n"
-        "Commands:\n"
-        "• `/block <id>` – user ko block karo\n"
-        "• `/unblock <id>` – unblock karo\n"
+        f"🚫 Blocked Users: `{b['ids']}`\n"
+        f"🚫 Blocked usernames / id ranges: `{b['usernames']}` / `{b['ranges']}`\n"
+        f"🔎 Checks: `{b['checks']}` (denied `{b['denied']}`)\n"
+        "📏 Rate-limits (requests / min):\n"
+        + rate_limits_text()
+        + "\nCommands:\n"
+        "• `/block <id | @username | 100-200>` – block karo\n"
+        "• `/unblock <id | @username | 100-200>` – unblock karo\n"
         "• `/user <id>` – user ki history dekho\n"
+        "• `/limits` – rate limits + buckets\n"
+        "• `/setlimit link none 15` – limit badlo (owner)\n"
     )
     await edit_admin_panel(cq.message, text)
 
@@ -609,8 +684,7 @@ async def cb_adm_sec(client, cq):
 # 👑 Admins
 @Client.on_callback_query(filters.regex("^adm_admins$") & admin_cq_only)
 async def cb_adm_admins(client, cq):
-    cfg = get_config()
-    roles = cfg.get("roles", {})
+    roles = CONFIG.roles()
 
     text = "👑 **Admins & Mods**\n\n"
     text += "Owner(s):\n"
@@ -636,8 +710,7 @@ async def cb_adm_admins(client, cq):
 # 📝 Messages
 @Client.on_callback_query(filters.regex("^adm_msg$") & admin_cq_only)
 async def cb_adm_messages(client, cq):
-    cfg = get_config()
-    msgs = cfg.get("messages", {})
+    msgs = CONFIG.messages()
     keys = list(msgs.keys())
 
     if keys:
@@ -697,11 +770,23 @@ async def cb_adm_tool_ping(client, cq):
 
 @Client.on_callback_query(filters.regex("^adm_tool_server$") & admin_cq_only)
 async def cb_adm_tool_server(client, cq):
-    total_users = len(load_users())
+    total_users = USERS.count()
     text = (
         "🖥 **Server Info (basic)**\n\n"
         f"• Tracked users: `{total_users}`\n"
         f"• Time: `{now_str()}`\n"
+        + scheduler_status_text()
+        + throttle_status_text()
+        + flight_status_text()
+        + fileid_status_text()
+        + storage_status_text()
+        + pool_status_text()
+        + downloader_status_text()
+        + journal_status_text()
+        + watchdog_status_text()
+        + ffmpeg_status_text()
+        + cache_status_text()
+        + negative_status_text()
     )
     await cq.message.reply(text)
     await cq.answer("Server info sent.", show_alert=False)
@@ -723,7 +808,8 @@ async def cb_adm_backup(client, cq):
     folder_name = os.path.join(BACKUP_DIR, f"backup_{ts}")
     os.makedirs(folder_name, exist_ok=True)
 
-    for f in [USERS_FILE, SERVICES_FILE, CONFIG_FILE, LOG_FILE]:
+    await asyncio.to_thread(USERS.backup, os.path.join(folder_name, "users.db"))
+    for f in [SERVICES_FILE, CONFIG_FILE, LOG_FILE]:
         if os.path.exists(f):
             shutil.copy(f, folder_name)
 
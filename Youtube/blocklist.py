@@ -0,0 +1,134 @@
+# ============================================================
+#   Module: Blocklist (in-memory, O(1) check)
+#   Developer: Tushar Davera
+#   Description:
+#       • Blocked user ids ek set me – har link / button pe sirf
+#         hash lookup (DB / file nahi)
+#       • Optional: username block (@spammer) aur id range block
+#         (bot farms ke lagatar ids)
+#       • Har change pehle UserStore (SQLite) me, fir memory me –
+#         restart pe DB se wapas load
+# ============================================================
+
+import re
+import bisect
+import logging
+
+LOG = logging.getLogger(__name__)
+
+RULE_ID = "id"
+RULE_USERNAME = "username"
+RULE_RANGE = "range"
+
+RANGE_REGEX = re.compile(r"^(\d+)-(\d+)$")
+
+
+def parse_target(text: str):
+    """
+    /block argument samjho:
+      "12345"      -> ("id", 12345)
+      "@name"      -> ("username", "name")
+      "100-200"    -> ("range", (100, 200))
+    Galat input pe ValueError.
+    """
+    text = (text or "").strip()
+    if text.startswith("@") and len(text) > 1:
+        return RULE_USERNAME, text[1:].lower()
+    m = RANGE_REGEX.match(text)
+    if m:
+        lo, hi = sorted((int(m.group(1)), int(m.group(2))))
+        return RULE_RANGE, (lo, hi)
+    return RULE_ID, int(text)
+
+
+class Blocklist:
+
+    def __init__(self, store):
+        self.store = store
+        self.checks = 0
+        self.denied = 0
+        self._ids = set()
+        self._usernames = set()
+        self._ranges = []       # sorted [(lo, hi)]
+        self._starts = []       # bisect ke liye range starts
+        self.reload()
+
+    def reload(self):
+        """DB se poori state dobara (startup / manual fix ke baad)."""
+        self._ids = set(self.store.blocked_ids())
+        usernames, ranges = set(), []
+        for kind, value in self.store.block_rules():
+            if kind == RULE_USERNAME:
+                usernames.add(value)
+            elif kind == RULE_RANGE:
+                lo, hi = value.split("-", 1)
+                ranges.append((int(lo), int(hi)))
+        self._usernames = usernames
+        self._set_ranges(ranges)
+
+    def _set_ranges(self, ranges):
+        self._ranges = sorted(set(ranges))
+        self._starts = [lo for lo, _ in self._ranges]
+
+    # ---------- hot path ----------
+
+    def is_blocked(self, user_id: int, username: str = None) -> bool:
+        self.checks += 1
+        blocked = (
+            user_id in self._ids
+            or (username is not None and self._usernames and username.lower() in self._usernames)
+            or (self._ranges and self._in_range(user_id))
+        )
+        if blocked:
+            self.denied += 1
+        return bool(blocked)
+
+    def _in_range(self, user_id: int) -> bool:
+        # Ranges thode hote hain – bisect se O(log n); overlapping ranges ke liye
+        # peeche ki saari ranges check (jinka start <= id)
+        i = bisect.bisect_right(self._starts, user_id)
+        return any(lo <= user_id <= hi for lo, hi in self._ranges[:i])
+
+    # ---------- mutations ----------
+
+    def block_id(self, user_id: int) -> bool:
+        """False = user record nahi mila."""
+        if not self.store.set_blocked(user_id, True):
+            return False
+        self._ids.add(int(user_id))
+        return True
+
+    def unblock_id(self, user_id: int) -> bool:
+        if not self.store.set_blocked(user_id, False):
+            return False
+        self._ids.discard(int(user_id))
+        return True
+
+    def block_username(self, username: str) -> bool:
+        name = username.lstrip("@").lower()
+        added = self.store.add_block_rule(RULE_USERNAME, name)
+        self._usernames.add(name)
+        return added
+
+    def unblock_username(self, username: str) -> bool:
+        name = username.lstrip("@").lower()
+        self._usernames.discard(name)
+        return self.store.remove_block_rule(RULE_USERNAME, name)
+
+    def block_range(self, lo: int, hi: int) -> bool:
+        added = self.store.add_block_rule(RULE_RANGE, f"{lo}-{hi}")
+        self._set_ranges(self._ranges + [(lo, hi)])
+        return added
+
+    def unblock_range(self, lo: int, hi: int) -> bool:
+        self._set_ranges([r for r in self._ranges if r != (lo, hi)])
+        return self.store.remove_block_rule(RULE_RANGE, f"{lo}-{hi}")
+
+    def stats(self) -> dict:
+        return {
+            "ids": len(self._ids),
+            "usernames": len(self._usernames),
+            "ranges": len(self._ranges),
+            "checks": self.checks,
+            "denied": self.denied,
+        }
@@ -0,0 +1,196 @@
+# ============================================================
+#   Module: In-memory caches
+#   Developer: Tushar Davera
+#   Description:
+#       • TTLCache – LRU + per-entry expiry (metadata cache)
+#       • SessionStore – bounded, expiring button sessions
+#       • Hit / miss / eviction counters for admin stats
+# ============================================================
+
+import time
+from collections import OrderedDict
+
+from Youtube.config import Config
+
+
+class TTLCache:
+    """
+    Small LRU cache with expiry.
+    Sabse purana (least recently used) entry bahar jata hai jab
+    `maxsize` cross ho; expired entry lookup pe hi hata di jati hai.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = max(1, int(maxsize))
+        self.ttl = float(ttl)
+        self._data = OrderedDict()  # key -> (expires_at, value)
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key, default=None):
+        item = self._data.get(key)
+        if item is None:
+            self.misses += 1
+            return default
+
+        expires_at, value = item
+        if expires_at <= time.monotonic():
+            del self._data[key]
+            self.misses += 1
+            return default
+
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key, value, ttl: float = None):
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        self._data[key] = (expires_at, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def pop(self, key, default=None):
+        item = self._data.pop(key, None)
+        return default if item is None else item[1]
+
+    def __len__(self):
+        return len(self._data)
+
+    def stats(self) -> dict:
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+
+# Session lookup results
+SESSION_OK = "ok"
+SESSION_EXPIRED = "expired"
+SESSION_UNKNOWN = "unknown"
+
+
+class SessionStore:
+    """
+    Format-keyboard sessions (`ytdl|<key>|...` callbacks ke liye).
+
+    • Har entry ka apna expiry time hota hai (created + ttl)
+    • Sab entries same TTL se bante hain, to insertion order = expiry
+      order – purge hamesha front se hota hai (amortized O(1))
+    • `maxsize` cross hone pe sabse purana session evict hota hai
+    • Expired / evicted / used (pop) keys ki chhoti tombstone list rakhte
+      hain taaki "expired" aur "unknown" alag bata sakein
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = max(1, int(maxsize))
+        self.ttl = float(ttl)
+        self._data = OrderedDict()        # key -> (expires_at, value)
+        self._tombstones = OrderedDict()  # key -> None (bounded)
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.evictions = 0
+        # Har set / pop pe badhta hai – persist karne ki zarurat check
+        self.version = 0
+
+    def _bury(self, key):
+        self._tombstones[key] = None
+        while len(self._tombstones) > self.maxsize:
+            self._tombstones.popitem(last=False)
+
+    def _purge(self, now: float):
+        while self._data:
+            key, (expires_at, _) = next(iter(self._data.items()))
+            if expires_at > now:
+                break
+            self._data.popitem(last=False)
+            self.expired += 1
+            self._bury(key)
+
+    def set(self, key, value):
+        now = time.monotonic()
+        self._purge(now)
+        self._data.pop(key, None)
+        self._data[key] = (now + self.ttl, value)
+        self.version += 1
+        while len(self._data) > self.maxsize:
+            old_key, _ = self._data.popitem(last=False)
+            self.evictions += 1
+            self._bury(old_key)
+
+    def lookup(self, key):
+        """Returns (value, state) – state is SESSION_OK / EXPIRED / UNKNOWN."""
+        self._purge(time.monotonic())
+        item = self._data.get(key)
+        if item is not None:
+            self.hits += 1
+            return item[1], SESSION_OK
+        self.misses += 1
+        if key in self._tombstones:
+            return None, SESSION_EXPIRED
+        return None, SESSION_UNKNOWN
+
+    def pop(self, key, default=None):
+        item = self._data.pop(key, None)
+        if item is None:
+            return default
+        self.version += 1
+        # Use ho chuka session – dobara tap pe "expired / used" dikhe, "unknown" nahi
+        self._bury(key)
+        return item[1]
+
+    def snapshot(self) -> list:
+        """Persist ke liye: [(key, remaining seconds, value)] – expiry order me."""
+        now = time.monotonic()
+        self._purge(now)
+        return [(key, expires_at - now, value) for key, (expires_at, value) in self._data.items()]
+
+    def restore(self, items):
+        """
+        `snapshot()` wapas load karo (startup pe, khali store me) –
+        order same rehta hai to front-purge wali guarantee bani rehti hai.
+        """
+        now = time.monotonic()
+        for key, remaining, value in items:
+            if remaining > 0 and key not in self._data:
+                self._data[key] = (now + remaining, value)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def __len__(self):
+        return len(self._data)
+
+    def stats(self) -> dict:
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "expired": self.expired,
+            "evictions": self.evictions,
+        }
+
+
+# yt-dlp info dicts, key = "<extractor>:<video id>"
+META_CACHE = TTLCache(Config.META_CACHE_SIZE, Config.META_CACHE_TTL)
+
+# YouTube format-keyboard sessions, key = short random id
+YT_SESSIONS = SessionStore(Config.SESSION_MAX, Config.SESSION_TTL)
+
+
+def cache_status_text() -> str:
+    """Admin panel ke liye short status line."""
+    m = META_CACHE.stats()
+    ss = YT_SESSIONS.stats()
+    return (
+        f"• Metadata cache: `{m['size']}/{m['maxsize']}` "
+        f"(hits `{m['hits']}`, misses `{m['misses']}`, evicted `{m['evictions']}`)\n"
+        f"• Sessions: `{ss['size']}/{ss['maxsize']}` "
+        f"(used `{ss['hits']}`, expired `{ss['expired']}`, evicted `{ss['evictions']}`)\n"
+    )
@@ -0,0 +1,150 @@
+# ============================================================
+#   Module: Download Cancel (⛔ Cancel button)
+#   Developer: Tushar Davera
+#   Description:
+#       • Har download status message pe "⛔ Cancel" button
+#         (callback: dlcancel|<job_id>)
+#       • Queue / download / ffmpeg stage: job task cancel –
+#         scheduler slot, disk reservation, ffmpeg child turant free
+#       • yt-dlp worker thread progress hook se ruk jata hai
+#       • Upload stage: Pyrogram `stop_transmission()` progress callback se
+#       • Shared download ka leader cancel kare to `detach` hook –
+#         followers ke liye download chalta rehta hai
+#       • Shutdown: abort_all() – worker threads rukte hain, par job
+#         "user cancel" nahi maana jaata (journal resume karega)
+# ============================================================
+
+import asyncio
+import logging
+
+from pyrogram import Client, filters
+from pyrogram.types import InlineKeyboardMarkup, InlineKeyboardButton, CallbackQuery
+
+from Youtube.admin_system import get_role
+
+LOG = logging.getLogger(__name__)
+
+CANCELLED_TEXT = "⛔ **Download cancel kar diya gaya.**"
+
+
+class JobCancelled(Exception):
+    """User ne ⛔ Cancel dabaya."""
+
+
+class CancelToken:
+
+    def __init__(self, job_id: str, user_id: int, task):
+        self.job_id = job_id
+        self.user_id = user_id
+        self.task = task
+        self.cancelled = False
+        # Shutdown abort – sirf threads rokna, cancelled flag nahi
+        self.aborted = False
+        # `detach()` True de = chat alag, download dusron ke liye chalta rahe
+        self.detach = None
+        self.detached = False
+        # Upload ke time task cancel nahi – stop_transmission se rokte hain
+        self.uploading = False
+
+    def hook(self, d: dict):
+        """yt-dlp / segmented progress hook – worker thread ko yahi rokta hai."""
+        if self.aborted or (self.cancelled and not self.detached):
+            raise JobCancelled(self.job_id)
+
+    def upload_progress(self, client: Client, reporter):
+        """Pyrogram upload progress callback: cancel hua to transmission stop."""
+        async def progress(current: int, total: int, *args):
+            if self.cancelled:
+                client.stop_transmission()
+            await reporter.upload_progress(current, total, *args)
+        return progress
+
+
+class CancelRegistry:
+
+    def __init__(self):
+        self._tokens = {}
+        self.cancelled = 0
+
+    def register(self, job_id: str, user_id: int) -> CancelToken:
+        """Current task ko job ke naam se register karo (job task ke andar call karo)."""
+        token = CancelToken(job_id, user_id, asyncio.current_task())
+        self._tokens[job_id] = token
+        return token
+
+    def unregister(self, job_id: str):
+        self._tokens.pop(job_id, None)
+
+    def get(self, job_id: str):
+        return self._tokens.get(job_id)
+
+    def requested(self, job_id: str) -> bool:
+        token = self._tokens.get(job_id)
+        return bool(token and token.cancelled)
+
+    def cancel(self, job_id: str) -> bool:
+        token = self._tokens.get(job_id)
+        if token is None or token.cancelled:
+            return False
+        token.cancelled = True
+        self.cancelled += 1
+        if token.detach is not None and token.detach():
+            token.detached = True
+            return True
+        if not token.uploading and token.task is not None and not token.task.done():
+            token.task.cancel()
+        return True
+
+    def stop_detached(self, job_id: str) -> bool:
+        """Detached leader ka ab koi follower nahi bacha – download bhi roko."""
+        token = self._tokens.get(job_id)
+        if token is None or not token.detached:
+            return False
+        token.detached = False
+        if token.task is not None and not token.task.done():
+            token.task.cancel()
+        return True
+
+    def abort_all(self):
+        """Bot shutdown: saare yt-dlp threads agle hook pe ruk jaayein (exit block na ho)."""
+        for token in self._tokens.values():
+            token.aborted = True
+
+
+CANCELS = CancelRegistry()
+
+
+def cancel_markup(job_id: str):
+    return InlineKeyboardMarkup(
+        [[InlineKeyboardButton("⛔ Cancel", callback_data=f"dlcancel|{job_id}")]]
+    )
+
+
+def shutdown_interrupt(exc: BaseException, job_id: str) -> bool:
+    """
+    True = task bot shutdown ki wajah se cancel hua (journal resume karega),
+    False = user ne cancel kiya ya normal error.
+    """
+    return isinstance(exc, asyncio.CancelledError) and not CANCELS.requested(job_id)
+
+
+@Client.on_callback_query(filters.regex(r"^dlcancel\|"))
+async def cancel_download(client: Client, cq: CallbackQuery):
+    job_id = cq.data.split("|", 1)[1]
+    token = CANCELS.get(job_id)
+    if token is None:
+        await cq.answer("Ye job pehle hi khatam ho chuka hai.", show_alert=True)
+        return
+
+    # Sirf job ka owner ya staff cancel kar sakta hai
+    user_id = cq.from_user.id if cq.from_user else 0
+    if user_id != token.user_id and get_role(user_id) not in ("owner", "admin", "mod"):
+        await cq.answer("Ye aapka download nahi hai.", show_alert=True)
+        return
+
+    if CANCELS.cancel(job_id):
+        LOG.info("job %s cancelled by %s", job_id, user_id)
+        await cq.answer("⛔ Cancelling...")
+    else:
+        await cq.answer("Cancel already ho raha hai.")
+
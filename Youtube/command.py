@@ -24,7 +24,7 @@ else:
 # =======================
 #  Cancel button
 # =======================
-@Client.on_callback_query(filters.regex("cancel"))
+@Client.on_callback_query(filters.regex("^cancel$"))
 async def cancel(client, callback_query):
     await callback_query.message.delete()
 
@@ -27,3 +27,96 @@ class Config(object):
     # Agar koi HTTP proxy use karna ho to yaha env se doge
     # warna empty rehne do
     HTTP_PROXY = os.environ.get("HTTP_PROXY", "")
+
+    # yt-dlp worker pool size (extract + download threads).
+    # Chhote Railway box pe 3-4 kaafi hai.
+    YTDL_WORKERS = int(os.environ.get("YTDL_WORKERS", 4))
+
+    # Video metadata cache (extract_info result reuse).
+    # YouTube stream URLs kuch ghante me expire hote hain, isliye TTL chhota rakho.
+    META_CACHE_SIZE = int(os.environ.get("META_CACHE_SIZE", 300))
+    META_CACHE_TTL = int(os.environ.get("META_CACHE_TTL", 1800))
+    # Negative cache: private / deleted / unsupported links ka result (seconds)
+    NEG_CACHE_SIZE = int(os.environ.get("NEG_CACHE_SIZE", 2000))
+    NEG_CACHE_TTL = int(os.environ.get("NEG_CACHE_TTL", 600))
+
+    # Format-button sessions: max kitne aur kitni der (seconds) valid
+    SESSION_MAX = int(os.environ.get("SESSION_MAX", 5000))
+    SESSION_TTL = int(os.environ.get("SESSION_TTL", 3600))
+
+    # Download scheduler: ek saath kitne jobs (global / per user)
+    MAX_ACTIVE_JOBS = int(os.environ.get("MAX_ACTIVE_JOBS", 3))
+    MAX_JOBS_PER_USER = int(os.environ.get("MAX_JOBS_PER_USER", 1))
+    # "Queue me #N" message edit ka minimum gap (seconds)
+    QUEUE_NOTIFY_INTERVAL = float(os.environ.get("QUEUE_NOTIFY_INTERVAL", 5))
+
+    # Telegram file_id cache (popular media bina upload ke resend)
+    FILEID_CACHE_TTL = int(os.environ.get("FILEID_CACHE_TTL", 30 * 24 * 3600))
+    FILEID_CACHE_MAX = int(os.environ.get("FILEID_CACHE_MAX", 20000))
+    # file_id cache disk pe kitni der me save ho (seconds) – har upload pe nahi
+    FILEID_FLUSH_INTERVAL = int(os.environ.get("FILEID_FLUSH_INTERVAL", 30))
+
+    # Progress message edit ka minimum gap (seconds) – FloodWait se bachao
+    PROGRESS_INTERVAL = float(os.environ.get("PROGRESS_INTERVAL", 5))
+
+    # Storage manager (downloads/ staging dir)
+    # Itna disk hamesha free chhodo (MB)
+    STORAGE_MIN_FREE_MB = int(os.environ.get("STORAGE_MIN_FREE_MB", 500))
+    # Size pata na ho to itna reserve karo (MB)
+    STORAGE_DEFAULT_RESERVE_MB = int(os.environ.get("STORAGE_DEFAULT_RESERVE_MB", 200))
+    # Disk full ho to job kitni der (seconds) wait kare, phir refuse
+    STORAGE_WAIT = float(os.environ.get("STORAGE_WAIT", 120))
+    # Janitor: itni purani (seconds) staging files delete, har JANITOR_INTERVAL sec
+    JANITOR_MAX_AGE = int(os.environ.get("JANITOR_MAX_AGE", 3 * 3600))
+    JANITOR_INTERVAL = int(os.environ.get("JANITOR_INTERVAL", 600))
+
+    # ffmpeg pool (MP3 encode / remux / merge)
+    # 0 = auto (CPU cores / 2). NICE 0 = normal priority, 10 = low.
+    FFMPEG_WORKERS = int(os.environ.get("FFMPEG_WORKERS", 0))
+    FFMPEG_NICE = int(os.environ.get("FFMPEG_NICE", 10))
+
+    # Segmented downloader (parallel byte-range chunks)
+    # Ek download ke liye kitne connections, chunk size (MB), har chunk ke retries
+    DL_CONNECTIONS = int(os.environ.get("DL_CONNECTIONS", 4))
+    DL_CHUNK_MB = int(os.environ.get("DL_CHUNK_MB", 10))
+    DL_RETRIES = int(os.environ.get("DL_RETRIES", 5))
+    # Shared aiohttp pool me total max connections (sab downloads mila ke)
+    DL_POOL_LIMIT = int(os.environ.get("DL_POOL_LIMIT", 32))
+
+    # Job journal (restart ke baad downloads resume)
+    # Isse purane unfinished jobs resume nahi honge (seconds)
+    JOB_RESUME_MAX_AGE = int(os.environ.get("JOB_RESUME_MAX_AGE", 6 * 3600))
+    # Format sessions disk pe kitni der me save hon (seconds)
+    JOURNAL_FLUSH_INTERVAL = int(os.environ.get("JOURNAL_FLUSH_INTERVAL", 30))
+
+    # Graceful shutdown: uploads ko finish hone ke liye max kitne seconds
+    SHUTDOWN_DEADLINE = float(os.environ.get("SHUTDOWN_DEADLINE", 60))
+
+    # Watchdog: har stage ki max duration (seconds, 0 = no limit)
+    STAGE_TIMEOUT_METADATA = float(os.environ.get("STAGE_TIMEOUT_METADATA", 90))
+    STAGE_TIMEOUT_DOWNLOAD = float(os.environ.get("STAGE_TIMEOUT_DOWNLOAD", 2 * 3600))
+    STAGE_TIMEOUT_POSTPROCESS = float(os.environ.get("STAGE_TIMEOUT_POSTPROCESS", 1800))
+    STAGE_TIMEOUT_THUMBNAIL = float(os.environ.get("STAGE_TIMEOUT_THUMBNAIL", 30))
+    STAGE_TIMEOUT_UPLOAD = float(os.environ.get("STAGE_TIMEOUT_UPLOAD", 2 * 3600))
+    # Stall: STALL_WINDOW sec me STALL_MIN_KB se kam bytes aaye = atka hua
+    STALL_WINDOW = float(os.environ.get("STALL_WINDOW", 90))
+    STALL_MIN_KB = int(os.environ.get("STALL_MIN_KB", 64))
+    # yt-dlp socket timeout – atke worker thread bhi khud chhoot jayein
+    YTDL_SOCKET_TIMEOUT = int(os.environ.get("YTDL_SOCKET_TIMEOUT", 30))
+
+    # Extraction limiter (per source: youtube / instagram)
+    # Ek saath kitne extract_info – success pe max tak badhta, 429 pe aadha
+    EXTRACT_MAX_CONCURRENCY = int(os.environ.get("EXTRACT_MAX_CONCURRENCY", 4))
+    EXTRACT_MIN_CONCURRENCY = int(os.environ.get("EXTRACT_MIN_CONCURRENCY", 1))
+    # Circuit breaker: lagatar itne throttle errors = OPEN
+    BREAKER_TRIP_THRESHOLD = int(os.environ.get("BREAKER_TRIP_THRESHOLD", 3))
+    # Cooldown (seconds) – har failed probe pe double, max BREAKER_MAX_COOLDOWN
+    BREAKER_COOLDOWN = float(os.environ.get("BREAKER_COOLDOWN", 60))
+    BREAKER_MAX_COOLDOWN = float(os.environ.get("BREAKER_MAX_COOLDOWN", 900))
+    # Cooldown isse lamba ho to request queue nahi, turant "baad me try karo"
+    BREAKER_MAX_WAIT = float(os.environ.get("BREAKER_MAX_WAIT", 120))
+
+    # Rate limit (requests / minute, normal users). Mods ko 3x, admin / owner unlimited.
+    # Admin panel se runtime pe badal sakte ho: /setlimit link none 15
+    RATE_LINK_PER_MIN = int(os.environ.get("RATE_LINK_PER_MIN", 10))
+    RATE_DOWNLOAD_PER_MIN = int(os.environ.get("RATE_DOWNLOAD_PER_MIN", 10))
@@ -0,0 +1,157 @@
+# ============================================================
+#   Module: Config Store (roles + custom messages)
+#   Developer: Tushar Davera
+#   Description:
+#       • data/config.json ek baar memory me – get_role /
+#         get_message sirf dict lookup (koi file read / write nahi)
+#       • Disk pe sirf asli change (set_role / set_message) pe,
+#         atomic (tmp file + rename)
+#       • File bahar se edit ho (mtime change) to reload – check
+#         har `recheck` sec me ek stat
+# ============================================================
+
+import os
+import json
+import time
+import logging
+
+LOG = logging.getLogger(__name__)
+
+ROLE_NONE = "none"
+ROLE_OWNER = "owner"
+
+
+class ConfigStore:
+
+    def __init__(self, path: str, owners, recheck: float = 2.0):
+        self.path = path
+        # Owners code me fixed (ADMINS) – config se override nahi hote
+        self.owners = {int(x) for x in owners}
+        self.recheck = float(recheck)
+        self.reloads = 0
+        self.writes = 0
+        self._roles = {}        # int user_id -> role
+        self._messages = {}
+        self._extra = {}        # config.json ke baaki keys (as-is rakhte hain)
+        self._mtime = None
+        self._checked = 0.0
+        self._load()
+
+    # ---------- disk ----------
+
+    def _stat_mtime(self):
+        try:
+            return os.stat(self.path).st_mtime_ns
+        except OSError:
+            return None
+
+    def _load(self):
+        cfg = {}
+        if os.path.exists(self.path):
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    cfg = json.load(f)
+            except Exception as e:
+                # Aadhi likhi / galat file – purani memory wali state rakho
+                LOG.warning("config load failed, keeping cached copy: %s", e)
+                return
+        if not isinstance(cfg, dict):
+            cfg = {}
+        roles = {}
+        for uid, role in (cfg.get("roles") or {}).items():
+            try:
+                roles[int(uid)] = str(role)
+            except (TypeError, ValueError):
+                continue
+        self._roles = roles
+        self._messages = dict(cfg.get("messages") or {})
+        self._extra = {k: v for k, v in cfg.items() if k not in ("roles", "messages")}
+        self._mtime = self._stat_mtime()
+        self._checked = time.monotonic()
+
+    def _save(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.snapshot(), f, ensure_ascii=False, indent=2)
+        os.replace(tmp, self.path)
+        self._mtime = self._stat_mtime()
+        self.writes += 1
+
+    def _fresh(self):
+        """Bahar se file badli ho to reload (stat throttled)."""
+        now = time.monotonic()
+        if now - self._checked < self.recheck:
+            return
+        self._checked = now
+        if self._stat_mtime() != self._mtime:
+            LOG.info("config.json changed on disk, reloading")
+            self._load()
+            self.reloads += 1
+
+    # ---------- roles ----------
+
+    def role(self, user_id: int) -> str:
+        try:
+            user_id = int(user_id)
+        except (TypeError, ValueError):
+            return ROLE_NONE
+        if user_id in self.owners:
+            return ROLE_OWNER
+        self._fresh()
+        return self._roles.get(user_id, ROLE_NONE)
+
+    def set_role(self, user_id: int, role: str):
+        self._fresh()
+        user_id = int(user_id)
+        if role == ROLE_NONE:
+            if self._roles.pop(user_id, None) is None:
+                return
+        elif self._roles.get(user_id) == role:
+            return
+        else:
+            self._roles[user_id] = role
+        self._save()
+
+    def roles(self) -> dict:
+        """{"<uid>": role} – config.json wala shape."""
+        self._fresh()
+        return {str(uid): role for uid, role in self._roles.items()}
+
+    # ---------- messages ----------
+
+    def message(self, key: str, default: str) -> str:
+        self._fresh()
+        return self._messages.get(key, default)
+
+    def set_message(self, key: str, value: str):
+        self._fresh()
+        if self._messages.get(key) == value:
+            return
+        self._messages[key] = value
+        self._save()
+
+    def messages(self) -> dict:
+        self._fresh()
+        return dict(self._messages)
+
+    # ---------- other settings ----------
+
+    def get(self, key: str, default=None):
+        """Baaki keys (e.g. "rate_limits") – roles / messages ke liye upar wale methods."""
+        self._fresh()
+        return self._extra.get(key, default)
+
+    def set(self, key: str, value):
+        self._fresh()
+        if self._extra.get(key) == value:
+            return
+        self._extra[key] = value
+        self._save()
+
+    def snapshot(self) -> dict:
+        return dict(
+            self._extra,
+            roles={str(uid): role for uid, role in self._roles.items()},
+            messages=dict(self._messages),
+        )
@@ -0,0 +1,305 @@
+# ============================================================
+#   Module: Segmented Downloader (multi-connection HTTP)
+#   Developer: Tushar Davera
+#   Description:
+#       • CDN har connection ki speed throttle karte hain – progressive
+#         (single URL) formats ko byte-range chunks me parallel fetch
+#       • Ek shared aiohttp connection pool (thumbnails bhi isi se)
+#       • Har chunk ka retry + jaha tak likha tha waha se resume
+#       • Completed chunks `<file>.part.done` me – restart ke baad
+#         wahi `.part` file aage se continue
+#       • Range support na ho to yt-dlp fallback (DASH/HLS ke liye
+#         yt-dlp ke concurrent fragments)
+#       • yt-dlp style progress hooks – reporter / size guard same
+# ============================================================
+
+import os
+import time
+import asyncio
+import logging
+
+import aiohttp
+
+from Youtube.config import Config
+from Youtube.forcesub import humanbytes
+from Youtube.workers import ytdl_process
+
+LOG = logging.getLogger(__name__)
+
+MB = 1024 * 1024
+
+# Network read size per iteration
+READ_SIZE = 256 * 1024
+
+
+class RangeNotSupported(Exception):
+    """Server byte-range nahi deta – yt-dlp fallback use karo."""
+
+
+class SegmentError(Exception):
+    """Ek chunk adhoora / galat response – retry hoga."""
+
+
+def segmentable(fmt: dict) -> bool:
+    """Single URL wala plain http(s) format (fragments / merge nahi)."""
+    if not fmt or not fmt.get("url"):
+        return False
+    if fmt.get("requested_formats") or fmt.get("fragments"):
+        return False
+    return fmt.get("protocol") in ("http", "https")
+
+
+def downloaded_file(info: dict, fallback: str) -> str:
+    """yt-dlp (ya segmented engine) ne jo file likhi uska path."""
+    for d in info.get("requested_downloads") or []:
+        if d.get("filepath"):
+            return d["filepath"]
+    return info.get("filepath") or fallback
+
+
+class _Progress:
+    """Saare chunks ke bytes jod ke yt-dlp jaisa hook dict banata hai."""
+
+    def __init__(self, total: int, filename: str, hooks):
+        self.total = total
+        self.filename = filename
+        self.hooks = list(hooks or ())
+        self.done = 0
+        self.start = time.monotonic()
+
+    def add(self, nbytes: int):
+        self.done += nbytes
+        elapsed = time.monotonic() - self.start
+        speed = self.done / elapsed if elapsed > 0 else None
+        eta = (self.total - self.done) / speed if speed else None
+        self._emit({
+            "status": "downloading",
+            "downloaded_bytes": self.done,
+            "total_bytes": self.total,
+            "speed": speed,
+            "eta": eta,
+            "filename": self.filename,
+        })
+
+    def finished(self):
+        self._emit({
+            "status": "finished",
+            "downloaded_bytes": self.done,
+            "total_bytes": self.total,
+            "filename": self.filename,
+        })
+
+    def _emit(self, d: dict):
+        # Hook exception (e.g. FileTooLarge) poora download abort karta hai
+        for hook in self.hooks:
+            hook(d)
+
+
+class SegmentedDownloader:
+
+    def __init__(self, connections: int, chunk_size: int, retries: int, pool_limit: int):
+        self.connections = max(1, int(connections))
+        self.chunk_size = max(MB, int(chunk_size))
+        self.retries = max(0, int(retries))
+        self.pool_limit = max(self.connections, int(pool_limit))
+        self._session = None
+        self.active = 0
+        self.downloads = 0
+        self.fallbacks = 0
+        self.retried = 0
+        self.bytes = 0
+
+    # ---------- shared pool ----------
+
+    def session(self) -> aiohttp.ClientSession:
+        """Shared aiohttp session (lazy, running loop me banta hai)."""
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.pool_limit),
+                timeout=aiohttp.ClientTimeout(total=None, sock_connect=15, sock_read=30),
+            )
+        return self._session
+
+    async def close(self):
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    # ---------- download ----------
+
+    async def _probe(self, url: str, headers: dict) -> int:
+        """`Range: bytes=0-0` se total size + range support check."""
+        try:
+            async with self.session().get(
+                url, headers=dict(headers, Range="bytes=0-0"), proxy=Config.HTTP_PROXY or None
+            ) as r:
+                content_range = r.headers.get("Content-Range", "")
+                if r.status != 206 or "/" not in content_range:
+                    raise RangeNotSupported(f"HTTP {r.status}")
+                total = content_range.rsplit("/", 1)[1]
+                if not total.isdigit():
+                    raise RangeNotSupported(f"unknown size: {content_range}")
+                return int(total)
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            raise RangeNotSupported(str(e)) from e
+
+    async def _fetch_chunk(self, url: str, headers: dict, fd: int, start: int, end: int,
+                           progress: _Progress):
+        """[start, end] bytes file me likho; fail ho to bache hue bytes se resume."""
+        pos = start
+        attempt = 0
+        while True:
+            try:
+                async with self.session().get(
+                    url, headers=dict(headers, Range=f"bytes={pos}-{end}"),
+                    proxy=Config.HTTP_PROXY or None,
+                ) as r:
+                    if r.status != 206:
+                        raise SegmentError(f"HTTP {r.status} for bytes {pos}-{end}")
+                    async for data in r.content.iter_chunked(READ_SIZE):
+                        data = data[:end + 1 - pos]
+                        os.pwrite(fd, data, pos)
+                        pos += len(data)
+                        progress.add(len(data))
+                        if pos > end:
+                            break
+                if pos > end:
+                    return
+                raise SegmentError(f"short read at {pos}/{end}")
+            except (aiohttp.ClientError, asyncio.TimeoutError, SegmentError) as e:
+                attempt += 1
+                self.retried += 1
+                if attempt > self.retries:
+                    raise
+                LOG.info("chunk %d-%d retry %d (%s)", pos, end, attempt, e)
+                await asyncio.sleep(min(2 ** attempt, 10))
+
+    @staticmethod
+    def _load_done(part: str, done_path: str, total: int) -> set:
+        """Pichhle run ke completed chunk starts (sirf jab `.part` same size ka ho)."""
+        try:
+            if os.path.getsize(part) != total:
+                return set()
+            with open(done_path, "r") as f:
+                return {int(line) for line in f if line.strip().isdigit()}
+        except (OSError, ValueError):
+            return set()
+
+    async def download(self, fmt: dict, dst: str, hooks=()) -> int:
+        """
+        `fmt["url"]` ko `connections` parallel range requests se `dst` me
+        download karo. RangeNotSupported = kuch likha nahi gaya, fallback safe.
+        Returns total bytes.
+        """
+        url = fmt["url"]
+        headers = dict(fmt.get("http_headers") or {})
+        total = await self._probe(url, headers)
+
+        part = dst + ".part"
+        done_path = part + ".done"
+        done = self._load_done(part, done_path, total)
+        if not done and os.path.exists(done_path):
+            os.remove(done_path)
+
+        chunks = [
+            (start, min(start + self.chunk_size, total) - 1)
+            for start in range(0, total, self.chunk_size)
+        ]
+        queue = asyncio.Queue()
+        for chunk in chunks:
+            if chunk[0] not in done:
+                queue.put_nowait(chunk)
+
+        progress = _Progress(total, dst, hooks)
+        # Resume: pehle se aaye bytes progress me gino
+        progress.done = sum(end + 1 - start for start, end in chunks if start in done)
+        if done:
+            LOG.info("resuming %s: %d/%d chunks already on disk", dst, len(done), len(chunks))
+        fd = os.open(part, os.O_RDWR | os.O_CREAT, 0o644)
+        self.active += 1
+        try:
+            if not done:
+                os.ftruncate(fd, total)
+            done_log = open(done_path, "a")
+
+            async def worker():
+                while not queue.empty():
+                    start, end = queue.get_nowait()
+                    await self._fetch_chunk(url, headers, fd, start, end, progress)
+                    done_log.write(f"{start}\n")
+                    done_log.flush()
+
+            tasks = [
+                asyncio.ensure_future(worker())
+                for _ in range(min(self.connections, queue.qsize()) or 1)
+            ]
+            try:
+                await asyncio.gather(*tasks)
+            except BaseException:
+                for t in tasks:
+                    t.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+                raise
+            finally:
+                done_log.close()
+        finally:
+            os.close(fd)
+            self.active -= 1
+
+        os.replace(part, dst)
+        os.remove(done_path)
+        progress.finished()
+        self.downloads += 1
+        self.bytes += total
+        return total
+
+    def stats(self) -> dict:
+        return {
+            "connections": self.connections,
+            "active": self.active,
+            "downloads": self.downloads,
+            "fallbacks": self.fallbacks,
+            "retries": self.retried,
+            "bytes": self.bytes,
+        }
+
+
+DOWNLOADER = SegmentedDownloader(
+    Config.DL_CONNECTIONS,
+    Config.DL_CHUNK_MB * MB,
+    Config.DL_RETRIES,
+    Config.DL_POOL_LIMIT,
+)
+
+
+async def fetch_format(info: dict, fmt, opts: dict) -> dict:
+    """
+    Ek (pehle se chuna hua) format download karo.
+    Progressive http -> segmented engine, baaki sab (DASH/HLS, merge,
+    range na mile) -> yt-dlp `opts` ke saath. Returns yt-dlp jaisa info
+    dict (`downloaded_file(result, ...)` se path).
+    """
+    if fmt is not None and segmentable(fmt):
+        path = opts["outtmpl"] % {"ext": fmt.get("ext") or "bin"}
+        try:
+            await DOWNLOADER.download(fmt, path, opts.get("progress_hooks"))
+        except RangeNotSupported as e:
+            LOG.info("segmented download not possible (%s), using yt-dlp", e)
+            DOWNLOADER.fallbacks += 1
+        else:
+            result = dict(info)
+            result.update(fmt)
+            result["filepath"] = path
+            result["requested_downloads"] = [{"filepath": path}]
+            return result
+    return await ytdl_process(info, opts)
+
+
+def downloader_status_text() -> str:
+    """Admin panel ke liye short status line."""
+    s = DOWNLOADER.stats()
+    return (
+        f"• Segmented DL: `{s['active']}` active x `{s['connections']}` conns, "
+        f"`{s['downloads']}` done (`{humanbytes(s['bytes'])}`), "
+        f"fallbacks `{s['fallbacks']}`, retries `{s['retries']}`\n"
+    )
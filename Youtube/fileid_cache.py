@@ -0,0 +1,180 @@
+# ============================================================
+#   Module: Telegram file_id cache
+#   Developer: Tushar Davera
+#   Description:
+#       • Upload ke baad Telegram jo file_id deta hai use save karo
+#       • Same (source, media id, format, mode) dobara aaye to bina
+#         download / ffmpeg / upload ke seedha file_id se resend
+#       • Persistent (data/file_ids.json), TTL + max entries
+#       • Disk write har upload pe nahi – dirty mark, background
+#         flusher (thread me) + shutdown pe save
+#       • Resend fail ho to entry invalidate
+# ============================================================
+
+import os
+import json
+import time
+import asyncio
+import logging
+import threading
+
+from Youtube.config import Config
+
+LOG = logging.getLogger(__name__)
+
+FILE_IDS_PATH = os.path.join("data", "file_ids.json")
+
+
+def _media_file_id(msg):
+    """Sent Message se (kind, file_id) nikalo."""
+    for kind in ("video", "audio", "photo", "document", "animation", "voice"):
+        media = getattr(msg, kind, None)
+        if media is not None and getattr(media, "file_id", None):
+            return kind, media.file_id
+    return None, None
+
+
+class FileIdCache:
+
+    def __init__(self, path: str, ttl: float, maxsize: int, flush_interval: float):
+        self.path = path
+        self.ttl = float(ttl)
+        self.maxsize = max(1, int(maxsize))
+        self.flush_interval = float(flush_interval)
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self._data = self._load()
+        # Har change pe version++ – disk wala version peeche ho to flush
+        self.version = 0
+        self._saved_version = 0
+        self._flusher = None
+        # Flusher thread aur shutdown save ek hi tmp file na likhein
+        self._write_lock = threading.Lock()
+
+    @staticmethod
+    def key(source: str, media_id: str, fmt: str, mode: str) -> str:
+        return f"{source}:{media_id}|{fmt}|{mode}"
+
+    def _load(self) -> dict:
+        if not os.path.exists(self.path):
+            return {}
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            return data if isinstance(data, dict) else {}
+        except Exception as e:
+            LOG.warning("file_id cache load failed: %s", e)
+            return {}
+
+    def _write(self, data: dict):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp = self.path + ".tmp"
+        try:
+            with self._write_lock:
+                with open(tmp, "w", encoding="utf-8") as f:
+                    json.dump(data, f, ensure_ascii=False)
+                os.replace(tmp, self.path)
+        except Exception as e:
+            LOG.warning("file_id cache save failed: %s", e)
+
+    def save(self):
+        """Abhi disk pe likho (shutdown pe) – kuch badla na ho to skip."""
+        if self.version != self._saved_version:
+            version = self.version
+            self._write(self._data)
+            self._saved_version = version
+
+    async def _flush_loop(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            if self.version == self._saved_version:
+                continue
+            # Snapshot loop pe (entries immutable hain), JSON + file I/O thread me
+            version, snapshot = self.version, dict(self._data)
+            await asyncio.to_thread(self._write, snapshot)
+            self._saved_version = version
+
+    def start_flusher(self):
+        if self._flusher is None or self._flusher.done():
+            self._flusher = asyncio.get_running_loop().create_task(self._flush_loop())
+
+    def get(self, key: str):
+        entry = self._data.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        if time.time() - entry.get("ts", 0) > self.ttl:
+            self._data.pop(key, None)
+            self.misses += 1
+            return None
+        self.hits += 1
+        return entry
+
+    def put(self, key: str, sent_msg, caption: str = "", size: int = 0):
+        kind, file_id = _media_file_id(sent_msg)
+        if not file_id:
+            return
+        self._data.pop(key, None)
+        self._data[key] = {
+            "file_id": file_id,
+            "kind": kind,
+            "caption": caption,
+            "size": int(size or 0),
+            "ts": int(time.time()),
+        }
+        # dict insertion order = oldest first
+        while len(self._data) > self.maxsize:
+            self._data.pop(next(iter(self._data)))
+        self.version += 1
+
+    def invalidate(self, key: str):
+        if self._data.pop(key, None) is not None:
+            self.invalidations += 1
+            self.version += 1
+
+    def stats(self) -> dict:
+        return {
+            "size": len(self._data),
+            "hits": self.hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+        }
+
+
+FILE_IDS = FileIdCache(
+    FILE_IDS_PATH,
+    Config.FILEID_CACHE_TTL,
+    Config.FILEID_CACHE_MAX,
+    Config.FILEID_FLUSH_INTERVAL,
+)
+
+
+async def send_cached(client, chat_id: int, key: str):
+    """
+    Cache hit ho to file_id se resend karo.
+    Returns cache entry (bhej diya) ya None – miss / resend fail (entry invalidate).
+    """
+    entry = FILE_IDS.get(key)
+    if entry is None:
+        return None
+    try:
+        await client.send_cached_media(
+            chat_id=chat_id,
+            file_id=entry["file_id"],
+            caption=entry.get("caption") or "",
+        )
+        return entry
+    except Exception as e:
+        LOG.warning("cached resend failed for %s: %s", key, e)
+        FILE_IDS.invalidate(key)
+        return None
+
+
+def fileid_status_text() -> str:
+    """Admin panel ke liye short status line."""
+    s = FILE_IDS.stats()
+    return (
+        f"• file_id cache: `{s['size']}` entries "
+        f"(hits `{s['hits']}`, misses `{s['misses']}`, invalidated `{s['invalidations']}`)\n"
+    )
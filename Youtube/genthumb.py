@@ -3,9 +3,14 @@
 # Repo: https://github.com/LISA-KOREA/YouTube-Video-Download-Bot
 
 from pyrogram import Client, filters
-import yt_dlp
 import aiohttp
 import os
+import uuid
+
+from Youtube.workers import ytdl_extract
+from Youtube.watchdog import WATCHDOG
+from Youtube.throttle import limited
+from Youtube.storage import DOWNLOAD_DIR
 
 @Client.on_message(filters.command("thumbnail"))
 async def generate_thumbnail(client, message):
@@ -17,9 +22,11 @@ async def generate_thumbnail(client, message):
 
     try:
         # Extract video info without downloading
-        with yt_dlp.YoutubeDL({"quiet": True}) as ydl:
-            info = ydl.extract_info(video_url, download=False)
-            thumbnail_url = info.get("thumbnail")
+        info = await limited(
+            "youtube",
+            lambda: WATCHDOG.run("metadata", lambda: ytdl_extract(video_url, {"quiet": True}, download=False)),
+        )
+        thumbnail_url = info.get("thumbnail")
 
         if not thumbnail_url:
             await wait.delete()
@@ -29,7 +36,8 @@ async def generate_thumbnail(client, message):
         async with aiohttp.ClientSession() as session:
             async with session.get(thumbnail_url) as resp:
                 if resp.status == 200:
-                    file_name = "thumb.jpg"
+                    # Har request ki alag file, staging dir me (janitor saaf karega)
+                    file_name = os.path.join(DOWNLOAD_DIR, f"thumb_{uuid.uuid4().hex[:8]}.jpg")
                     with open(file_name, "wb") as f:
                         f.write(await resp.read())
 
@@ -8,7 +8,10 @@
 # ============================================================
 
 import os
+import re
+import glob
 import uuid
+import asyncio
 import logging
 
 import yt_dlp
@@ -17,6 +20,19 @@ from pyrogram.types import Message
 
 from Youtube.config import Config
 from Youtube.forcesub import handle_force_subscribe, humanbytes
+from Youtube.workers import ytdl_extract
+from Youtube.downloader import fetch_format, segmentable, downloaded_file
+from Youtube.scheduler import SCHEDULER, DEFAULT_PRIORITY, priority_for_role
+from Youtube.fileid_cache import FILE_IDS, send_cached
+from Youtube.progress import ProgressReporter
+from Youtube.journal import JOURNAL, STAGE_UPLOAD, revive_status
+from Youtube.lifecycle import LIFECYCLE, DRAINING_TEXT
+from Youtube.watchdog import WATCHDOG, StageTimeout
+from Youtube.throttle import limited, CircuitOpen
+from Youtube.negative_cache import NEGATIVE_CACHE, negative_text
+from Youtube.cancel import CANCELS, JobCancelled, CANCELLED_TEXT, cancel_markup, shutdown_interrupt
+from Youtube.storage import STORAGE, DOWNLOAD_DIR, InsufficientStorage, MB
+from Youtube.sizing import TELEGRAM_MAX_BYTES, FileTooLarge, estimate_size, size_guard_hook
 
 # Admin system hooks
 try:
@@ -24,24 +40,66 @@ try:
         register_user,
         is_blocked,
         is_rate_limited,
+        rate_limit_wait,
         add_download_stat,
+        get_role,
     )
 except Exception:
     # fallback – if admin_system not found for some reason
     def register_user(user): ...
-    def is_blocked(user_id: int) -> bool: return False
-    def is_rate_limited(user_id: int) -> bool: return False
+    def is_blocked(user_id: int, username: str = None) -> bool: return False
+    def is_rate_limited(user_id: int, action: str = "link") -> bool: return False
+    def rate_limit_wait(user_id: int, action: str = "link") -> int: return 1
     def add_download_stat(user_id: int, file_size_bytes: int): ...
+    def get_role(user_id: int) -> str: return "none"
 
 
 LOG = logging.getLogger(__name__)
 
-# Telegram size safety limit (~1.9 GB)
-TELEGRAM_MAX_BYTES = 1_900_000_000
 
-# Download directory (same as YouTube)
-DOWNLOAD_DIR = "downloads"
-os.makedirs(DOWNLOAD_DIR, exist_ok=True)
+
+# =========================
+#  DOWNLOAD (extract + engine)
+# =========================
+
+async def _insta_download(url: str, ydl_opts: dict, beat=None):
+    """
+    yt-dlp extract + size preflight + download + local filename resolve.
+    Single progressive file -> segmented engine, baaki yt-dlp.
+    Har stage watchdog ke andar (atka to abort + ek retry).
+    Returns: (title, ext, file_path, filesize)
+    """
+    # First extract (no bytes yet) – worker pool me, Instagram limiter / breaker ke andar
+    info = await limited(
+        "instagram", lambda: WATCHDOG.run("metadata", lambda: ytdl_extract(url, ydl_opts))
+    )
+
+    # Preflight size gate – selected format ka estimate limit se upar ho to yahi ruk jao
+    target = info
+    if info.get("_type") == "playlist" and info.get("entries"):
+        target = info["entries"][0]
+    estimate = estimate_size(target, target.get("duration"))
+    if estimate and estimate > TELEGRAM_MAX_BYTES:
+        raise FileTooLarge(estimate)
+
+    # Then download – album me sirf pehla media bhejte hain, to wahi fetch karo
+    if segmentable(target):
+        info = await WATCHDOG.run("download", lambda: fetch_format(target, target, ydl_opts), beat)
+    else:
+        src_info = info
+        info = await WATCHDOG.run("download", lambda: fetch_format(src_info, None, ydl_opts), beat)
+
+    # Handle album/playlist: take first entry for sending
+    first = info
+    if info.get("_type") == "playlist" and info.get("entries"):
+        first = info["entries"][0]
+    title = first.get("title") or info.get("title") or "Instagram Media"
+    ext = first.get("ext") or "mp4"
+    # Determine local file path
+    file_path = downloaded_file(first, first.get("_filename") or "")
+    filesize = first.get("filesize") or first.get("filesize_approx")
+
+    return title, ext, file_path, filesize
 
 
 # =========================
@@ -50,6 +108,15 @@ os.makedirs(DOWNLOAD_DIR, exist_ok=True)
 
 INSTAGRAM_REGEX = r"(https?://)?(www\.)?(instagram\.com|instagr\.am)/[^\s]+"
 
+# /p/<code>, /reel/<code>, /reels/<code>, /tv/<code>
+SHORTCODE_REGEX = re.compile(r"/(?:p|reels?|tv)/([A-Za-z0-9_-]+)")
+
+
+def instagram_shortcode(url: str):
+    """Canonical post id (shortcode) – None if link me nahi mila."""
+    m = SHORTCODE_REGEX.search(url or "")
+    return m.group(1) if m else None
+
 
 @Client.on_message(filters.regex(INSTAGRAM_REGEX))
 async def instagram_downloader(client: Client, message: Message):
@@ -69,14 +136,19 @@ async def instagram_downloader(client: Client, message: Message):
         except Exception:
             pass
 
-        if is_blocked(user.id):
+        if is_blocked(user.id, user.username):
             await message.reply_text("🚫 You are blocked from using this bot.")
             return
 
         if is_rate_limited(user.id):
-            await message.reply_text("⏳ Too many requests, thoda baad me try karo.")
+            await message.reply_text(f"⏳ Too many requests, {rate_limit_wait(user.id)}s baad try karo.")
             return
 
+    # Shutdown / deploy chal raha hai – naye links nahi
+    if LIFECYCLE.draining():
+        await message.reply_text(DRAINING_TEXT)
+        return
+
     # ---- Force subscribe (same as YouTube) ----
     if Config.CHANNEL:
         fsub = await handle_force_subscribe(client, message)
@@ -95,10 +167,82 @@ async def instagram_downloader(client: Client, message: Message):
         await message.reply_text("❌ Instagram link detect nahi hua. Please send a valid URL.")
         return
 
+    # ---- negative cache: private / deleted link dobara – bina network jawab ----
+    kind = NEGATIVE_CACHE.lookup(NEGATIVE_CACHE.key("instagram", instagram_shortcode(url), url))
+    if kind:
+        await message.reply_text(negative_text(kind))
+        return
+
+    # ---- file_id cache: pehle bheja ja chuka hai to turant resend ----
+    cache_key = FILE_IDS.key("instagram", instagram_shortcode(url) or url, "best", "auto")
+    cached = await send_cached(client, message.chat.id, cache_key)
+    if cached:
+        if user:
+            try:
+                add_download_stat(user.id, cached.get("size", 0))
+            except Exception:
+                pass
+        return
+
     processing_msg = await message.reply_text("📥 **Fetching Instagram media...**")
 
     # Temporary unique prefix for this download
     uid = uuid.uuid4().hex[:8]
+
+    # Job apne task me (Pyrogram worker free, shutdown / cancel per-job)
+    JOURNAL.spawn(_queued_insta_job(client, message, processing_msg, user, url, cache_key, uid))
+
+
+async def _queued_insta_job(client: Client, message: Message, processing_msg: Message, user,
+                            url: str, cache_key: str, uid: str):
+    """Scheduler queue + job. Journal / ⛔ Cancel queue me bhi kaam karte hain."""
+    job_id = f"insta_{uid}"
+    user_id = user.id if user else 0
+    priority = priority_for_role(get_role(user_id)) if user else DEFAULT_PRIORITY
+
+    # >>> Journal: restart ho jaye to yahi prefix se resume
+    JOURNAL.start(
+        job_id, "instagram",
+        chat_id=processing_msg.chat.id, message_id=processing_msg.id,
+        user_id=user_id, url=url, cache_key=cache_key, uid=uid,
+    )
+    CANCELS.register(job_id, user_id)
+    markup = cancel_markup(job_id)
+
+    async def _queue_position(pos: int):
+        await processing_msg.edit_text(
+            f"⏳ **Queue me ho: #{pos}**\n"
+            "Slot free hote hi Instagram download shuru ho jayega.",
+            reply_markup=markup,
+        )
+
+    try:
+        # ---- Scheduler: same global queue as YouTube ----
+        async with SCHEDULER.slot(user_id, priority, on_position=_queue_position):
+            await _insta_job(client, message, processing_msg, user, url, cache_key, uid)
+    except asyncio.CancelledError as e:
+        if shutdown_interrupt(e, job_id):
+            raise
+        # Queue me hi cancel
+        JOURNAL.finish(job_id)
+        try:
+            await processing_msg.edit_text(CANCELLED_TEXT)
+        except Exception:
+            pass
+    finally:
+        CANCELS.unregister(job_id)
+
+
+async def _insta_job(client: Client, message: Message, processing_msg: Message, user, url: str,
+                     cache_key: str, uid: str):
+    """Instagram download + upload – scheduler slot ke andar."""
+
+    job_id = f"insta_{uid}"
+    markup = cancel_markup(job_id)
+    token = CANCELS.get(job_id)
+    await processing_msg.edit_text("📥 **Downloading Instagram media...**", reply_markup=markup)
+
+    interrupted = False
     outtmpl = os.path.join(DOWNLOAD_DIR, f"insta_{uid}.%(ext)s")
 
     # yt-dlp options for Instagram
@@ -108,31 +252,41 @@ async def instagram_downloader(client: Client, message: Message):
         "nocheckcertificate": True,
         "noplaylist": False,          # if it's a post with multiple media, yt-dlp may treat as playlist
         "cookiefile": "cookies.txt",  # optional; if cookies.txt has IG cookies, private-ish public posts also work
+        "concurrent_fragment_downloads": Config.DL_CONNECTIONS,
     }
 
+    # Live progress (download + upload ek hi reporter – ek message, throttled edits)
+    reporter = ProgressReporter(processing_msg, reply_markup=markup)
+    # Size guard: limit cross hote hi download abort (bandwidth waste nahi)
+    ydl_opts["progress_hooks"] = [reporter.ytdl_hook, size_guard_hook(TELEGRAM_MAX_BYTES)]
+    upload_progress = reporter.upload_progress
+    if token is not None:
+        # ⛔ Cancel: yt-dlp thread hook se, upload stop_transmission se
+        ydl_opts["progress_hooks"].append(token.hook)
+        upload_progress = token.upload_progress(client, reporter)
+    # Watchdog: download / upload bytes aana band = stall
+    dl_beat = WATCHDOG.heartbeat()
+    ydl_opts["progress_hooks"].append(dl_beat.hook)
+    ydl_opts["socket_timeout"] = Config.YTDL_SOCKET_TIMEOUT
+    up_beat = WATCHDOG.heartbeat()
+    upload_progress = up_beat.wrap_upload(upload_progress)
+
     file_path = None
     title = "Instagram Media"
     filesize = None
     ext = None
+    ticket = None
 
     try:
-        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-            # First extract & download
-            info = ydl.extract_info(url, download=True)
-
-            # Handle album/playlist: take first entry for sending
-            if info.get("_type") == "playlist" and info.get("entries"):
-                first = info["entries"][0]
-                title = first.get("title") or info.get("title") or "Instagram Media"
-                ext = first.get("ext") or "mp4"
-                # Determine local file path
-                file_path = ydl.prepare_filename(first)
-                filesize = first.get("filesize") or first.get("filesize_approx")
-            else:
-                title = info.get("title", "Instagram Media")
-                ext = info.get("ext") or "mp4"
-                file_path = ydl.prepare_filename(info)
-                filesize = info.get("filesize") or info.get("filesize_approx")
+        # Disk reservation (size abhi pata nahi – default estimate)
+        ticket = await STORAGE.reserve(Config.STORAGE_DEFAULT_RESERVE_MB * MB, tag=job_id)
+
+        try:
+            title, ext, file_path, filesize = await _insta_download(url, ydl_opts, dl_beat)
+        except BaseException:
+            # Error text ko purana progress edit overwrite na kare
+            await reporter.finish()
+            raise
 
         # If filesize missing, use local file size
         if file_path and os.path.exists(file_path) and not filesize:
@@ -140,6 +294,7 @@ async def instagram_downloader(client: Client, message: Message):
 
         # Size safety check
         if filesize and filesize > TELEGRAM_MAX_BYTES:
+            await reporter.finish()
             await processing_msg.edit_text(
                 "❌ File size 2GB se zyada hai, Telegram limit ke bahar hai.\n"
                 "Chhota ya short reel try karo."
@@ -151,7 +306,10 @@ async def instagram_downloader(client: Client, message: Message):
         file_size_text = humanbytes(filesize) if filesize else "Unknown"
 
         # Decide how to send (video/photo/document)
-        await processing_msg.edit_text("📤 **Uploading Instagram media...**")
+        await reporter.edit("📤 **Uploading Instagram media...**")
+        if token is not None:
+            token.uploading = True
+        JOURNAL.update(job_id, stage=STAGE_UPLOAD)
 
         caption = f"📸 **Instagram Media**\n📝 `{title}`\n📦 Size: `{file_size_text}`"
 
@@ -165,27 +323,38 @@ async def instagram_downloader(client: Client, message: Message):
         video_exts = {"mp4", "webm", "mkv", "mov"}
         image_exts = {"jpg", "jpeg", "png", "webp"}
 
-        if send_ext in video_exts:
-            await client.send_video(
-                chat_id=message.chat.id,
-                video=file_path,
-                caption=caption,
-                supports_streaming=True,
-            )
-        elif send_ext in image_exts:
-            await client.send_photo(
-                chat_id=message.chat.id,
-                photo=file_path,
-                caption=caption,
-            )
-        else:
+        def _upload():
+            if send_ext in video_exts:
+                return client.send_video(
+                    chat_id=message.chat.id,
+                    video=file_path,
+                    caption=caption,
+                    supports_streaming=True,
+                    progress=upload_progress,
+                )
+            if send_ext in image_exts:
+                return client.send_photo(
+                    chat_id=message.chat.id,
+                    photo=file_path,
+                    caption=caption,
+                    progress=upload_progress,
+                )
             # Fallback as document
-            await client.send_document(
+            return client.send_document(
                 chat_id=message.chat.id,
                 document=file_path,
                 caption=caption,
+                progress=upload_progress,
             )
 
+        sent = await WATCHDOG.run("upload", _upload, up_beat)
+        await reporter.finish()
+        if sent is None:
+            # stop_transmission ke baad Pyrogram None deta hai
+            raise JobCancelled(job_id)
+
+        FILE_IDS.put(cache_key, sent, caption, filesize)
+
         await processing_msg.edit_text("✅ **Instagram media sent successfully!**")
 
         # Admin stats update
@@ -196,15 +365,71 @@ async def instagram_downloader(client: Client, message: Message):
         except Exception:
             pass
 
-    except yt_dlp.utils.DownloadError as e:
-        LOG.exception("Instagram download error:")
+    except (asyncio.CancelledError, JobCancelled) as e:
+        if shutdown_interrupt(e, job_id):
+            # Bot band ho raha hai – journal + partial files resume ke liye
+            interrupted = True
+            raise
+        # User ne ⛔ Cancel dabaya – reservation / partial files free
+        _cleanup_prefix(uid)
+        try:
+            await processing_msg.edit_text(CANCELLED_TEXT)
+        except Exception:
+            pass
+
+    except FileTooLarge:
+        LOG.info("Instagram media over size limit: %s", url)
+        _cleanup_prefix(uid)
         try:
             await processing_msg.edit_text(
+                "❌ File size 2GB se zyada hai, Telegram limit ke bahar hai.\n"
+                "Chhota ya short reel try karo."
+            )
+        except Exception:
+            pass
+
+    except StageTimeout as e:
+        LOG.warning("Instagram job stuck twice (%s): %s", e, url)
+        _cleanup_prefix(uid)
+        try:
+            await processing_msg.edit_text(
+                "⏱ Instagram se connection atak gaya (retry bhi fail).\n"
+                "Thodi der baad dobara try karo."
+            )
+        except Exception:
+            pass
+
+    except InsufficientStorage:
+        try:
+            await processing_msg.edit_text("❌ Server disk abhi full hai. Thodi der baad try karo.")
+        except Exception:
+            pass
+
+    except CircuitOpen as e:
+        LOG.info("Instagram extract refused: %s", e)
+        _cleanup_prefix(uid)
+        try:
+            await processing_msg.edit_text(
+                "🚦 Instagram abhi bahut requests pe rok laga raha hai.\n"
+                f"Thodi der (~{int(e.retry_after)}s) baad dobara try karo."
+            )
+        except Exception:
+            pass
+
+    except yt_dlp.utils.DownloadError as e:
+        kind = NEGATIVE_CACHE.remember(NEGATIVE_CACHE.key("instagram", instagram_shortcode(url), url), e)
+        if kind is None:
+            LOG.exception("Instagram download error:")
+            text = (
                 "❌ Instagram se download nahi ho paya.\n"
                 "• Ho sakta hai post private ho.\n"
                 "• Ya link invalid ho.\n\n"
                 f"`{e}`"
             )
+        else:
+            text = negative_text(kind, e)
+        try:
+            await processing_msg.edit_text(text)
         except Exception:
             pass
 
@@ -216,9 +441,36 @@ async def instagram_downloader(client: Client, message: Message):
             pass
 
     finally:
+        await reporter.finish()
+        if ticket is not None:
+            STORAGE.release(ticket)
+
+        if not interrupted:
+            JOURNAL.finish(job_id)
+
         # Cleanup local file
-        if file_path and os.path.exists(file_path):
+        if not interrupted and file_path and os.path.exists(file_path):
             try:
                 os.remove(file_path)
             except Exception:
                 pass
+
+
+async def _resume_insta_job(client: Client, entry: dict):
+    """Journal handler: restart ke baad unfinished Instagram job dobara chalao."""
+    status, user = await revive_status(
+        client, entry, "♻️ **Bot restart hua – Instagram download resume ho raha hai...**"
+    )
+    await _queued_insta_job(client, status, status, user, entry["url"], entry["cache_key"], entry["uid"])
+
+
+JOURNAL.register("instagram", _resume_insta_job)
+
+
+def _cleanup_prefix(uid: str):
+    """Aborted download ke partial files (`insta_<uid>.*`) hatao."""
+    for path in glob.glob(os.path.join(DOWNLOAD_DIR, f"insta_{glob.escape(uid)}.*")):
+        try:
+            os.remove(path)
+        except Exception:
+            pass
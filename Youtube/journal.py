@@ -0,0 +1,231 @@
+# ============================================================
+#   Module: Job Journal (restart-safe downloads)
+#   Developer: Tushar Davera
+#   Description:
+#       • Har in-flight job (chat, status message, format, stage)
+#         data/jobs.json me – Railway / Heroku restart ke baad
+#         requeue + resume
+#       • Job ki staging files janitor se pinned rehti hain, taaki
+#         `.part` bytes resume ho sakein
+#       • Format-keyboard sessions bhi data/sessions.json me
+#         (restart ke baad "Session expired" nahi)
+# ============================================================
+
+import os
+import json
+import time
+import asyncio
+import logging
+
+from Youtube.config import Config
+from Youtube.cache import YT_SESSIONS
+from Youtube.storage import STORAGE
+
+LOG = logging.getLogger(__name__)
+
+JOBS_PATH = os.path.join("data", "jobs.json")
+SESSIONS_PATH = os.path.join("data", "sessions.json")
+
+# Job stages
+STAGE_DOWNLOAD = "download"
+STAGE_UPLOAD = "upload"
+
+
+def _load_json(path: str, default):
+    if not os.path.exists(path):
+        return default
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        return data if isinstance(data, type(default)) else default
+    except Exception as e:
+        LOG.warning("journal load failed for %s: %s", path, e)
+        return default
+
+
+def _save_json(path: str, data):
+    """Atomic write (tmp + rename) – crash me aadhi file nahi bachti."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = path + ".tmp"
+    try:
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(tmp, path)
+    except Exception as e:
+        LOG.warning("journal save failed for %s: %s", path, e)
+
+
+class JobJournal:
+    """
+    job_id = staging file prefix (youtube: vid_key, instagram: insta_<uid>).
+    Source modules `register(source, handler)` karte hain; startup pe
+    `await JOURNAL.resume(client)` har pending job ke liye handler chalata hai.
+    """
+
+    def __init__(self, path: str, sessions_path: str, max_age: float, flush_interval: float):
+        self.path = path
+        self.sessions_path = sessions_path
+        self.max_age = float(max_age)
+        self.flush_interval = float(flush_interval)
+        self._handlers = {}
+        self._tasks = set()
+        self._running = {}        # job_id -> asyncio task (is process me)
+        self._flusher = None
+        self._sessions_version = None
+        self.resumed = 0
+        self.dropped = 0
+        self._jobs = _load_json(self.path, {})
+        for job_id in self._jobs:
+            STORAGE.pin(job_id)
+
+    # ---------- jobs ----------
+
+    def register(self, source: str, handler):
+        """`handler(client, entry)` – restart ke baad job dobara chalao."""
+        self._handlers[source] = handler
+
+    def start(self, job_id: str, source: str, **fields):
+        self._jobs[job_id] = dict(
+            fields, job_id=job_id, source=source, stage=STAGE_DOWNLOAD, ts=int(time.time())
+        )
+        STORAGE.pin(job_id)
+        task = asyncio.current_task()
+        if task is not None:
+            self._running[job_id] = task
+        _save_json(self.path, self._jobs)
+
+    def update(self, job_id: str, **fields):
+        entry = self._jobs.get(job_id)
+        if entry is None:
+            return
+        entry.update(fields)
+        _save_json(self.path, self._jobs)
+
+    def finish(self, job_id: str):
+        STORAGE.unpin(job_id)
+        self._running.pop(job_id, None)
+        if self._jobs.pop(job_id, None) is not None:
+            _save_json(self.path, self._jobs)
+
+    def pending(self) -> list:
+        return list(self._jobs.values())
+
+    def spawn(self, coro):
+        """
+        Job ko apne task me chalao – Pyrogram handler worker turant free,
+        aur shutdown / cancel sirf isi job ko cancel karta hai.
+        """
+        task = asyncio.get_running_loop().create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    def tasks(self) -> set:
+        return {task for task in self._tasks if not task.done()}
+
+    def running(self) -> dict:
+        """job_id -> (task, entry) – abhi chal rahe jobs (shutdown drain ke liye)."""
+        return {
+            job_id: (task, self._jobs[job_id])
+            for job_id, task in self._running.items()
+            if not task.done() and job_id in self._jobs
+        }
+
+    async def resume(self, client) -> int:
+        """Journal ke unfinished jobs background me dobara shuru karo."""
+        now = time.time()
+        count = 0
+        for entry in self.pending():
+            job_id = entry.get("job_id")
+            handler = self._handlers.get(entry.get("source"))
+            if handler is None or now - entry.get("ts", 0) > self.max_age:
+                self.dropped += 1
+                self.finish(job_id)
+                continue
+            self.spawn(self._resume_one(handler, client, entry))
+            count += 1
+        self.resumed += count
+        if count:
+            LOG.info("journal: resuming %d unfinished jobs", count)
+        return count
+
+    async def _resume_one(self, handler, client, entry: dict):
+        try:
+            await handler(client, dict(entry))
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            LOG.exception("journal: resume failed for %s", entry.get("job_id"))
+            self.finish(entry.get("job_id"))
+
+    # ---------- sessions ----------
+
+    def load_sessions(self):
+        """Startup pe saved format sessions wapas YT_SESSIONS me."""
+        now = time.time()
+        items = _load_json(self.sessions_path, [])
+        YT_SESSIONS.restore(
+            (key, expires_at - now, value) for key, expires_at, value in items
+        )
+        self._sessions_version = YT_SESSIONS.version
+
+    def save_sessions(self):
+        now = time.time()
+        items = [[key, now + remaining, value] for key, remaining, value in YT_SESSIONS.snapshot()]
+        _save_json(self.sessions_path, items)
+        self._sessions_version = YT_SESSIONS.version
+
+    async def _flush_loop(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            if YT_SESSIONS.version != self._sessions_version:
+                try:
+                    self.save_sessions()
+                except Exception:
+                    LOG.exception("journal: session flush failed")
+
+    def start_flusher(self):
+        if self._flusher is None or self._flusher.done():
+            self._flusher = asyncio.get_running_loop().create_task(self._flush_loop())
+
+    def stats(self) -> dict:
+        return {
+            "pending": len(self._jobs),
+            "resumed": self.resumed,
+            "dropped": self.dropped,
+        }
+
+
+JOURNAL = JobJournal(
+    JOBS_PATH,
+    SESSIONS_PATH,
+    Config.JOB_RESUME_MAX_AGE,
+    Config.JOURNAL_FLUSH_INTERVAL,
+)
+
+
+async def revive_status(client, entry: dict, text: str):
+    """Restart ke baad job ka purana status message + user wapas lao."""
+    status = await client.get_messages(entry["chat_id"], entry["message_id"])
+    if status is None or getattr(status, "empty", False):
+        raise LookupError(f"status message gone for job {entry.get('job_id')}")
+    user = None
+    if entry.get("user_id"):
+        try:
+            user = await client.get_users(entry["user_id"])
+        except Exception:
+            user = None
+    try:
+        await status.edit_text(text)
+    except Exception:
+        pass
+    return status, user
+
+
+def journal_status_text() -> str:
+    """Admin panel ke liye short status line."""
+    s = JOURNAL.stats()
+    return (
+        f"• Job journal: `{s['pending']}` pending, "
+        f"resumed `{s['resumed']}`, dropped `{s['dropped']}`\n"
+    )
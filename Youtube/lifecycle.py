@@ -0,0 +1,93 @@
+# ============================================================
+#   Module: Graceful Shutdown (deploy / SIGTERM)
+#   Developer: Tushar Davera
+#   Description:
+#       • Shutdown shuru hote hi naye links / buttons refuse
+#       • Upload stage wale jobs ko SHUTDOWN_DEADLINE tak finish
+#         hone do (Telegram upload resume nahi hota)
+#       • Baaki jobs cancel -> journal me checkpoint (`.part` files
+#         rehti hain, restart pe resume)
+#       • yt-dlp worker threads bhi abort – warna executor ka exit
+#         join unke download khatam hone tak atka rehta
+#       • downloads/ ki bachi hui garbage saaf, counts report
+# ============================================================
+
+import asyncio
+import logging
+
+from Youtube.config import Config
+from Youtube.cancel import CANCELS
+from Youtube.journal import JOURNAL, STAGE_UPLOAD
+from Youtube.storage import STORAGE
+
+LOG = logging.getLogger(__name__)
+
+DRAINING_TEXT = "🔄 Bot abhi update / restart ho raha hai. 1-2 minute baad link dobara bhejo."
+
+CHECKPOINT_TEXT = (
+    "⏸ **Bot restart ho raha hai.**\n"
+    "Aapka download save ho gaya hai – restart ke baad yahi se resume hoga."
+)
+
+
+class Lifecycle:
+
+    def __init__(self, deadline: float):
+        self.deadline = float(deadline)
+        self.accepting = True
+        self.drained = 0
+        self.checkpointed = 0
+
+    def draining(self) -> bool:
+        """True = shutdown chal raha hai, naye jobs mat lo."""
+        return not self.accepting
+
+    async def shutdown(self, client) -> dict:
+        """
+        1. naye jobs band  2. uploads ko deadline tak chalne do
+        3. baaki cancel + checkpoint  4. staging cleanup  5. report
+        """
+        self.accepting = False
+        running = JOURNAL.running()
+
+        uploads = {t for t, entry in running.values() if entry.get("stage") == STAGE_UPLOAD}
+        # Baaki sab job tasks (queue me wale bhi)
+        others = JOURNAL.tasks() - uploads
+
+        # Download / queue wale jobs ke bytes disk pe hain – turant checkpoint.
+        # Task cancel se thread nahi rukta – token abort se agle hook pe rukega
+        # (uploads pe asar nahi, woh hooks use nahi karte)
+        CANCELS.abort_all()
+        for task in others:
+            task.cancel()
+
+        if uploads:
+            LOG.info("shutdown: waiting up to %.0fs for %d uploads", self.deadline, len(uploads))
+            _, pending = await asyncio.wait(uploads, timeout=self.deadline)
+            for task in pending:
+                task.cancel()
+            others |= pending
+
+        if others:
+            await asyncio.gather(*others, return_exceptions=True)
+
+        # Jo jobs journal me bache = checkpointed, baaki khatam (drained)
+        pending_ids = {entry.get("job_id") for entry in JOURNAL.pending()}
+        checkpointed = [entry for job_id, (_, entry) in running.items() if job_id in pending_ids]
+        self.checkpointed += len(checkpointed)
+        self.drained += len(running) - len(checkpointed)
+        for entry in checkpointed:
+            try:
+                await client.edit_message_text(entry["chat_id"], entry["message_id"], CHECKPOINT_TEXT)
+            except Exception:
+                pass
+
+        # Journal wale prefixes pinned hain – baaki sab staging garbage
+        removed = STORAGE.sweep(max_age=0)
+
+        report = {"drained": self.drained, "checkpointed": self.checkpointed, "cleaned": removed}
+        LOG.info("shutdown: %s", report)
+        return report
+
+
+LIFECYCLE = Lifecycle(Config.SHUTDOWN_DEADLINE)
@@ -0,0 +1,160 @@
+# ============================================================
+#   Module: Negative-result cache (private / removed / unsupported)
+#   Developer: Tushar Davera
+#   Description:
+#       • yt-dlp DownloadError ka cause classify: private, removed,
+#         geo-blocked, unsupported
+#       • Canonical URL key pe short-TTL cache – same bekaar link
+#         dobara aaye to bina network / extraction turant jawab
+#       • Throttle (429 / bot-check) errors cache nahi hote – wo
+#         link ki galti nahi, breaker sambhalta hai
+# ============================================================
+
+import logging
+from urllib.parse import urlsplit, parse_qsl, urlencode
+
+from Youtube.config import Config
+from Youtube.cache import TTLCache
+from Youtube.throttle import is_throttle_error
+
+LOG = logging.getLogger(__name__)
+
+KIND_PRIVATE = "private"
+KIND_REMOVED = "removed"
+KIND_GEO = "geo"
+KIND_UNSUPPORTED = "unsupported"
+
+# Order matter karta hai: "Video unavailable. This video is private" = private,
+# "Video unavailable ... in your country" = geo, baaki "unavailable" = removed
+_SIGNATURES = (
+    (KIND_PRIVATE, (
+        "private video",
+        "this video is private",
+        "account is private",
+        "this post is private",
+        "members-only",
+        "join this channel to get access",
+    )),
+    (KIND_GEO, (
+        "available in your country",
+        "blocked it in your country",
+        "geo restriction",
+        "geo-restricted",
+        "available from your location",
+    )),
+    (KIND_UNSUPPORTED, (
+        "unsupported url",
+    )),
+    (KIND_REMOVED, (
+        "video unavailable",
+        "has been removed",
+        "no longer available",
+        "account associated with this video has been terminated",
+        "does not exist",
+        "http error 404",
+        "page not found",
+    )),
+)
+
+# Ye errors aksar transient hote hain (player / nsig breakage, throttled
+# response) – link theek ho sakta hai, cache nahi karte
+_TRANSIENT = (
+    "no video formats found",
+    "requested format is not available",
+    "unable to extract",
+    "nsig extraction failed",
+)
+
+NEGATIVE_TEXT = {
+    KIND_PRIVATE: "🔒 Ye post / video private hai – public link bhejo.",
+    KIND_REMOVED: "🗑 Ye video / post delete ho chuka hai ya exist nahi karta.",
+    KIND_GEO: "🌍 Ye content server ke region me blocked hai (geo-restriction).",
+    KIND_UNSUPPORTED: "❌ Ye link supported nahi hai.",
+}
+
+# Share links ke tracking params – key me nahi chahiye
+_TRACKING_PARAMS = ("igsh", "igshid", "si", "feature", "fbclid", "gclid")
+
+
+def canonical_url(url: str) -> str:
+    """Scheme / www / m. / tracking params / trailing slash hata ke stable key."""
+    parts = urlsplit((url or "").strip())
+    host = parts.netloc.lower()
+    for prefix in ("www.", "m."):
+        if host.startswith(prefix):
+            host = host[len(prefix):]
+    query = [
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if k not in _TRACKING_PARAMS and not k.startswith("utm_")
+    ]
+    key = host + parts.path.rstrip("/")
+    if query:
+        key += "?" + urlencode(sorted(query))
+    return key
+
+
+def classify_error(exc: BaseException):
+    """DownloadError ka kind (KIND_*) – None = transient / pata nahi, cache mat karo."""
+    if is_throttle_error(exc):
+        return None
+    text = str(exc).lower()
+    if any(sig in text for sig in _TRANSIENT):
+        return None
+    for kind, signatures in _SIGNATURES:
+        if any(sig in text for sig in signatures):
+            return kind
+    return None
+
+
+class NegativeCache:
+
+    def __init__(self, maxsize: int, ttl: float):
+        self._cache = TTLCache(maxsize, ttl)
+        self.stored = 0
+        self.by_kind = {kind: 0 for kind in NEGATIVE_TEXT}
+
+    @staticmethod
+    def key(source: str, media_id: str = None, url: str = None) -> str:
+        """Media id (video id / shortcode) mile to wahi, warna canonical URL."""
+        return f"{source}:{media_id or canonical_url(url)}"
+
+    def lookup(self, key: str):
+        """Cached kind (KIND_*) ya None."""
+        return self._cache.get(key)
+
+    def remember(self, key: str, exc: BaseException):
+        """Error classify karke cache karo – returns kind ya None (transient)."""
+        kind = classify_error(exc)
+        if kind is None:
+            return None
+        self._cache.set(key, kind)
+        self.stored += 1
+        self.by_kind[kind] += 1
+        LOG.info("negative cache: %s -> %s", key, kind)
+        return kind
+
+    def stats(self) -> dict:
+        s = self._cache.stats()
+        s["stored"] = self.stored
+        s["by_kind"] = dict(self.by_kind)
+        return s
+
+
+NEGATIVE_CACHE = NegativeCache(Config.NEG_CACHE_SIZE, Config.NEG_CACHE_TTL)
+
+
+def negative_text(kind: str, source_error=None) -> str:
+    text = NEGATIVE_TEXT.get(kind, NEGATIVE_TEXT[KIND_UNSUPPORTED])
+    if source_error is not None:
+        text += f"\n\n`{source_error}`"
+    return text
+
+
+def negative_status_text() -> str:
+    """Admin panel ke liye short status line."""
+    s = NEGATIVE_CACHE.stats()
+    kinds = ", ".join(f"{k} `{v}`" for k, v in s["by_kind"].items() if v) or "none"
+    return (
+        f"• Negative cache: `{s['size']}/{s['maxsize']}` "
+        f"(instant answers `{s['hits']}`, stored `{s['stored']}`: {kinds})\n"
+    )
@@ -0,0 +1,175 @@
+# ============================================================
+#   Module: Live Progress Reporter
+#   Developer: Tushar Davera
+#   Description:
+#       • yt-dlp progress_hooks + Pyrogram upload progress callback
+#       • Percentage, speed, ETA ek status message me
+#       • Coalesced edits – ek message max ek baar / PROGRESS_INTERVAL
+#         sec edit hota hai (FloodWait se bachne ke liye)
+#       • Stage text ("Uploading...") bhi reporter.edit() se – timer
+#         last edit se chalta hai, ek message = ek reporter
+# ============================================================
+
+import time
+import asyncio
+import logging
+import threading
+
+from Youtube.config import Config
+from Youtube.forcesub import humanbytes
+
+LOG = logging.getLogger(__name__)
+
+
+def time_formatter(seconds) -> str:
+    """Seconds -> 1h 02m 03s style."""
+    if seconds is None:
+        return "--"
+    seconds = int(seconds)
+    h, rem = divmod(seconds, 3600)
+    m, s = divmod(rem, 60)
+    if h:
+        return f"{h}h {m:02d}m {s:02d}s"
+    if m:
+        return f"{m}m {s:02d}s"
+    return f"{s}s"
+
+
+def progress_text(label: str, current: int, total, speed, eta) -> str:
+    lines = [f"{label}"]
+    if total:
+        pct = min(100.0, current * 100 / total)
+        filled = int(pct // 10)
+        lines.append(f"[{'█' * filled}{'░' * (10 - filled)}] {pct:.1f}%")
+        lines.append(f"📦 {humanbytes(current)} / {humanbytes(total)}")
+    else:
+        lines.append(f"📦 {humanbytes(current)}")
+    lines.append(
+        f"⚡ {humanbytes(speed) + '/s' if speed else '--'} | ⏳ ETA {time_formatter(eta)}"
+    )
+    return "\n".join(lines)
+
+
+class ProgressReporter:
+    """
+    Ek status message ke liye throttled progress edits.
+
+    `ytdl_hook` worker thread se call hota hai, `upload_progress`
+    Pyrogram loop se – dono thread-safe hain. Stage badle to
+    `await reporter.edit(text)`; kaam khatam hone pe `await reporter.finish()`
+    taaki purana edit final status ko overwrite na kare.
+    """
+
+    def __init__(self, message, interval: float = None, reply_markup=None):
+        self.message = message
+        # Status message ka keyboard (⛔ Cancel) har edit me bana rahe
+        self.reply_markup = reply_markup
+        self.interval = Config.PROGRESS_INTERVAL if interval is None else float(interval)
+        self.loop = asyncio.get_running_loop()
+        self._lock = threading.Lock()
+        # Reporter status edit ke turant baad banta hai – pehla progress edit interval baad
+        self._last_edit = time.monotonic()
+        self._last_text = None
+        self._task = None
+        self._closed = False
+        self._upload_start = None
+        self._parts = {}
+
+    # ---------- yt-dlp (worker thread) ----------
+
+    def ytdl_hook(self, d: dict):
+        if d.get("status") != "downloading":
+            return
+        self.update(
+            "⬇️ **Downloading...**",
+            d.get("downloaded_bytes") or 0,
+            d.get("total_bytes") or d.get("total_bytes_estimate"),
+            d.get("speed"),
+            d.get("eta"),
+        )
+
+    def part_hook(self, part: str):
+        """
+        Ek saath chal rahe multiple downloads (video + audio) ke liye hook –
+        sab parts ke bytes / speed jod ke ek hi progress dikhata hai.
+        """
+        def hook(d: dict):
+            if d.get("status") != "downloading":
+                return
+            with self._lock:
+                self._parts[part] = (
+                    d.get("downloaded_bytes") or 0,
+                    d.get("total_bytes") or d.get("total_bytes_estimate"),
+                    d.get("speed") or 0,
+                )
+                parts = list(self._parts.values())
+            done = sum(p[0] for p in parts)
+            totals = [p[1] for p in parts]
+            total = sum(totals) if all(totals) else None
+            speed = sum(p[2] for p in parts)
+            eta = (total - done) / speed if total and speed else None
+            self.update("⬇️ **Downloading...**", done, total, speed or None, eta)
+        return hook
+
+    # ---------- Pyrogram upload (event loop) ----------
+
+    async def upload_progress(self, current: int, total: int, *args):
+        now = time.monotonic()
+        if self._upload_start is None:
+            self._upload_start = now
+        elapsed = now - self._upload_start
+        speed = current / elapsed if elapsed > 0 else None
+        eta = (total - current) / speed if speed and total else None
+        self.update("📤 **Uploading...**", current, total, speed, eta)
+
+    # ---------- common ----------
+
+    def update(self, label: str, current: int, total, speed, eta):
+        now = time.monotonic()
+        with self._lock:
+            if self._closed or now - self._last_edit < self.interval:
+                return
+            if self._task is not None and not self._task.done():
+                return
+            self._last_edit = now
+        text = progress_text(label, current, total, speed, eta)
+        self.loop.call_soon_threadsafe(self._start_edit, text)
+
+    def _start_edit(self, text: str):
+        if self._closed or text == self._last_text:
+            return
+        self._last_text = text
+        self._task = self.loop.create_task(self._edit(text))
+
+    async def _edit(self, text: str):
+        try:
+            await self.message.edit_text(text, reply_markup=self.reply_markup)
+        except Exception as e:
+            LOG.debug("progress edit failed: %s", e)
+
+    async def edit(self, text: str, **kwargs):
+        """
+        Stage text edit (e.g. "📤 Uploading...") – pending progress edit ke
+        baad, aur agla progress edit isse poore interval baad.
+        """
+        with self._lock:
+            self._last_edit = time.monotonic()
+        task = self._task
+        if task is not None and not task.done():
+            try:
+                await task
+            except Exception:
+                pass
+        kwargs.setdefault("reply_markup", self.reply_markup)
+        self._last_text = text
+        await self.message.edit_text(text, **kwargs)
+
+    async def finish(self):
+        with self._lock:
+            self._closed = True
+        task = self._task
+        if task is not None and not task.done():
+            try:
+                await task
+            except Exception:
+                pass
@@ -0,0 +1,95 @@
+# ============================================================
+#   Module: Token-bucket Rate Limiter
+#   Developer: Tushar Davera
+#   Description:
+#       • Har (user, action) ka ek chhota bucket: [tokens, last_ts]
+#         – O(1) memory per active user, timestamps ki list nahi
+#       • Actions alag budget: "link" (naya URL) aur "download"
+#         (format button)
+#       • Limit role ke hisaab se (get_role) – admin panel se
+#         runtime pe change, 0 = unlimited
+#       • Deny pe token nahi katta (penalty lambi nahi hoti)
+#       • Idle buckets (pure refill ho chuke) front se evict –
+#         amortized O(1), insertion order = last use order
+# ============================================================
+
+import time
+from collections import OrderedDict
+
+ACTION_LINK = "link"
+ACTION_DOWNLOAD = "download"
+ACTIONS = (ACTION_LINK, ACTION_DOWNLOAD)
+
+# Limits "per minute" me: capacity (burst) = per_min, refill = per_min / 60 sec
+WINDOW_SEC = 60.0
+
+
+class TokenBucketLimiter:
+
+    def __init__(self, limit_for, window: float = WINDOW_SEC):
+        """
+        `limit_for(action, role) -> per_min` (0 / None = unlimited).
+        Bucket `window` sec me 0 se full ho jata hai – itna idle bucket
+        rakhne ka koi fayda nahi, evict.
+        """
+        self.limit_for = limit_for
+        self.window = float(window)
+        self._buckets = OrderedDict()   # (user_id, action) -> [tokens, ts]
+        self.allowed = 0
+        self.denied = 0
+        self.evicted = 0
+
+    def allow(self, user_id: int, action: str, role: str = "none") -> bool:
+        now = time.monotonic()
+        self._evict(now)
+
+        per_min = self.limit_for(action, role)
+        if not per_min:
+            self.allowed += 1
+            return True
+        capacity = float(per_min)
+        rate = capacity / self.window
+
+        key = (user_id, action)
+        bucket = self._buckets.pop(key, None)
+        if bucket is None:
+            bucket = [capacity, now]
+        else:
+            bucket[0] = min(capacity, bucket[0] + (now - bucket[1]) * rate)
+            bucket[1] = now
+        # Pop + reinsert = end pe (most recently used)
+        self._buckets[key] = bucket
+
+        if bucket[0] >= 1.0:
+            bucket[0] -= 1.0
+            self.allowed += 1
+            return True
+        self.denied += 1
+        return False
+
+    def retry_after(self, user_id: int, action: str, role: str = "none") -> float:
+        """Agla token kitne sec me (message ke liye)."""
+        per_min = self.limit_for(action, role)
+        bucket = self._buckets.get((user_id, action))
+        if not per_min or bucket is None or bucket[0] >= 1.0:
+            return 0.0
+        return (1.0 - bucket[0]) * self.window / float(per_min)
+
+    def _evict(self, now: float):
+        # Front = sabse purana use; window se zyada idle = full bucket = delete
+        buckets = self._buckets
+        while buckets:
+            key, bucket = next(iter(buckets.items()))
+            if now - bucket[1] < self.window:
+                break
+            buckets.popitem(last=False)
+            self.evicted += 1
+
+    def stats(self) -> dict:
+        self._evict(time.monotonic())
+        return {
+            "active": len(self._buckets),
+            "allowed": self.allowed,
+            "denied": self.denied,
+            "evicted": self.evicted,
+        }
@@ -0,0 +1,228 @@
+# ============================================================
+#   Module: Download Job Scheduler
+#   Developer: Tushar Davera
+#   Description:
+#       • Global concurrency cap (MAX_ACTIVE_JOBS)
+#       • Per-user cap (MAX_JOBS_PER_USER)
+#       • Fair queue: har tier me users round-robin me chalte hain
+#       • Priority tiers: owner > admin > mod > normal users
+#       • "Queue me #N" position callbacks (throttled)
+# ============================================================
+
+import time
+import asyncio
+import logging
+from collections import OrderedDict, deque, defaultdict
+from contextlib import asynccontextmanager
+
+from Youtube.config import Config
+
+LOG = logging.getLogger(__name__)
+
+# Lower number = higher priority (get_role() values)
+ROLE_PRIORITY = {"owner": 0, "admin": 1, "mod": 2, "none": 3}
+DEFAULT_PRIORITY = ROLE_PRIORITY["none"]
+
+
+def priority_for_role(role: str) -> int:
+    return ROLE_PRIORITY.get(role, DEFAULT_PRIORITY)
+
+
+class _Waiter:
+    __slots__ = ("user_id", "priority", "future", "on_position", "last_pos", "last_notify")
+
+    def __init__(self, user_id, priority, future, on_position):
+        self.user_id = user_id
+        self.priority = priority
+        self.future = future
+        self.on_position = on_position
+        self.last_pos = None
+        self.last_notify = 0.0
+
+
+class DownloadScheduler:
+    """
+    Handlers aur asli download work ke beech ka gate.
+
+        async with SCHEDULER.slot(user_id, priority, on_position=cb):
+            ... download + upload ...
+
+    `on_position(pos)` async callback hai – queue position badalne pe
+    call hota hai (har waiter ke liye max ek baar / notify_interval sec).
+    """
+
+    def __init__(self, max_active: int, per_user: int, notify_interval: float = 5.0):
+        self.max_active = max(1, int(max_active))
+        self.per_user = max(1, int(per_user))
+        self.notify_interval = float(notify_interval)
+
+        # priority -> OrderedDict(user_id -> deque[_Waiter]); dict order = round-robin order
+        self._queues = defaultdict(OrderedDict)
+        self._active_per_user = defaultdict(int)
+        self.active = 0
+        self.queued = 0
+        self.completed = 0
+        # Throttle me daba position update – interval baad ek trailing notify
+        self._trailing = None
+
+    # ---------- public ----------
+
+    @asynccontextmanager
+    async def slot(self, user_id: int, priority: int = DEFAULT_PRIORITY, on_position=None):
+        await self._acquire(user_id, priority, on_position)
+        try:
+            yield
+        finally:
+            self._release(user_id)
+
+    def stats(self) -> dict:
+        return {
+            "active": self.active,
+            "max_active": self.max_active,
+            "queued": self.queued,
+            "per_user": self.per_user,
+            "completed": self.completed,
+        }
+
+    # ---------- internals ----------
+
+    def _can_start(self, user_id) -> bool:
+        return self.active < self.max_active and self._active_per_user[user_id] < self.per_user
+
+    def _take(self, user_id):
+        self.active += 1
+        self._active_per_user[user_id] += 1
+
+    async def _acquire(self, user_id, priority, on_position):
+        # Fast path – koi line me nahi aur slot free hai
+        if self.queued == 0 and self._can_start(user_id):
+            self._take(user_id)
+            return
+
+        loop = asyncio.get_running_loop()
+        waiter = _Waiter(user_id, priority, loop.create_future(), on_position)
+        self._queues[priority].setdefault(user_id, deque()).append(waiter)
+        self.queued += 1
+        self._dispatch()
+
+        try:
+            await waiter.future
+        except asyncio.CancelledError:
+            if waiter.future.done() and not waiter.future.cancelled():
+                # Slot mil chuka tha par task cancel ho gaya – wapas do
+                self._release(user_id)
+            else:
+                self._remove(waiter)
+                self._dispatch()
+            raise
+
+    def _release(self, user_id):
+        self.active -= 1
+        self.completed += 1
+        self._active_per_user[user_id] -= 1
+        if self._active_per_user[user_id] <= 0:
+            del self._active_per_user[user_id]
+        self._dispatch()
+
+    def _remove(self, waiter):
+        users = self._queues.get(waiter.priority)
+        if not users:
+            return
+        q = users.get(waiter.user_id)
+        if q is None:
+            return
+        try:
+            q.remove(waiter)
+            self.queued -= 1
+        except ValueError:
+            return
+        if not q:
+            del users[waiter.user_id]
+
+    def _next_waiter(self):
+        for priority in sorted(self._queues):
+            users = self._queues[priority]
+            for user_id in list(users):
+                if self._active_per_user[user_id] >= self.per_user:
+                    continue
+                q = users[user_id]
+                # Cancel ho chuke waiters (cleanup agle loop tick me hota hai) – hatao
+                while q and q[0].future.done():
+                    q.popleft()
+                    self.queued -= 1
+                if not q:
+                    del users[user_id]
+                    continue
+                waiter = q.popleft()
+                # Round-robin: is user ko line ke end me bhejo
+                del users[user_id]
+                if q:
+                    users[user_id] = q
+                return waiter
+        return None
+
+    def _dispatch(self):
+        while self.active < self.max_active:
+            waiter = self._next_waiter()
+            if waiter is None:
+                break
+            self.queued -= 1
+            self._take(waiter.user_id)
+            waiter.future.set_result(True)
+        self._notify_positions()
+
+    def _ordered_waiters(self):
+        """Expected start order: tier by tier, users round-robin."""
+        for priority in sorted(self._queues):
+            queues = [q for q in self._queues[priority].values() if q]
+            depth = 0
+            while queues:
+                for q in queues:
+                    yield q[depth]
+                depth += 1
+                queues = [q for q in queues if depth < len(q)]
+
+    def _notify_positions(self):
+        now = time.monotonic()
+        delay = None
+        for pos, waiter in enumerate(self._ordered_waiters(), start=1):
+            if waiter.on_position is None or waiter.last_pos == pos:
+                continue
+            if waiter.last_pos is not None and now - waiter.last_notify < self.notify_interval:
+                # Abhi nahi – par queue shaant ho jaye to bhi baad me bhejna hai
+                wait = self.notify_interval - (now - waiter.last_notify)
+                delay = wait if delay is None else min(delay, wait)
+                continue
+            waiter.last_pos = pos
+            waiter.last_notify = now
+            asyncio.ensure_future(self._safe_notify(waiter.on_position, pos))
+        if delay is not None and self._trailing is None:
+            self._trailing = asyncio.get_running_loop().call_later(delay, self._trailing_notify)
+
+    def _trailing_notify(self):
+        self._trailing = None
+        self._notify_positions()
+
+    @staticmethod
+    async def _safe_notify(callback, pos):
+        try:
+            await callback(pos)
+        except Exception as e:
+            LOG.debug("queue position notify failed: %s", e)
+
+
+# Shared scheduler – YouTube + Instagram dono isi se guzarte hain
+SCHEDULER = DownloadScheduler(
+    Config.MAX_ACTIVE_JOBS,
+    Config.MAX_JOBS_PER_USER,
+    Config.QUEUE_NOTIFY_INTERVAL,
+)
+
+
+def scheduler_status_text() -> str:
+    """Admin panel ke liye short status line."""
+    s = SCHEDULER.stats()
+    return (
+        f"• Download jobs: `{s['active']}/{s['max_active']}` active, "
+        f"`{s['queued']}` in queue\n"
+    )
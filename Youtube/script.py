@@ -40,6 +40,9 @@ Simple UI | Clean Design | Premium Quality
 2️⃣ Bot will show you **Video qualities** + **MP3 option**  
 3️⃣ Select and wait — bot will upload the file directly to you  
 
+✂️ Sirf ek hissa chahiye? Link ke baad range likho:  
+`https://youtu.be/xxxx 1:30-2:00`  
+
 ⚠️ Note:  
 You must join the **Spidy 🕷 Gaming** update channel to use this bot  
 (Force Subscribe enabled)
@@ -0,0 +1,112 @@
+# ============================================================
+#   Module: Single-flight (in-flight download dedup)
+#   Developer: Tushar Davera
+#   Description:
+#       • Same video + format + mode ke parallel requests ek hi
+#         download share karte hain
+#       • Pehla request "leader" – baaki "followers" result ka
+#         wait karte hain aur apni chat me upload karte hain
+#       • Last reference release hone pe hi files cleanup hoti hain
+#       • Leader cancel kare aur followers wait kar rahe hon to
+#         download chalta rehta hai (sirf leader ki chat alag)
+#       • Hit counters (bandwidth / CPU saved) admin /server me
+# ============================================================
+
+import asyncio
+
+from Youtube.forcesub import humanbytes
+
+
+class Flight:
+    """Ek in-flight download. Leader resolve/fail karta hai, baaki wait."""
+
+    __slots__ = ("key", "owner", "refs", "result", "error", "_done")
+
+    def __init__(self, key):
+        self.key = key
+        # Leader ka job id (detached leader ko last follower rok sake)
+        self.owner = None
+        self.refs = 1
+        self.result = None
+        self.error = None
+        self._done = asyncio.Event()
+
+    @property
+    def done(self) -> bool:
+        return self._done.is_set()
+
+    def resolve(self, result):
+        self.result = result
+        self._done.set()
+
+    def fail(self, error: BaseException):
+        self.error = error
+        self._done.set()
+
+    async def wait(self):
+        await self._done.wait()
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+
+class SingleFlight:
+    """
+        flight, leader = FLIGHTS.join(key)
+        try:
+            if leader: ... flight.resolve(media) / flight.fail(e)
+            else:      media = await flight.wait()
+        finally:
+            if FLIGHTS.release(flight): cleanup(media)
+    """
+
+    def __init__(self):
+        self._flights = {}
+        self.leads = 0
+        self.hits = 0
+        self.bytes_saved = 0
+
+    def join(self, key):
+        flight = self._flights.get(key)
+        if flight is not None:
+            flight.refs += 1
+            self.hits += 1
+            return flight, False
+        flight = Flight(key)
+        self._flights[key] = flight
+        self.leads += 1
+        return flight, True
+
+    def release(self, flight: Flight) -> bool:
+        """True – ye last reference tha (ab files cleanup kar sakte ho)."""
+        flight.refs -= 1
+        if flight.refs > 0:
+            return False
+        if self._flights.get(flight.key) is flight:
+            del self._flights[flight.key]
+        return True
+
+    def add_saved(self, nbytes: int):
+        if nbytes:
+            self.bytes_saved += int(nbytes)
+
+    def stats(self) -> dict:
+        return {
+            "in_flight": len(self._flights),
+            "leads": self.leads,
+            "hits": self.hits,
+            "bytes_saved": self.bytes_saved,
+        }
+
+
+# Shared across YouTube handlers
+DOWNLOAD_FLIGHTS = SingleFlight()
+
+
+def flight_status_text() -> str:
+    """Admin panel ke liye short status line."""
+    f = DOWNLOAD_FLIGHTS.stats()
+    return (
+        f"• Shared downloads: `{f['hits']}` dedup hits, "
+        f"`{humanbytes(f['bytes_saved'])}` saved, `{f['in_flight']}` in flight\n"
+    )
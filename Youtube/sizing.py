@@ -0,0 +1,190 @@
+# ============================================================
+#   Module: Size Gate helpers
+#   Developer: Tushar Davera
+#   Description:
+#       • Download se pehle size estimate (filesize / approx /
+#         duration × bitrate)
+#       • Download ke beech limit cross ho to abort (progress hook) –
+#         DASH pair ke dono parts milake ek hi limit
+#       • "Best quality that fits" format picker
+#       • DASH video+audio pairs (stream-copy merge ke liye)
+# ============================================================
+
+import threading
+
+# Telegram size safety limit (~1.9 GB)
+TELEGRAM_MAX_BYTES = 1_900_000_000
+
+# MP3 output bitrate (FFmpegExtractAudio preferredquality)
+MP3_KBPS = 192
+
+
+class FileTooLarge(Exception):
+    """Estimate ya downloaded bytes Telegram limit se upar."""
+
+    def __init__(self, size: int = None, limit: int = TELEGRAM_MAX_BYTES):
+        super().__init__(f"file too large: {size} > {limit}")
+        self.size = size
+        self.limit = limit
+
+
+def estimate_size(fmt: dict, duration=None):
+    """Bytes estimate for one format dict – None if kuch pata nahi."""
+    if not fmt:
+        return None
+    size = fmt.get("filesize") or fmt.get("filesize_approx")
+    if size:
+        return int(size)
+    # tbr = total bitrate in kbit/s
+    tbr = fmt.get("tbr") or ((fmt.get("vbr") or 0) + (fmt.get("abr") or 0))
+    if tbr and duration:
+        return int(tbr * 1000 / 8 * duration)
+    return None
+
+
+def is_muxed(fmt: dict) -> bool:
+    acodec = fmt.get("acodec")
+    vcodec = fmt.get("vcodec")
+    return bool(fmt.get("format_id")) and acodec not in (None, "none") and vcodec not in (None, "none")
+
+
+def is_audio_only(fmt: dict) -> bool:
+    return fmt.get("acodec") not in (None, "none") and fmt.get("vcodec") in (None, "none")
+
+
+def find_format(formats, format_id: str):
+    for f in formats or []:
+        if f.get("format_id") == format_id:
+            return f
+    return None
+
+
+def best_audio(formats):
+    """Highest bitrate audio-only stream (yt-dlp `bestaudio` jaisa)."""
+    audios = [f for f in formats or [] if is_audio_only(f)]
+    if not audios:
+        return None
+    return max(audios, key=lambda f: (f.get("abr") or f.get("tbr") or 0))
+
+
+def is_video_only(fmt: dict) -> bool:
+    return fmt.get("vcodec") not in (None, "none") and fmt.get("acodec") in (None, "none")
+
+
+# MP4 me stream-copy ke liye codec preference (lower = better)
+_VCODEC_RANK = (("avc1", 0), ("h264", 0), ("av01", 1), ("vp09", 2), ("vp9", 2))
+
+
+def _vcodec_rank(fmt: dict) -> int:
+    vcodec = (fmt.get("vcodec") or "").lower()
+    for prefix, rank in _VCODEC_RANK:
+        if vcodec.startswith(prefix):
+            return rank
+    return 9
+
+
+def dash_pairs(formats, duration):
+    """
+    Separate video + audio streams ke "virtual" muxed formats –
+    har height ke liye ek, sirf muxed formats se upar wali heights.
+    format_id = "<video>+<audio>", ext hamesha mp4 (ffmpeg copy merge).
+    Audio AAC (m4a) prefer karte hain taaki MP4 copy hamesha chale.
+    """
+    formats = formats or []
+    audios = [f for f in formats if is_audio_only(f) and f.get("format_id")]
+    if not audios:
+        return []
+    aac = [f for f in audios if (f.get("acodec") or "").startswith("mp4a")]
+    audio = max(aac or audios, key=lambda f: (f.get("abr") or f.get("tbr") or 0))
+
+    max_muxed = max((f.get("height") or 0 for f in formats if is_muxed(f)), default=0)
+
+    best_by_height = {}
+    for f in formats:
+        height = f.get("height") or 0
+        if not f.get("format_id") or not is_video_only(f) or height <= max_muxed:
+            continue
+        if "m3u8" in (f.get("protocol") or ""):
+            continue
+        key = (-_vcodec_rank(f), f.get("tbr") or 0)
+        cur = best_by_height.get(height)
+        if cur is None or key > cur[0]:
+            best_by_height[height] = (key, f)
+
+    pairs = []
+    for height in sorted(best_by_height, reverse=True):
+        video = best_by_height[height][1]
+        v_size = estimate_size(video, duration)
+        a_size = estimate_size(audio, duration)
+        pairs.append({
+            "format_id": f"{video['format_id']}+{audio['format_id']}",
+            "ext": "mp4",
+            "height": height,
+            "vcodec": video.get("vcodec"),
+            "acodec": audio.get("acodec"),
+            "tbr": (video.get("tbr") or 0) + (audio.get("tbr") or 0),
+            "filesize_approx": (v_size + a_size) if v_size and a_size else None,
+        })
+    return pairs
+
+
+def pick_best_fit(formats, duration, limit: int = TELEGRAM_MAX_BYTES):
+    """
+    Sabse achha muxed format (ya DASH pair) jiska estimate `limit` ke andar ho.
+    Unknown size wale formats skip – guarantee nahi de sakte.
+    """
+    fitting = []
+    for f in formats or []:
+        if not is_muxed(f):
+            continue
+        size = estimate_size(f, duration)
+        if size and size <= limit:
+            fitting.append(f)
+    if not fitting:
+        return None
+    return max(fitting, key=lambda f: (f.get("height") or 0, f.get("tbr") or 0))
+
+
+def size_guard_hook(limit: int = TELEGRAM_MAX_BYTES):
+    """
+    yt-dlp progress hook: downloaded (ya announced total) bytes limit
+    cross kare to FileTooLarge raise – download wahi ruk jata hai.
+    """
+    def hook(d: dict):
+        if d.get("status") != "downloading":
+            return
+        total = d.get("total_bytes")
+        done = d.get("downloaded_bytes") or 0
+        if done > limit:
+            raise FileTooLarge(done, limit)
+        if total and total > limit:
+            raise FileTooLarge(total, limit)
+    return hook
+
+
+class CombinedSizeGuard:
+    """
+    Alag-alag download hone wale parts (DASH video + audio) jo ek file me
+    merge honge – sabke bytes milake limit check. Har part ka apna hook:
+    `guard.hook("v")`, `guard.hook("a")` (alag threads se call safe).
+    """
+
+    def __init__(self, limit: int = TELEGRAM_MAX_BYTES):
+        self.limit = limit
+        self._lock = threading.Lock()
+        self._parts = {}
+
+    def hook(self, part: str):
+        def hook(d: dict):
+            if d.get("status") != "downloading":
+                return
+            done = d.get("downloaded_bytes") or 0
+            with self._lock:
+                self._parts[part] = (done, max(done, d.get("total_bytes") or 0))
+                done = sum(p[0] for p in self._parts.values())
+                expected = sum(p[1] for p in self._parts.values())
+            if done > self.limit:
+                raise FileTooLarge(done, self.limit)
+            if expected > self.limit:
+                raise FileTooLarge(expected, self.limit)
+        return hook
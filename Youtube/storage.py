@@ -0,0 +1,223 @@
+# ============================================================
+#   Module: Storage Manager (downloads/ staging dir)
+#   Developer: Tushar Davera
+#   Description:
+#       • Job start se pehle estimated bytes reserve karo
+#       • Disk kam ho to job wait karta hai, timeout pe refuse
+#       • Reservation ka jo hissa disk pe likh chuka (tag prefix wali
+#         files) woh free space me already ghata hai – dobara nahi
+#       • Background janitor – purani / orphan staging files
+#         (.part, .ytdl, crash leftovers) age ke hisaab se delete
+#       • Usage report admin panel (/server) ke liye
+# ============================================================
+
+import os
+import time
+import shutil
+import asyncio
+import logging
+import itertools
+
+from Youtube.config import Config
+from Youtube.forcesub import humanbytes
+
+LOG = logging.getLogger(__name__)
+
+# Shared by youtube.py + instagram.py (+ thumbnails)
+DOWNLOAD_DIR = "downloads"
+os.makedirs(DOWNLOAD_DIR, exist_ok=True)
+
+MB = 1024 * 1024
+
+
+class InsufficientStorage(Exception):
+    """Disk pe itni jagah nahi (reservations + min free ke baad)."""
+
+
+class StorageManager:
+
+    def __init__(self, root: str, min_free: int, wait_timeout: float,
+                 max_age: float, sweep_interval: float):
+        self.root = root
+        self.min_free = int(min_free)
+        self.wait_timeout = float(wait_timeout)
+        self.max_age = float(max_age)
+        self.sweep_interval = float(sweep_interval)
+        self._ids = itertools.count(1)
+        self._reservations = {}   # ticket -> (nbytes, tag)
+        self._pinned = set()      # journal ke resumable jobs ke prefixes
+        self.reserved = 0
+        self.refused = 0
+        self.swept_files = 0
+        self.swept_bytes = 0
+        self._janitor = None
+
+    # ---------- space ----------
+
+    def free_bytes(self) -> int:
+        return shutil.disk_usage(self.root).free
+
+    def _staged_bytes(self, tags) -> dict:
+        """tag -> staging dir me us prefix ki files ka total size."""
+        staged = dict.fromkeys(tags, 0)
+        try:
+            entries = list(os.scandir(self.root))
+        except FileNotFoundError:
+            return staged
+        for entry in entries:
+            tag = next((t for t in tags if entry.name.startswith(t)), None)
+            if tag is None:
+                continue
+            try:
+                if entry.is_file(follow_symlinks=False):
+                    staged[tag] += entry.stat().st_size
+            except FileNotFoundError:
+                continue
+        return staged
+
+    def outstanding(self) -> int:
+        """Reservations ka woh hissa jo abhi disk pe likha nahi gaya."""
+        by_tag = {}
+        untagged = 0
+        for nbytes, tag in self._reservations.values():
+            if tag:
+                by_tag[tag] = by_tag.get(tag, 0) + nbytes
+            else:
+                untagged += nbytes
+        if not by_tag:
+            return untagged
+        staged = self._staged_bytes(by_tag)
+        return untagged + sum(max(0, n - staged[tag]) for tag, n in by_tag.items())
+
+    def available(self) -> int:
+        """
+        Free space jo naye jobs ko mil sakti hai. Likhe ja chuke bytes
+        free_bytes() me already ghat chuke – sirf baaki reservation ghatao.
+        """
+        return self.free_bytes() - self.outstanding() - self.min_free
+
+    async def reserve(self, nbytes: int, tag: str = ""):
+        """
+        `nbytes` reserve karo; jagah na ho to `wait_timeout` tak wait,
+        phir InsufficientStorage. Returns ticket – `release(ticket)` zaroor karna.
+        """
+        nbytes = max(0, int(nbytes or 0))
+        deadline = time.monotonic() + self.wait_timeout
+        while self.available() < nbytes:
+            if time.monotonic() >= deadline:
+                self.refused += 1
+                raise InsufficientStorage(
+                    f"need {humanbytes(nbytes)}, available {humanbytes(max(0, self.available()))}"
+                )
+            await asyncio.sleep(2)
+
+        ticket = next(self._ids)
+        self._reservations[ticket] = (nbytes, tag)
+        self.reserved += nbytes
+        return ticket
+
+    def release(self, ticket):
+        item = self._reservations.pop(ticket, None)
+        if item is not None:
+            self.reserved -= item[0]
+
+    def pin(self, tag: str):
+        """Tag ki files janitor se bachao (restart ke baad resume hona hai)."""
+        if tag:
+            self._pinned.add(tag)
+
+    def unpin(self, tag: str):
+        self._pinned.discard(tag)
+
+    def active_tags(self) -> set:
+        return {tag for _, tag in self._reservations.values() if tag} | self._pinned
+
+    # ---------- janitor ----------
+
+    def sweep(self, max_age: float = None) -> int:
+        """
+        `max_age` se purani staging files delete karo (shutdown pe 0 = sab).
+        Active reservation / pinned tags (job prefixes) ko chhod dete hain.
+        """
+        max_age = self.max_age if max_age is None else float(max_age)
+        now = time.time()
+        protected = self.active_tags()
+        removed = 0
+        try:
+            entries = list(os.scandir(self.root))
+        except FileNotFoundError:
+            return 0
+        for entry in entries:
+            if not entry.is_file(follow_symlinks=False):
+                continue
+            if any(entry.name.startswith(tag) for tag in protected):
+                continue
+            try:
+                st = entry.stat()
+                if now - st.st_mtime < max_age:
+                    continue
+                os.remove(entry.path)
+                removed += 1
+                self.swept_files += 1
+                self.swept_bytes += st.st_size
+            except FileNotFoundError:
+                continue
+            except Exception as e:
+                LOG.warning("janitor could not remove %s: %s", entry.path, e)
+        if removed:
+            LOG.info("janitor removed %d stale staging files", removed)
+        return removed
+
+    async def _janitor_loop(self):
+        while True:
+            try:
+                self.sweep()
+            except Exception:
+                LOG.exception("janitor sweep failed")
+            await asyncio.sleep(self.sweep_interval)
+
+    def start_janitor(self):
+        if self._janitor is None or self._janitor.done():
+            self._janitor = asyncio.get_running_loop().create_task(self._janitor_loop())
+
+    # ---------- stats ----------
+
+    def usage(self) -> dict:
+        files = 0
+        size = 0
+        try:
+            for entry in os.scandir(self.root):
+                if entry.is_file(follow_symlinks=False):
+                    files += 1
+                    size += entry.stat().st_size
+        except FileNotFoundError:
+            pass
+        return {
+            "free": self.free_bytes(),
+            "staging_files": files,
+            "staging_bytes": size,
+            "reserved": self.reserved,
+            "reservations": len(self._reservations),
+            "refused": self.refused,
+            "swept_files": self.swept_files,
+        }
+
+
+STORAGE = StorageManager(
+    DOWNLOAD_DIR,
+    Config.STORAGE_MIN_FREE_MB * MB,
+    Config.STORAGE_WAIT,
+    Config.JANITOR_MAX_AGE,
+    Config.JANITOR_INTERVAL,
+)
+
+
+def storage_status_text() -> str:
+    """Admin panel ke liye short status line."""
+    u = STORAGE.usage()
+    return (
+        f"• Disk free: `{humanbytes(u['free'])}` | staging: `{humanbytes(u['staging_bytes'])}` "
+        f"(`{u['staging_files']}` files)\n"
+        f"• Reserved: `{humanbytes(u['reserved'])}` for `{u['reservations']}` jobs, "
+        f"refused `{u['refused']}`, janitor cleaned `{u['swept_files']}`\n"
+    )
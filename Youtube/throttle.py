@@ -0,0 +1,290 @@
+# ============================================================
+#   Module: Adaptive Extraction Limiter + Circuit Breaker
+#   Developer: Tushar Davera
+#   Description:
+#       • Har source (youtube / instagram) ki alag concurrency limit
+#       • AIMD: success pe limit dheere badhti hai (+1 per window),
+#         429 / "confirm you're not a bot" pe aadhi ho jaati hai
+#       • Lagatar throttling = circuit breaker OPEN – cooldown tak
+#         naye extractions queue me (max BREAKER_MAX_WAIT), fir
+#         HALF-OPEN me ek probe, success pe CLOSED
+#       • Breaker state /server me + trip pe owners ko message
+# ============================================================
+
+import time
+import asyncio
+import logging
+from collections import deque
+from contextlib import asynccontextmanager
+
+from Youtube.config import Config
+
+LOG = logging.getLogger(__name__)
+
+# Upstream throttling ke error signatures (lowercase match)
+THROTTLE_SIGNATURES = (
+    "http error 429",
+    "too many requests",
+    # Sirf bot-check – "Sign in to confirm your age" (age gate) throttling nahi hai
+    "confirm you're not a bot",
+    "confirm you’re not a bot",
+    "rate-limit reached",
+    "rate limit reached",
+    "please wait a few minutes",
+)
+
+STATE_CLOSED = "closed"
+STATE_OPEN = "open"
+STATE_HALF_OPEN = "half-open"
+
+# Release outcomes
+OUTCOME_OK = "ok"
+OUTCOME_THROTTLED = "throttled"
+OUTCOME_SLOW = "slow"
+OUTCOME_NEUTRAL = "neutral"
+
+
+class CircuitOpen(Exception):
+    """Source abhi throttled hai – cooldown `retry_after` sec."""
+
+    def __init__(self, source: str, retry_after: float):
+        super().__init__(f"{source} circuit open, retry after {int(retry_after)}s")
+        self.source = source
+        self.retry_after = retry_after
+
+
+def is_throttle_error(exc: BaseException) -> bool:
+    text = str(exc).lower()
+    return any(sig in text for sig in THROTTLE_SIGNATURES)
+
+
+def _classify(exc: BaseException) -> str:
+    # Import yaha – watchdog <-> throttle circular na bane
+    from Youtube.watchdog import StageTimeout
+
+    if is_throttle_error(exc):
+        return OUTCOME_THROTTLED
+    if isinstance(exc, StageTimeout):
+        return OUTCOME_SLOW
+    # Private / removed video, cancel etc. – load ka signal nahi
+    return OUTCOME_NEUTRAL
+
+
+class AdaptiveLimiter:
+
+    def __init__(self, source: str, min_limit: int, max_limit: int, trip_threshold: int,
+                 cooldown: float, max_cooldown: float, max_wait: float):
+        self.source = source
+        self.min_limit = max(1, int(min_limit))
+        self.max_limit = max(self.min_limit, int(max_limit))
+        self.trip_threshold = max(1, int(trip_threshold))
+        self.base_cooldown = float(cooldown)
+        self.max_cooldown = max(self.base_cooldown, float(max_cooldown))
+        self.max_wait = float(max_wait)
+
+        self.limit = float(self.max_limit)
+        self.active = 0
+        self.state = STATE_CLOSED
+        self.open_until = 0.0
+        self.cooldown = self.base_cooldown
+        self._strikes = 0
+        self._waiters = deque()
+        self.on_trip = None
+
+        self.successes = 0
+        self.throttled = 0
+        self.trips = 0
+        self.rejected = 0
+
+    # ---------- public ----------
+
+    @asynccontextmanager
+    async def slot(self):
+        """Ek extraction ka slot – exception dekh ke limit adjust hoti hai."""
+        await self._acquire()
+        outcome = OUTCOME_NEUTRAL
+        try:
+            yield
+            outcome = OUTCOME_OK
+        except BaseException as e:
+            outcome = _classify(e)
+            raise
+        finally:
+            self._release(outcome)
+
+    def retry_after(self) -> float:
+        return max(0.0, self.open_until - time.monotonic())
+
+    def stats(self) -> dict:
+        self._refresh_state()
+        return {
+            "source": self.source,
+            "state": self.state,
+            "limit": self.limit,
+            "max_limit": self.max_limit,
+            "active": self.active,
+            "queued": len(self._waiters),
+            "retry_after": self.retry_after(),
+            "successes": self.successes,
+            "throttled": self.throttled,
+            "trips": self.trips,
+            "rejected": self.rejected,
+        }
+
+    # ---------- internals ----------
+
+    def _refresh_state(self):
+        if self.state == STATE_OPEN and time.monotonic() >= self.open_until:
+            self.state = STATE_HALF_OPEN
+
+    def _can_start(self) -> bool:
+        self._refresh_state()
+        if self.state == STATE_OPEN:
+            return False
+        if self.state == STATE_HALF_OPEN:
+            # Sirf ek probe request
+            return self.active == 0
+        return self.active < int(self.limit)
+
+    async def _acquire(self):
+        self._refresh_state()
+        if self.state == STATE_OPEN and self.retry_after() > self.max_wait:
+            self.rejected += 1
+            raise CircuitOpen(self.source, self.retry_after())
+
+        if not self._waiters and self._can_start():
+            self.active += 1
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        self._waiters.append(future)
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # Slot mil chuka tha – wapas do
+                self._release(OUTCOME_NEUTRAL)
+            else:
+                try:
+                    self._waiters.remove(future)
+                except ValueError:
+                    pass
+            raise
+
+    def _dispatch(self):
+        while self._waiters and self._can_start():
+            future = self._waiters.popleft()
+            if future.done():
+                continue
+            self.active += 1
+            future.set_result(None)
+
+    def _release(self, outcome: str):
+        self.active -= 1
+        if outcome == OUTCOME_OK:
+            self.successes += 1
+            self._strikes = 0
+            if self.state == STATE_HALF_OPEN:
+                LOG.info("breaker %s: probe ok, closed", self.source)
+                self.state = STATE_CLOSED
+                self.cooldown = self.base_cooldown
+            # Additive increase – har `limit` successes pe +1
+            self.limit = min(float(self.max_limit), self.limit + 1.0 / self.limit)
+        elif outcome == OUTCOME_THROTTLED:
+            self.throttled += 1
+            self._strikes += 1
+            # Multiplicative decrease
+            self.limit = max(float(self.min_limit), self.limit / 2)
+            # Trip se pehle shuru hue in-flight requests dobara trip nahi karte
+            if self.state == STATE_HALF_OPEN or (
+                self.state == STATE_CLOSED and self._strikes >= self.trip_threshold
+            ):
+                self._trip()
+        elif outcome == OUTCOME_SLOW:
+            self.limit = max(float(self.min_limit), self.limit * 0.75)
+        self._dispatch()
+
+    def _trip(self):
+        if self.state == STATE_HALF_OPEN:
+            # Probe bhi throttle hua – cooldown double
+            self.cooldown = min(self.max_cooldown, self.cooldown * 2)
+        self.state = STATE_OPEN
+        self.open_until = time.monotonic() + self.cooldown
+        self._strikes = 0
+        self.trips += 1
+        LOG.warning("breaker %s: OPEN for %.0fs (limit now %.1f)", self.source, self.cooldown, self.limit)
+
+        loop = asyncio.get_running_loop()
+        # Cooldown ke baad queue wale waiters ko probe ka mauka
+        loop.call_later(self.cooldown, self._dispatch)
+
+        # Itna lamba wait users ko nahi karwana – queue wale turant refuse
+        if self.cooldown > self.max_wait:
+            while self._waiters:
+                future = self._waiters.popleft()
+                if not future.done():
+                    self.rejected += 1
+                    future.set_exception(CircuitOpen(self.source, self.cooldown))
+
+        if self.on_trip is not None:
+            loop.create_task(self.on_trip(self))
+
+
+def _limiter(source: str) -> AdaptiveLimiter:
+    return AdaptiveLimiter(
+        source,
+        Config.EXTRACT_MIN_CONCURRENCY,
+        Config.EXTRACT_MAX_CONCURRENCY,
+        Config.BREAKER_TRIP_THRESHOLD,
+        Config.BREAKER_COOLDOWN,
+        Config.BREAKER_MAX_COOLDOWN,
+        Config.BREAKER_MAX_WAIT,
+    )
+
+
+# Source -> limiter
+LIMITERS = {
+    "youtube": _limiter("youtube"),
+    "instagram": _limiter("instagram"),
+}
+
+
+async def limited(source: str, factory):
+    """`factory()` coroutine ko source ke adaptive limiter / breaker ke andar chalao."""
+    async with LIMITERS[source].slot():
+        return await factory()
+
+
+def attach_notifier(client, chat_ids):
+    """Breaker trip hone pe in chats (owners) ko message."""
+    async def notify(limiter: AdaptiveLimiter):
+        text = (
+            f"🔴 **{limiter.source.title()} throttling detected**\n"
+            f"Circuit breaker OPEN for `{int(limiter.cooldown)}s`, "
+            f"concurrency ab `{limiter.limit:.1f}`."
+        )
+        for chat_id in chat_ids:
+            try:
+                await client.send_message(chat_id, text)
+            except Exception as e:
+                LOG.debug("breaker notify failed for %s: %s", chat_id, e)
+
+    for limiter in LIMITERS.values():
+        limiter.on_trip = notify
+
+
+def throttle_status_text() -> str:
+    """Admin panel ke liye short status line."""
+    lines = []
+    for limiter in LIMITERS.values():
+        s = limiter.stats()
+        icon = {STATE_CLOSED: "🟢", STATE_HALF_OPEN: "🟡", STATE_OPEN: "🔴"}[s["state"]]
+        state = s["state"]
+        if s["state"] == STATE_OPEN:
+            state += f" ({int(s['retry_after'])}s)"
+        lines.append(
+            f"• {icon} {s['source'].title()} extract: `{state}`, "
+            f"limit `{s['limit']:.1f}/{s['max_limit']}`, active `{s['active']}`, "
+            f"queued `{s['queued']}`, 429s `{s['throttled']}`, trips `{s['trips']}`\n"
+        )
+    return "".join(lines)
@@ -0,0 +1,199 @@
+# ============================================================
+#   Module: FFmpeg Pool (transcode / remux / merge)
+#   Developer: Tushar Davera
+#   Description:
+#       • ffmpeg jobs yt-dlp worker threads se alag, apne pool me
+#       • Concurrency CPU cores se derive (FFMPEG_WORKERS=0 -> auto)
+#       • Har job ko limited threads + optional `nice` priority,
+#         taaki downloads / Telegram I/O chalte rahein
+#       • Clip cut bhi yahi – remote stream pe seek + stream copy,
+#         child process hai to ⛔ Cancel / watchdog turant kill
+#       • Queue / active counters admin /server ke liye
+# ============================================================
+
+import os
+import asyncio
+import logging
+
+from Youtube.config import Config
+
+LOG = logging.getLogger(__name__)
+
+FFMPEG_BIN = "ffmpeg"
+
+
+def cpu_count() -> int:
+    """Container ko mile hue cores (affinity), warna os.cpu_count()."""
+    try:
+        return max(1, len(os.sched_getaffinity(0)))
+    except (AttributeError, OSError):
+        return max(1, os.cpu_count() or 1)
+
+
+class FFmpegError(Exception):
+    """ffmpeg non-zero exit; message me stderr ki last lines."""
+
+
+class FFmpegPool:
+
+    def __init__(self, size: int, nice: int, cores: int):
+        self.size = max(1, int(size))
+        self.nice = int(nice)
+        # Har job ko cores ka barabar hissa
+        self.threads = max(1, cores // self.size)
+        self._sem = asyncio.Semaphore(self.size)
+        self.queued = 0
+        self.active = 0
+        self.completed = 0
+        self.failed = 0
+
+    def _set_priority(self, pid: int):
+        if self.nice <= 0 or not hasattr(os, "setpriority"):
+            return
+        try:
+            os.setpriority(os.PRIO_PROCESS, pid, self.nice)
+        except OSError as e:
+            LOG.debug("ffmpeg setpriority failed: %s", e)
+
+    async def run(self, args: list):
+        """
+        `ffmpeg <args>` chalao (last arg = output file).
+        Slot free hone tak wait karta hai; cancel hone pe process kill.
+        """
+        self.queued += 1
+        try:
+            await self._sem.acquire()
+        finally:
+            self.queued -= 1
+
+        self.active += 1
+        try:
+            cmd = [FFMPEG_BIN, "-hide_banner", "-nostdin", "-y", *args[:-1],
+                   "-threads", str(self.threads), args[-1]]
+            proc = await asyncio.create_subprocess_exec(
+                *cmd,
+                stdout=asyncio.subprocess.DEVNULL,
+                stderr=asyncio.subprocess.PIPE,
+            )
+            self._set_priority(proc.pid)
+            try:
+                _, stderr = await proc.communicate()
+            except asyncio.CancelledError:
+                proc.kill()
+                await proc.wait()
+                raise
+
+            if proc.returncode != 0:
+                self.failed += 1
+                tail = (stderr or b"").decode(errors="ignore").strip().splitlines()[-3:]
+                raise FFmpegError(f"ffmpeg exit {proc.returncode}: " + " | ".join(tail))
+            self.completed += 1
+        finally:
+            self.active -= 1
+            self._sem.release()
+
+    def stats(self) -> dict:
+        return {
+            "size": self.size,
+            "threads": self.threads,
+            "nice": self.nice,
+            "queued": self.queued,
+            "active": self.active,
+            "completed": self.completed,
+            "failed": self.failed,
+        }
+
+
+_CORES = cpu_count()
+FFMPEG_POOL = FFmpegPool(
+    Config.FFMPEG_WORKERS or max(1, _CORES // 2),
+    Config.FFMPEG_NICE,
+    _CORES,
+)
+
+
+async def to_mp3(src: str, dst: str, kbps: int):
+    """Audio stream ko MP3 me encode (sirf jab user ne MP3 manga ho)."""
+    await FFMPEG_POOL.run(["-i", src, "-vn", "-c:a", "libmp3lame", "-b:a", f"{kbps}k", dst])
+
+
+# Audio codec -> container jisme stream-copy ho sakta hai
+_AUDIO_CONTAINERS = {
+    "mp4a": "m4a",
+    "aac": "m4a",
+    "alac": "m4a",
+    "opus": "ogg",
+    "vorbis": "ogg",
+    "mp3": "mp3",
+    "flac": "flac",
+}
+
+
+def native_audio_ext(acodec: str):
+    """`mp4a.40.2` -> `m4a`, `opus` -> `ogg` ... None = copy possible nahi."""
+    base = (acodec or "").split(".")[0].lower()
+    return _AUDIO_CONTAINERS.get(base)
+
+
+async def remux_audio(src: str, dst: str):
+    """Video track hatao, audio stream as-is copy (koi re-encode nahi)."""
+    args = ["-i", src, "-vn", "-map", "0:a:0", "-c:a", "copy"]
+    if dst.endswith(".m4a"):
+        args += ["-movflags", "+faststart"]
+    await FFMPEG_POOL.run(args + [dst])
+
+
+async def merge_av(video: str, audio: str, dst: str):
+    """
+    Separate video + audio streams ko MP4 me stream-copy merge.
+    +faststart – moov atom aage, Telegram me turant stream hota hai.
+    """
+    await FFMPEG_POOL.run([
+        "-i", video, "-i", audio,
+        "-map", "0:v:0", "-map", "1:a:0",
+        "-c", "copy", "-movflags", "+faststart",
+        dst,
+    ])
+
+
+# ffmpeg khud URL se padh sake (direct / HLS) – DASH fragment lists nahi
+_CLIP_PROTOCOLS = ("http", "https", "m3u8", "m3u8_native")
+
+
+def clip_inputs_ok(fmts) -> bool:
+    """True = har format ka seedha URL hai, ffmpeg cut kar sakta hai."""
+    return bool(fmts) and all(
+        f and f.get("url") and (f.get("protocol") or "https") in _CLIP_PROTOCOLS
+        for f in fmts
+    )
+
+
+async def cut_clip(fmts, start: int, end: int, dst: str):
+    """
+    Remote stream(s) se sirf [start, end] range – input pe seek, sirf us
+    hisaab ke bytes aate hain, keyframe pe cut (stream copy). Video + audio
+    do formats ho to usi pass me merge.
+    """
+    args = []
+    for f in fmts:
+        headers = "".join(f"{k}: {v}\r\n" for k, v in (f.get("http_headers") or {}).items())
+        if headers:
+            args += ["-headers", headers]
+        args += ["-ss", str(start), "-t", str(end - start), "-i", f["url"]]
+    if len(fmts) > 1:
+        args += ["-map", "0:v:0", "-map", "1:a:0"]
+    else:
+        args += ["-map", "0:v?", "-map", "0:a?"]
+    args += ["-c", "copy"]
+    if dst.endswith((".mp4", ".m4a")):
+        args += ["-movflags", "+faststart"]
+    await FFMPEG_POOL.run(args + [dst])
+
+
+def ffmpeg_status_text() -> str:
+    """Admin panel ke liye short status line."""
+    s = FFMPEG_POOL.stats()
+    return (
+        f"• ffmpeg pool: `{s['active']}/{s['size']}` active, `{s['queued']}` queued "
+        f"(`{s['threads']}` threads/job, nice `{s['nice']}`)\n"
+    )
@@ -0,0 +1,413 @@
+# ============================================================
+#   Module: User Store (SQLite)
+#   Developer: Tushar Davera
+#   Description:
+#       • users.json ki jagah data/users.db (SQLite, WAL mode)
+#       • Har message pe sirf ek row ka upsert – poori file
+#         parse / rewrite nahi
+#       • user_id primary key, username pe index (case-insensitive)
+#       • Pehli baar start pe users.json se one-time migration
+#       • Export same JSON shape me (uid -> record), backup via
+#         SQLite online backup API
+#       • Aggregate counters (users / blocked / downloads / MB +
+#         daily joins / downloads) write ke saath hi update –
+#         dashboards O(1), `rebuild_stats()` se dobara gin sakte ho
+#       • Bulk reads (export / backup / rebuild scan) alag read-only
+#         connection pe – WAL snapshot, main lock nahi pakadte
+# ============================================================
+
+import os
+import json
+import sqlite3
+import logging
+import threading
+from urllib.parse import quote
+from contextlib import contextmanager
+from datetime import datetime
+
+LOG = logging.getLogger(__name__)
+
+# users.json wale record ke fields (export isi order / shape me)
+USER_FIELDS = (
+    "first_name",
+    "last_name",
+    "username",
+    "language",
+    "joined_at",
+    "last_active",
+    "total_downloads",
+    "total_mb",
+    "blocked",
+)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS users (
+    user_id         INTEGER PRIMARY KEY,
+    first_name      TEXT    NOT NULL DEFAULT '',
+    last_name       TEXT    NOT NULL DEFAULT '',
+    username        TEXT    NOT NULL DEFAULT '',
+    language        TEXT    NOT NULL DEFAULT '',
+    joined_at       TEXT    NOT NULL,
+    last_active     TEXT    NOT NULL,
+    total_downloads INTEGER NOT NULL DEFAULT 0,
+    total_mb        INTEGER NOT NULL DEFAULT 0,
+    blocked         INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS users_username ON users (username COLLATE NOCASE);
+CREATE INDEX IF NOT EXISTS users_joined_at ON users (joined_at);
+CREATE INDEX IF NOT EXISTS users_blocked ON users (blocked) WHERE blocked = 1;
+CREATE INDEX IF NOT EXISTS users_downloads ON users (total_downloads);
+CREATE TABLE IF NOT EXISTS stats (
+    key   TEXT PRIMARY KEY,
+    value INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS daily_stats (
+    day       TEXT PRIMARY KEY,
+    joins     INTEGER NOT NULL DEFAULT 0,
+    downloads INTEGER NOT NULL DEFAULT 0,
+    mb        INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS block_rules (
+    kind       TEXT NOT NULL,
+    value      TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    PRIMARY KEY (kind, value)
+);
+"""
+
+
+# stats table ke keys
+STAT_KEYS = ("users", "blocked", "downloads", "mb")
+
+
+def now_str():
+    return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+
+def today_str():
+    return datetime.now().strftime("%Y-%m-%d")
+
+
+def _record(row) -> dict:
+    """DB row -> users.json jaisa dict."""
+    data = {field: row[field] for field in USER_FIELDS}
+    data["blocked"] = bool(data["blocked"])
+    return data
+
+
+class UserStore:
+    """
+    Sab calls chhote single-row statements hain (WAL + synchronous=NORMAL
+    me sub-millisecond), isliye event loop se seedha call kar sakte ho.
+    Bulk kaam (export / backup / rebuild) thread me chalao – woh apna
+    read-only connection kholte hain, loop wale chhote calls lock pe nahi atakte.
+    """
+
+    def __init__(self, path: str, legacy_json: str = None):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._lock = threading.RLock()
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.row_factory = sqlite3.Row
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(_SCHEMA)
+        if self._db.execute("SELECT COUNT(*) FROM stats").fetchone()[0] == 0:
+            # Purana DB (counters se pehle ka) ya naya – ek baar gin lo
+            self.rebuild_stats()
+        if legacy_json:
+            self.migrate_json(legacy_json)
+
+    # ---------- migration ----------
+
+    def migrate_json(self, path: str) -> int:
+        """users.json -> DB (ek transaction). Baad me file `.migrated` rename."""
+        if not os.path.exists(path):
+            return 0
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except Exception as e:
+            LOG.warning("users.json migration skipped (unreadable): %s", e)
+            return 0
+        if not isinstance(data, dict):
+            return 0
+
+        rows = []
+        for uid, info in data.items():
+            try:
+                user_id = int(uid)
+            except (TypeError, ValueError):
+                continue
+            info = info if isinstance(info, dict) else {}
+            joined = info.get("joined_at") or now_str()
+            rows.append((
+                user_id,
+                info.get("first_name") or "",
+                info.get("last_name") or "",
+                info.get("username") or "",
+                info.get("language") or "",
+                joined,
+                info.get("last_active") or joined,
+                int(info.get("total_downloads") or 0),
+                int(info.get("total_mb") or 0),
+                1 if info.get("blocked") else 0,
+            ))
+
+        with self._lock:
+            with self._transaction():
+                self._db.executemany(
+                    "INSERT OR IGNORE INTO users VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows
+                )
+        self.rebuild_stats()
+        os.replace(path, path + ".migrated")
+        LOG.info("user store: migrated %d users from %s", len(rows), path)
+        return len(rows)
+
+    @contextmanager
+    def _transaction(self):
+        """BEGIN / COMMIT – error pe ROLLBACK."""
+        self._db.execute("BEGIN IMMEDIATE")
+        try:
+            yield
+        except BaseException:
+            self._db.execute("ROLLBACK")
+            raise
+        self._db.execute("COMMIT")
+
+    @contextmanager
+    def _reader(self):
+        """Alag read-only connection – WAL me writer ke saath parallel padh sakta hai."""
+        db = sqlite3.connect(f"file:{quote(os.path.abspath(self.path))}?mode=ro", uri=True)
+        db.row_factory = sqlite3.Row
+        try:
+            yield db
+        finally:
+            db.close()
+
+    # ---------- counters ----------
+
+    def _bump(self, **deltas):
+        """stats table ke counters (transaction ke andar call karo)."""
+        for key, delta in deltas.items():
+            if delta:
+                self._db.execute(
+                    "INSERT INTO stats (key, value) VALUES (?, ?) "
+                    "ON CONFLICT (key) DO UPDATE SET value = value + excluded.value",
+                    (key, delta),
+                )
+
+    def _bump_day(self, day: str, joins: int = 0, downloads: int = 0, mb: int = 0):
+        self._db.execute(
+            """
+            INSERT INTO daily_stats (day, joins, downloads, mb) VALUES (?, ?, ?, ?)
+            ON CONFLICT (day) DO UPDATE SET
+                joins = joins + excluded.joins,
+                downloads = downloads + excluded.downloads,
+                mb = mb + excluded.mb
+            """,
+            (day, joins, downloads, mb),
+        )
+
+    def _insert_new(self, user_id: int, now: str, first_name="", last_name="",
+                    username="", language="") -> bool:
+        """Naya user ho to insert + join counters. True = naya tha."""
+        cur = self._db.execute(
+            """
+            INSERT OR IGNORE INTO users (user_id, first_name, last_name, username, language,
+                                         joined_at, last_active)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            """,
+            (user_id, first_name, last_name, username, language, now, now),
+        )
+        if cur.rowcount:
+            self._bump(users=1)
+            self._bump_day(now[:10], joins=1)
+            return True
+        return False
+
+    # ---------- writes ----------
+
+    def register(self, user_id: int, first_name: str = "", last_name: str = "",
+                 username: str = "", language: str = ""):
+        """Naya user insert, purana ho to naam / username / last_active update."""
+        now = now_str()
+        user_id = int(user_id)
+        with self._lock, self._transaction():
+            if not self._insert_new(user_id, now, first_name or "", last_name or "",
+                                    username or "", language or ""):
+                self._db.execute(
+                    """
+                    UPDATE users SET first_name = ?, last_name = ?, username = ?, last_active = ?
+                    WHERE user_id = ?
+                    """,
+                    (first_name or "", last_name or "", username or "", now, user_id),
+                )
+
+    def add_download(self, user_id: int, size_mb: int):
+        now = now_str()
+        user_id, size_mb = int(user_id), int(size_mb)
+        with self._lock, self._transaction():
+            self._insert_new(user_id, now)
+            self._db.execute(
+                """
+                UPDATE users SET total_downloads = total_downloads + 1,
+                                 total_mb = total_mb + ?, last_active = ?
+                WHERE user_id = ?
+                """,
+                (size_mb, now, user_id),
+            )
+            self._bump(downloads=1, mb=size_mb)
+            self._bump_day(now[:10], downloads=1, mb=size_mb)
+
+    def set_blocked(self, user_id: int, blocked: bool) -> bool:
+        """False = user record hi nahi hai."""
+        flag = 1 if blocked else 0
+        with self._lock, self._transaction():
+            cur = self._db.execute(
+                "UPDATE users SET blocked = ? WHERE user_id = ? AND blocked != ?",
+                (flag, int(user_id), flag),
+            )
+            if cur.rowcount:
+                self._bump(blocked=1 if blocked else -1)
+                return True
+            # Koi change nahi – record hai (pehle se same state) ya nahi?
+            return self._db.execute(
+                "SELECT 1 FROM users WHERE user_id = ?", (int(user_id),)
+            ).fetchone() is not None
+
+    # ---------- reads ----------
+
+    def get(self, user_id: int):
+        with self._lock:
+            row = self._db.execute("SELECT * FROM users WHERE user_id = ?", (int(user_id),)).fetchone()
+        return _record(row) if row else None
+
+    def find_username(self, username: str):
+        """Returns (user_id, record) ya None – `@` optional, case-insensitive."""
+        name = (username or "").lstrip("@")
+        if not name:
+            return None
+        with self._lock:
+            row = self._db.execute(
+                "SELECT * FROM users WHERE username = ? COLLATE NOCASE LIMIT 1", (name,)
+            ).fetchone()
+        return (row["user_id"], _record(row)) if row else None
+
+    def is_blocked(self, user_id: int) -> bool:
+        with self._lock:
+            row = self._db.execute("SELECT blocked FROM users WHERE user_id = ?", (int(user_id),)).fetchone()
+        return bool(row and row[0])
+
+    def blocked_ids(self) -> list:
+        """Sab blocked user ids (partial index – sirf blocked rows scan)."""
+        with self._lock:
+            rows = self._db.execute("SELECT user_id FROM users WHERE blocked = 1").fetchall()
+        return [row[0] for row in rows]
+
+    # ---------- block rules (username / id range) ----------
+
+    def block_rules(self) -> list:
+        """[(kind, value)] – e.g. ("username", "spammer"), ("range", "100-200")."""
+        with self._lock:
+            rows = self._db.execute("SELECT kind, value FROM block_rules ORDER BY kind, value").fetchall()
+        return [(row[0], row[1]) for row in rows]
+
+    def add_block_rule(self, kind: str, value: str) -> bool:
+        """False = rule pehle se hai."""
+        with self._lock:
+            cur = self._db.execute(
+                "INSERT OR IGNORE INTO block_rules VALUES (?, ?, ?)", (kind, value, now_str())
+            )
+            return cur.rowcount > 0
+
+    def remove_block_rule(self, kind: str, value: str) -> bool:
+        with self._lock:
+            cur = self._db.execute("DELETE FROM block_rules WHERE kind = ? AND value = ?", (kind, value))
+            return cur.rowcount > 0
+
+    def count(self) -> int:
+        return self.totals()["users"]
+
+    def totals(self, today: str = None) -> dict:
+        """Dashboard numbers – counters se, user count se independent (O(1))."""
+        today = today or today_str()
+        with self._lock:
+            values = dict(self._db.execute("SELECT key, value FROM stats").fetchall())
+            day = self._db.execute(
+                "SELECT joins, downloads, mb FROM daily_stats WHERE day = ?", (today,)
+            ).fetchone()
+        data = {key: values.get(key, 0) for key in STAT_KEYS}
+        data["joined_today"], data["downloads_today"], data["mb_today"] = day or (0, 0, 0)
+        return data
+
+    def rebuild_stats(self) -> dict:
+        """
+        Counters users table se dobara gino (drift / manual DB edit ke baad).
+        Daily joins bhi joined_at se ban jate hain; daily downloads ka
+        per-download record nahi hota, wo jaise hain waise rehte hain.
+        Thread me call karo – scan read-only connection pe, lock sirf
+        chhote correction write ke liye.
+        """
+        with self._reader() as db:
+            # Ek read transaction = ek snapshot (aggregates + us waqt ke counters)
+            db.execute("BEGIN")
+            row = db.execute(
+                """
+                SELECT COUNT(*), COALESCE(SUM(blocked), 0), COALESCE(SUM(total_downloads), 0),
+                       COALESCE(SUM(total_mb), 0)
+                FROM users
+                """
+            ).fetchone()
+            counters = dict(db.execute("SELECT key, value FROM stats").fetchall())
+            joins = dict(db.execute(
+                "SELECT substr(joined_at, 1, 10), COUNT(*) FROM users GROUP BY 1"
+            ).fetchall())
+            day_joins = dict(db.execute("SELECT day, joins FROM daily_stats").fetchall())
+            db.execute("COMMIT")
+
+        # Snapshot ke baad wale writes ne counters bump kiye hain – overwrite
+        # nahi, sirf snapshot wala farak jodo
+        fix = {key: value - counters.get(key, 0) for key, value in zip(STAT_KEYS, row)}
+        with self._lock, self._transaction():
+            self._bump(**fix)
+            for day in set(joins) | set(day_joins):
+                delta = joins.get(day, 0) - day_joins.get(day, 0)
+                if delta:
+                    self._bump_day(day, joins=delta)
+        return self.totals()
+
+    def top(self, limit: int = 10) -> list:
+        """[(user_id, total_downloads)] – sabse zyada downloads wale."""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT user_id, total_downloads FROM users ORDER BY total_downloads DESC LIMIT ?",
+                (int(limit),),
+            ).fetchall()
+        return [(row[0], row[1]) for row in rows]
+
+    # ---------- bulk ----------
+
+    def export_json(self, path: str) -> int:
+        """users.json wala shape: {"<uid>": {...}} – thread me call karo."""
+        with self._reader() as db:
+            rows = db.execute("SELECT * FROM users ORDER BY user_id").fetchall()
+        data = {str(row["user_id"]): _record(row) for row in rows}
+        tmp = path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+        os.replace(tmp, path)
+        return len(data)
+
+    def backup(self, path: str):
+        """Consistent DB copy (WAL ke saath bhi) – thread me call karo."""
+        dst = sqlite3.connect(path)
+        try:
+            with self._reader() as db:
+                db.backup(dst)
+        finally:
+            dst.close()
+
+    def close(self):
+        with self._lock:
+            self._db.close()
@@ -0,0 +1,180 @@
+# ============================================================
+#   Module: Stage Watchdog (stuck job detection)
+#   Developer: Tushar Davera
+#   Description:
+#       • Har stage (metadata / download / postprocess / thumbnail /
+#         upload) ki apni deadline – env se configurable
+#       • Download / upload pe stall detection: STALL_WINDOW sec me
+#         STALL_MIN_KB se kam progress = atka hua
+#       • Stalled / timed-out stage abort + ek baar retry – retry se
+#         pehle purane attempt ka yt-dlp thread rukne tak wait
+#       • Stall / timeout counters admin panel (/server) ke liye
+# ============================================================
+
+import time
+import asyncio
+import logging
+
+from Youtube.config import Config
+from Youtube.workers import AbortScope, CURRENT_ABORT
+
+LOG = logging.getLogger(__name__)
+
+STAGES = ("metadata", "download", "postprocess", "thumbnail", "upload")
+
+
+class StageTimeout(Exception):
+    """Stage deadline cross ya bytes aana band (stall)."""
+
+    def __init__(self, stage: str, stalled: bool):
+        kind = "stalled" if stalled else "timed out"
+        super().__init__(f"{stage} {kind}")
+        self.stage = stage
+        self.stalled = stalled
+
+
+class Heartbeat:
+    """
+    Bytes progress tracker – yt-dlp hooks (worker thread) aur Pyrogram
+    upload callback dono feed karte hain. Multiple files (video + audio)
+    ka progress key ke hisaab se alag ginte hain.
+    """
+
+    def __init__(self, min_bytes: int):
+        self.min_bytes = max(1, int(min_bytes))
+        self._seen = {}
+        self.progress = 0
+        self._mark_bytes = 0
+        self.mark_ts = time.monotonic()
+
+    def feed(self, key, current: int):
+        delta = int(current or 0) - self._seen.get(key, 0)
+        if delta <= 0:
+            return
+        self._seen[key] = int(current)
+        self.progress += delta
+        # Kam se kam min_bytes aaye tabhi "zinda" maano (trickle != progress)
+        if self.progress - self._mark_bytes >= self.min_bytes:
+            self._mark_bytes = self.progress
+            self.mark_ts = time.monotonic()
+
+    def reset(self):
+        self._seen.clear()
+        self._mark_bytes = self.progress
+        self.mark_ts = time.monotonic()
+
+    def hook(self, d: dict):
+        """yt-dlp progress hook."""
+        if d.get("status") == "downloading":
+            self.feed(d.get("filename"), d.get("downloaded_bytes"))
+
+    def wrap_upload(self, progress):
+        """Pyrogram progress callback ke aage heartbeat laga do."""
+        async def wrapped(current: int, total: int, *args):
+            self.feed("upload", current)
+            await progress(current, total, *args)
+        return wrapped
+
+
+class Watchdog:
+
+    def __init__(self, deadlines: dict, stall_window: float, stall_min_bytes: int,
+                 check_interval: float = 5, abort_grace: float = 30):
+        self.deadlines = {k: float(v) for k, v in deadlines.items()}
+        self.stall_window = float(stall_window)
+        self.stall_min_bytes = int(stall_min_bytes)
+        self.check_interval = float(check_interval)
+        self.abort_grace = float(abort_grace)
+        self.stalls = {stage: 0 for stage in STAGES}
+        self.timeouts = {stage: 0 for stage in STAGES}
+        self.retries = 0
+        self.recovered = 0
+
+    def heartbeat(self) -> Heartbeat:
+        return Heartbeat(self.stall_min_bytes)
+
+    async def _guard(self, stage: str, coro, beat: Heartbeat, scope: AbortScope):
+        """Ek attempt: deadline + stall check, atka to task cancel + threads abort."""
+        deadline = self.deadlines.get(stage) or 0
+        # Task isi scope ke context me bane – andar ke ytdl calls ise track karte hain
+        ctx = CURRENT_ABORT.set(scope)
+        try:
+            task = asyncio.ensure_future(coro)
+        finally:
+            CURRENT_ABORT.reset(ctx)
+        start = time.monotonic()
+        if beat is not None:
+            beat.reset()
+        try:
+            while True:
+                done, _ = await asyncio.wait({task}, timeout=self.check_interval)
+                if done:
+                    return task.result()
+                now = time.monotonic()
+                if deadline and now - start > deadline:
+                    self.timeouts[stage] += 1
+                    raise StageTimeout(stage, stalled=False)
+                if beat is not None and self.stall_window and now - beat.mark_ts > self.stall_window:
+                    self.stalls[stage] += 1
+                    raise StageTimeout(stage, stalled=True)
+        except BaseException:
+            scope.abort()
+            if not task.done():
+                task.cancel()
+                await asyncio.gather(task, return_exceptions=True)
+            raise
+
+    async def run(self, stage: str, factory, beat: Heartbeat = None, retry: bool = True):
+        """
+        `factory()` se bana coroutine watchdog ke andar chalao.
+        Stall / timeout pe ek baar fresh coroutine ke saath retry
+        (downloads `.part` se resume hote hain). Retry tabhi jab purane
+        attempt ka worker thread exit ho chuka ho – warna do threads ek
+        hi `.part` likhte aur heartbeat feed karte.
+        """
+        scope = AbortScope()
+        try:
+            return await self._guard(stage, factory(), beat, scope)
+        except StageTimeout as e:
+            if not retry:
+                raise
+            if not await scope.wait_threads(self.abort_grace):
+                LOG.warning("watchdog: %s, worker thread still busy, not retrying", e)
+                raise
+            LOG.warning("watchdog: %s, retrying once", e)
+            self.retries += 1
+        result = await self._guard(stage, factory(), beat, AbortScope())
+        self.recovered += 1
+        return result
+
+    def stats(self) -> dict:
+        return {
+            "stalls": sum(self.stalls.values()),
+            "timeouts": sum(self.timeouts.values()),
+            "retries": self.retries,
+            "recovered": self.recovered,
+            "by_stage": {s: self.stalls[s] + self.timeouts[s] for s in STAGES},
+        }
+
+
+WATCHDOG = Watchdog(
+    {
+        "metadata": Config.STAGE_TIMEOUT_METADATA,
+        "download": Config.STAGE_TIMEOUT_DOWNLOAD,
+        "postprocess": Config.STAGE_TIMEOUT_POSTPROCESS,
+        "thumbnail": Config.STAGE_TIMEOUT_THUMBNAIL,
+        "upload": Config.STAGE_TIMEOUT_UPLOAD,
+    },
+    Config.STALL_WINDOW,
+    Config.STALL_MIN_KB * 1024,
+)
+
+
+def watchdog_status_text() -> str:
+    """Admin panel ke liye short status line."""
+    s = WATCHDOG.stats()
+    stuck = ", ".join(f"{k} `{v}`" for k, v in s["by_stage"].items() if v) or "none"
+    return (
+        f"• Watchdog: stalls `{s['stalls']}`, timeouts `{s['timeouts']}`, "
+        f"retried `{s['retries']}`, recovered `{s['recovered']}` ({stuck})\n"
+    )
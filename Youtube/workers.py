@@ -0,0 +1,170 @@
+# ============================================================
+#   Module: Worker Pool (yt-dlp executor)
+#   Developer: Tushar Davera
+#   Description:
+#       • yt-dlp ke blocking calls (extract / download) event loop
+#         se hata ke ek bounded thread pool me chalata hai
+#       • Pool size env se: YTDL_WORKERS
+#       • Queue depth + active workers stats (admin /server)
+#       • AbortScope: watchdog attempt ke threads ko rokna (hook
+#         DownloadCancelled raise karta hai) + exit ka wait
+# ============================================================
+
+import asyncio
+import copy
+import threading
+import contextvars
+import concurrent.futures
+from concurrent.futures import ThreadPoolExecutor
+
+import yt_dlp
+
+from Youtube.config import Config
+
+
+class AbortScope:
+    """
+    Ek watchdog attempt ke worker threads. Asyncio task cancel karne se
+    thread nahi rukta – abort() ke baad yt-dlp ka agla hook
+    DownloadCancelled raise karta hai aur thread khud nikal jaata hai.
+    """
+
+    def __init__(self):
+        self.aborted = False
+        self._futures = set()
+
+    def hook(self, d: dict):
+        """yt-dlp progress / postprocessor hook."""
+        if self.aborted:
+            raise yt_dlp.utils.DownloadCancelled("aborted by watchdog")
+
+    def track(self, cf):
+        self._futures.add(cf)
+        cf.add_done_callback(self._futures.discard)
+
+    def abort(self):
+        self.aborted = True
+
+    async def wait_threads(self, timeout: float) -> bool:
+        """True = is scope ke saare threads exit ho chuke."""
+        pending = [cf for cf in list(self._futures) if not cf.done()]
+        if not pending:
+            return True
+        _, not_done = await asyncio.to_thread(concurrent.futures.wait, pending, timeout)
+        return not not_done
+
+
+# Current watchdog attempt ka scope (task banate waqt context copy hota hai)
+CURRENT_ABORT = contextvars.ContextVar("ytdl_abort", default=None)
+
+
+class WorkerPool:
+    """
+    Bounded thread pool with live counters.
+    Handlers sirf `await pool.run(func, ...)` karte hain – blocking
+    kaam worker thread me hota hai, Pyrogram loop free rehta hai.
+    """
+
+    def __init__(self, name: str, size: int):
+        self.name = name
+        self.size = max(1, int(size))
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.size,
+            thread_name_prefix=f"{name}-worker",
+        )
+        self._lock = threading.Lock()
+        self.queued = 0
+        self.active = 0
+        self.completed = 0
+        self.failed = 0
+
+    def _call(self, func, args, kwargs):
+        with self._lock:
+            self.queued -= 1
+            self.active += 1
+        try:
+            return func(*args, **kwargs)
+        except BaseException:
+            with self._lock:
+                self.failed += 1
+            raise
+        finally:
+            with self._lock:
+                self.active -= 1
+                self.completed += 1
+
+    async def run(self, func, *args, **kwargs):
+        """Run `func(*args, **kwargs)` in the pool and await the result."""
+        with self._lock:
+            self.queued += 1
+        cf = self._executor.submit(self._call, func, args, kwargs)
+        scope = CURRENT_ABORT.get()
+        if scope is not None:
+            scope.track(cf)
+        try:
+            return await asyncio.wrap_future(cf)
+        except asyncio.CancelledError:
+            # Agar job abhi queue me hi tha to counter wapas theek karo
+            if cf.cancel():
+                with self._lock:
+                    self.queued -= 1
+            raise
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "name": self.name,
+                "size": self.size,
+                "queued": self.queued,
+                "active": self.active,
+                "completed": self.completed,
+                "failed": self.failed,
+            }
+
+
+# Shared pool for every yt-dlp call (youtube / instagram / thumbnail)
+YTDL_POOL = WorkerPool("ytdl", Config.YTDL_WORKERS)
+
+
+def _scoped(opts: dict) -> dict:
+    """Current AbortScope ka hook opts me (caller ki dict mutate nahi hoti)."""
+    scope = CURRENT_ABORT.get()
+    if scope is None:
+        return opts
+    opts = dict(opts)
+    opts["progress_hooks"] = list(opts.get("progress_hooks") or []) + [scope.hook]
+    opts["postprocessor_hooks"] = list(opts.get("postprocessor_hooks") or []) + [scope.hook]
+    return opts
+
+
+def _extract(url: str, opts: dict, download: bool):
+    with yt_dlp.YoutubeDL(opts) as ydl:
+        return ydl.extract_info(url, download=download)
+
+
+async def ytdl_extract(url: str, opts: dict, download: bool = False):
+    """`YoutubeDL(opts).extract_info(url)` – worker pool ke through."""
+    return await YTDL_POOL.run(_extract, url, _scoped(opts), download)
+
+
+def _process(info: dict, opts: dict):
+    # process_ie_result info dict ko mutate karta hai – cache wali copy safe rahe
+    with yt_dlp.YoutubeDL(opts) as ydl:
+        return ydl.process_ie_result(copy.deepcopy(info), download=True)
+
+
+async def ytdl_process(info: dict, opts: dict):
+    """
+    Pehle se extracted info dict se download (re-extraction skip).
+    Format selection `opts["format"]` ke hisaab se dobara hota hai.
+    """
+    return await YTDL_POOL.run(_process, info, _scoped(opts))
+
+
+def pool_status_text() -> str:
+    """Admin panel ke liye short status line."""
+    s = YTDL_POOL.stats()
+    return (
+        f"• yt-dlp workers: `{s['active']}/{s['size']}` active, "
+        f"`{s['queued']}` queued\n"
+    )
@@ -10,12 +10,14 @@
 # ============================================================
 
 import os
+import re
+import glob
+import asyncio
 import uuid
 import logging
 
-import yt_dlp
-import aiohttp
 import aiofiles
+from yt_dlp.utils import download_range_func, DownloadError
 
 from pyrogram import Client, filters
 from pyrogram.types import InlineKeyboardMarkup, InlineKeyboardButton, CallbackQuery, Message
@@ -23,26 +25,200 @@ from pyrogram.types import InlineKeyboardMarkup, InlineKeyboardButton, CallbackQ
 from Youtube.config import Config
 from Youtube.fix_thumb import fix_thumb
 from Youtube.forcesub import handle_force_subscribe, humanbytes
+from Youtube.downloader import DOWNLOADER, fetch_format, downloaded_file
+from Youtube.journal import JOURNAL, STAGE_UPLOAD, revive_status
+from Youtube.lifecycle import LIFECYCLE, DRAINING_TEXT
+from Youtube.watchdog import WATCHDOG, StageTimeout
+from Youtube.throttle import limited, CircuitOpen
+from Youtube.negative_cache import NEGATIVE_CACHE, negative_text
+from Youtube.cancel import CANCELS, JobCancelled, CANCELLED_TEXT, cancel_markup, shutdown_interrupt
+from Youtube.workers import ytdl_extract, ytdl_process
+from Youtube.cache import META_CACHE, YT_SESSIONS, SESSION_OK, SESSION_EXPIRED
+from Youtube.scheduler import SCHEDULER, DEFAULT_PRIORITY, priority_for_role
+from Youtube.singleflight import DOWNLOAD_FLIGHTS
+from Youtube.ratelimit import ACTION_LINK, ACTION_DOWNLOAD
+from Youtube.fileid_cache import FILE_IDS, send_cached
+from Youtube.progress import ProgressReporter, time_formatter
+from Youtube.transcode import to_mp3, remux_audio, native_audio_ext, merge_av, clip_inputs_ok, cut_clip
+from Youtube.storage import STORAGE, DOWNLOAD_DIR, InsufficientStorage, MB
+from Youtube.sizing import (
+    TELEGRAM_MAX_BYTES,
+    MP3_KBPS,
+    FileTooLarge,
+    estimate_size,
+    find_format,
+    best_audio,
+    pick_best_fit,
+    dash_pairs,
+    size_guard_hook,
+    CombinedSizeGuard,
+)
 
 # >>> Admin Control System imports
 from .admin_system import (
     register_user,
     add_download_stat,
     is_rate_limited,
-    is_blocked
+    rate_limit_wait,
+    is_blocked,
+    get_role
 )
 
-# Simple in-memory cache
-YT_CACHE = {}
+LOG = logging.getLogger(__name__)
 
-# Telegram size safety limit (~1.9 GB)
-TELEGRAM_MAX_BYTES = 1_900_000_000
+# watch?v= / youtu.be / shorts / embed / live – sab se 11 char video id
+YT_ID_REGEX = re.compile(r"(?:[?&]v=|youtu\.be/|/shorts/|/embed/|/live/|/v/)([0-9A-Za-z_-]{11})")
 
-# Download directory
-DOWNLOAD_DIR = "downloads"
-os.makedirs(DOWNLOAD_DIR, exist_ok=True)
+# Bade, kaam na aane wale keys (subtitles, heatmap) cache me nahi rakhte
+_INFO_DROP_KEYS = ("automatic_captions", "subtitles", "heatmap", "thumbnails")
 
-LOG = logging.getLogger(__name__)
+
+def youtube_id(url: str):
+    """Canonical YouTube video id from any link form (None if not found)."""
+    m = YT_ID_REGEX.search(url or "")
+    return m.group(1) if m else None
+
+
+# "90-120", "1:30-2:00", "1:02:03-1:05:00"
+CLIP_REGEX = re.compile(r"^(\d+(?::\d{1,2}){0,2})-(\d+(?::\d{1,2}){0,2})$")
+
+
+def _to_seconds(ts: str) -> int:
+    total = 0
+    for part in ts.split(":"):
+        total = total * 60 + int(part)
+    return total
+
+
+def parse_clip(text: str):
+    """`start-end` -> (start, end) seconds. None agar format galat ho ya end <= start."""
+    m = CLIP_REGEX.match((text or "").strip())
+    if not m:
+        return None
+    start, end = _to_seconds(m.group(1)), _to_seconds(m.group(2))
+    if end <= start:
+        return None
+    return start, end
+
+
+def clip_label(clip) -> str:
+    return "–".join(time_formatter(x) for x in clip)
+
+
+def meta_key(video_id: str) -> str:
+    return f"youtube:{video_id}"
+
+
+def _slim_info(info: dict) -> dict:
+    return {k: v for k, v in info.items() if k not in _INFO_DROP_KEYS}
+
+
+def flight_key(video_id: str, fmt_id: str, mode: str) -> str:
+    """Single-flight key: canonical video + format + mode (`audio:mp3` etc.)."""
+    return f"youtube:{video_id}|{fmt_id}|{mode}"
+
+
+class MediaError(Exception):
+    """Download failure jiska message seedha user ko dikhana hai."""
+
+
+class _StatusView:
+    """
+    Leader ka status message. Leader ⛔ Cancel kare par followers wait kar
+    rahe hon to download chalta rehta hai – tab is chat me edits band.
+    """
+
+    def __init__(self, message: Message):
+        self.message = message
+        self.muted = False
+
+    async def edit_text(self, *args, **kwargs):
+        if self.muted:
+            return None
+        return await self.message.edit_text(*args, **kwargs)
+
+
+THROTTLED_TEXT = (
+    "🚦 YouTube abhi bahut requests pe rok laga raha hai.\n"
+    "Thodi der (~{wait}) baad dobara try karo."
+)
+
+STALL_TEXT = (
+    "⏱ Server se connection atak gaya (retry bhi fail).\n"
+    "Thodi der baad dobara try karo."
+)
+
+SIZE_LIMIT_TEXT = (
+    "❌ File size 2GB se zyada hai, Telegram limit ke bahar hai.\n"
+    "Chhota format ya chhoti video try karo (⭐ Best quality that fits)."
+)
+
+# Info-only extraction options (format listing / metadata)
+INFO_OPTS = {
+    "quiet": True,
+    "cookiefile": "cookies.txt",  # optional, if exists it will be used
+    "nocheckcertificate": True,
+    "socket_timeout": Config.YTDL_SOCKET_TIMEOUT,
+}
+
+
+async def _get_info(url: str, video_id=None):
+    """Cached info (META_CACHE) ya fresh extract. Returns (info, video_id)."""
+    info = META_CACHE.get(meta_key(video_id)) if video_id else None
+    if info is None:
+        # Blocking extract worker pool me (event loop free rehta hai)
+        # Watchdog: atka hua extract_info abort + ek retry
+        # Limiter: YouTube throttle kare to concurrency kam / breaker open
+        info = _slim_info(await limited(
+            "youtube",
+            lambda: WATCHDOG.run("metadata", lambda: ytdl_extract(url, INFO_OPTS, download=False)),
+        ))
+        video_id = info.get("id") or video_id
+        if video_id:
+            META_CACHE.set(meta_key(video_id), info)
+    return info, video_id
+
+
+def _clip_fraction(clip, duration) -> float:
+    """Clip video ka kitna hissa hai (size estimates scale karne ke liye)."""
+    if not clip or not duration:
+        return 1.0
+    return max(0.0, min(1.0, (clip[1] - clip[0]) / duration))
+
+
+def _estimate_job_size(formats, duration, fmt_id: str, ext: str, mode: str, clip=None):
+    """Preflight: final file ka approx size (None = pata nahi)."""
+    size = _estimate_full_size(formats, duration, fmt_id, ext, mode)
+    if size and clip:
+        size = int(size * _clip_fraction(clip, duration))
+    return size
+
+
+def _estimate_disk_size(formats, duration, fmt_id: str, ext: str, mode: str, clip=None):
+    """Disk reservation: MP3 encode ke time source + mp3 dono staging me – sum, max nahi."""
+    if mode != "audio" or ext != "mp3":
+        return _estimate_job_size(formats, duration, fmt_id, ext, mode, clip)
+    source = estimate_size(best_audio(formats), duration)
+    mp3 = int(MP3_KBPS * 1000 / 8 * duration) if duration else None
+    size = sum(x for x in (source, mp3) if x) or None
+    if size and clip:
+        size = int(size * _clip_fraction(clip, duration))
+    return size
+
+
+def _estimate_full_size(formats, duration, fmt_id: str, ext: str, mode: str):
+    if mode == "audio":
+        source = estimate_size(best_audio(formats), duration)
+        if ext != "mp3":
+            return source
+        mp3 = int(MP3_KBPS * 1000 / 8 * duration) if duration else None
+        known = [x for x in (source, mp3) if x]
+        return max(known) if known else None
+    if "+" in fmt_id:
+        # DASH pair – dono streams ka total
+        sizes = [estimate_size(find_format(formats, part), duration) for part in fmt_id.split("+")]
+        return sum(sizes) if all(sizes) else None
+    return estimate_size(find_format(formats, fmt_id), duration)
 
 
 # =========================
@@ -59,83 +235,160 @@ async def youtube_downloader(client: Client, message: Message):
         register_user(user)
 
         # hard block check
-        if is_blocked(user.id):
+        if is_blocked(user.id, user.username):
             await message.reply_text("🚫 You are blocked from using this bot.")
             return
 
         # simple rate-limit
-        if is_rate_limited(user.id):
-            await message.reply_text("⏳ Bahut zyada requests, thoda baad me try karo.")
+        if is_rate_limited(user.id, ACTION_LINK):
+            await message.reply_text(
+                f"⏳ Bahut zyada requests, {rate_limit_wait(user.id, ACTION_LINK)}s baad try karo."
+            )
             return
 
+    # Shutdown / deploy chal raha hai – naye links nahi
+    if LIFECYCLE.draining():
+        await message.reply_text(DRAINING_TEXT)
+        return
+
     # Force subscribe check
     if Config.CHANNEL:
         fsub = await handle_force_subscribe(client, message)
         if fsub == 400:
             return
 
-    url = message.text.strip()
-    processing_msg = await message.reply_text("🔍 **Fetching available formats...**")
+    # Link ke baad optional clip range: `<link> 1:30-2:00`
+    parts = message.text.split()
+    url = parts[0]
+    clip = None
+    if len(parts) > 1:
+        clip = parse_clip(parts[1])
+        if clip is None:
+            await message.reply_text(
+                "❌ Clip range samajh nahi aaya.\n"
+                "Example: `<link> 1:30-2:00` ya `<link> 90-120`"
+            )
+            return
 
-    ydl_opts = {
-        "quiet": True,
-        "cookiefile": "cookies.txt",  # optional, if exists it will be used
-        "nocheckcertificate": True
-    }
+    # Private / deleted / unsupported link pehle bhi aaya tha – bina extraction jawab
+    neg_key = NEGATIVE_CACHE.key("youtube", youtube_id(url), url)
+    kind = NEGATIVE_CACHE.lookup(neg_key)
+    if kind:
+        await message.reply_text(negative_text(kind))
+        return
+
+    processing_msg = await message.reply_text("🔍 **Fetching available formats...**")
 
     buttons = []
 
     try:
-        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-            info = ydl.extract_info(url, download=False)
-            formats = info.get("formats", [])
-            duration = info.get("duration")
-            title = info.get("title", "YouTube Video")
-
-            # Short cache key
-            vid_key = str(uuid.uuid4())[:8]
-            YT_CACHE[vid_key] = url
-
-            # Build video+audio format buttons
-            for f in formats:
-                fmt_id = f.get("format_id")
-                ext = f.get("ext")
-                height = f.get("height")
-                acodec = f.get("acodec")
-                vcodec = f.get("vcodec")
-
-                # Filter only muxed (video + audio) formats
-                if (not fmt_id) or (not acodec) or acodec == "none" or (not vcodec) or vcodec == "none":
-                    continue
-
-                resolution = f"{height}p" if height else "Unknown"
-                text = f"{fmt_id} - {resolution} - {ext}"
-
-                cb = f"ytdl|{vid_key}|{fmt_id}|{ext}|video"
-
-                # Callback data 64 bytes limit
-                if len(cb.encode()) <= 64:
-                    buttons.append([InlineKeyboardButton(text, callback_data=cb)])
-
-            # Audio-only button
-            if duration:
-                buttons.append([
-                    InlineKeyboardButton(
-                        "🎵 Audio MP3 (Best)",
-                        callback_data=f"ytdl|{vid_key}|bestaudio|mp3|audio"
-                    )
-                ])
-
-            if not buttons:
-                await processing_msg.edit_text("❌ Koi valid format nahi mila. Dusra link try karo.")
+        # Same video pehle kisi ne bheja ho to cached info se turant keyboard
+        info, video_id = await _get_info(url, youtube_id(url))
+
+        formats = info.get("formats", [])
+        duration = info.get("duration")
+        title = info.get("title", "YouTube Video")
+
+        if clip and duration:
+            clip = (clip[0], min(clip[1], int(duration)))
+            if clip[0] >= clip[1]:
+                await processing_msg.edit_text("❌ Clip start video ki length se bahar hai.")
                 return
+        # Clip ho to size estimates us hisaab se chhote
+        frac = _clip_fraction(clip, duration)
+
+        # Short cache key
+        vid_key = str(uuid.uuid4())[:8]
+        YT_SESSIONS.set(vid_key, {"url": url, "video_id": video_id, "clip": clip})
+
+        # Separate video + audio (DASH) pairs – 720p/1080p+ bina re-encode
+        pairs = dash_pairs(formats, duration)
+
+        # Auto "best quality that fits" button (Telegram limit ke andar)
+        best = pick_best_fit(formats + pairs, duration, TELEGRAM_MAX_BYTES / frac if frac else TELEGRAM_MAX_BYTES)
+        if best:
+            best_size = int(estimate_size(best, duration) * frac)
+            best_res = f"{best['height']}p" if best.get("height") else best.get("ext", "")
+            buttons.append([
+                InlineKeyboardButton(
+                    f"⭐ Best quality that fits ({best_res}, ~{humanbytes(best_size)})",
+                    callback_data=f"ytdl|{vid_key}|fit|mp4|video"
+                )
+            ])
+
+        # Build video+audio format buttons (muxed pehle, phir DASH pairs)
+        for f in formats + pairs:
+            fmt_id = f.get("format_id")
+            ext = f.get("ext")
+            height = f.get("height")
+            acodec = f.get("acodec")
+            vcodec = f.get("vcodec")
+
+            # Filter only muxed (video + audio) formats
+            if (not fmt_id) or (not acodec) or acodec == "none" or (not vcodec) or vcodec == "none":
+                continue
+
+            # Preflight: jo format pakka limit se bada hai wo dikhao hi mat
+            size = estimate_size(f, duration)
+            if size:
+                size = int(size * frac)
+            if size and size > TELEGRAM_MAX_BYTES:
+                continue
+
+            resolution = f"{height}p" if height else "Unknown"
+            text = f"{fmt_id} - {resolution} - {ext}"
+            if "+" in fmt_id:
+                text = f"🎞 {resolution} HD - {ext}"
+            if size:
+                text += f" (~{humanbytes(size)})"
+
+            cb = f"ytdl|{vid_key}|{fmt_id}|{ext}|video"
+
+            # Callback data 64 bytes limit
+            if len(cb.encode()) <= 64:
+                buttons.append([InlineKeyboardButton(text, callback_data=cb)])
+
+        # Audio-only buttons: original (stream copy, fast) + MP3 (re-encode)
+        if duration:
+            buttons.append([
+                InlineKeyboardButton(
+                    "🎵 Audio Original (M4A/Opus, fast)",
+                    callback_data=f"ytdl|{vid_key}|bestaudio|orig|audio"
+                )
+            ])
+            buttons.append([
+                InlineKeyboardButton(
+                    "🎵 Audio MP3 (192k)",
+                    callback_data=f"ytdl|{vid_key}|bestaudio|mp3|audio"
+                )
+            ])
+
+        if not buttons:
+            await processing_msg.edit_text("❌ Koi valid format nahi mila. Dusra link try karo.")
+            return
 
-            await message.reply_text(
-                f"**✅ Available formats for:**\n`{title}`",
-                reply_markup=InlineKeyboardMarkup(buttons)
-            )
+        header = f"**✅ Available formats for:**\n`{title}`"
+        if clip:
+            header += f"\n✂️ Clip: `{clip_label(clip)}` (sirf ye hissa download hoga)"
 
-            await processing_msg.delete()
+        await message.reply_text(
+            header,
+            reply_markup=InlineKeyboardMarkup(buttons)
+        )
+
+        await processing_msg.delete()
+
+    except CircuitOpen as e:
+        LOG.info("format fetch refused: %s", e)
+        await processing_msg.edit_text(THROTTLED_TEXT.format(wait=time_formatter(e.retry_after)))
+
+    except DownloadError as e:
+        kind = NEGATIVE_CACHE.remember(neg_key, e)
+        if kind is None:
+            LOG.exception("Error fetching formats:")
+            await processing_msg.edit_text(f"❌ Error while fetching formats:\n`{e}`")
+        else:
+            await processing_msg.edit_text(negative_text(kind, e))
 
     except Exception as e:
         LOG.exception("Error fetching formats:")
@@ -152,11 +405,14 @@ async def handle_download(client: Client, cq: CallbackQuery):
     # >>> Admin System: block + rate-limit on callback too
     user = cq.from_user
     if user:
-        if is_blocked(user.id):
+        if is_blocked(user.id, user.username):
             await cq.answer("You are blocked from using this bot.", show_alert=True)
             return
-        if is_rate_limited(user.id):
-            await cq.answer("Slow down, bahut zyada requests.", show_alert=True)
+        if is_rate_limited(user.id, ACTION_DOWNLOAD):
+            await cq.answer(
+                f"Slow down, bahut zyada requests. {rate_limit_wait(user.id, ACTION_DOWNLOAD)}s baad try karo.",
+                show_alert=True,
+            )
             return
 
     try:
@@ -164,12 +420,203 @@ async def handle_download(client: Client, cq: CallbackQuery):
     except ValueError:
         return await cq.message.edit_text("❌ Invalid callback data. Please resend the link.")
 
-    url = YT_CACHE.get(vid_key)
-    if not url:
-        await cq.message.edit_text("⚠️ Session expired. Please resend link.")
+    session, state = YT_SESSIONS.lookup(vid_key)
+    if state != SESSION_OK:
+        if state == SESSION_EXPIRED:
+            await cq.message.edit_text(
+                "⚠️ Session expired ya ye button pehle hi use ho chuka hai. Please resend link."
+            )
+        else:
+            await cq.message.edit_text("⚠️ Ye button ab valid nahi hai (purana ya bot restart hua). Please resend link.")
+        return
+    if LIFECYCLE.draining():
+        await cq.answer(DRAINING_TEXT, show_alert=True)
+        return
+
+    # Job apne task me (Pyrogram worker free, cancel / shutdown per-job)
+    JOURNAL.spawn(_run_job(client, cq.message, user, vid_key, fmt_id, ext, mode, session))
+
+
+async def _run_job(client: Client, status: Message, user, vid_key: str, fmt_id: str,
+                   ext: str, mode: str, session: dict, resume_media: dict = None):
+    """
+    Ek format job: file_id cache -> single-flight -> scheduler -> download -> upload.
+    `status` = keyboard wala message (progress yahi edit hota hai).
+    Journal me entry rehti hai jab tak job khatam na ho – restart pe resume.
+    """
+    url = session["url"]
+    video_id = session.get("video_id")
+    clip = session.get("clip")
+
+    # >>> file_id cache: pehle upload ho chuka hai to bina download turant resend
+    # Audio ke liye target (mp3 / orig) bhi key me – alag files hain
+    job_mode = f"{mode}:{ext}" if mode == "audio" else mode
+    if clip:
+        job_mode += f"@{clip[0]}-{clip[1]}"
+    cache_key = FILE_IDS.key("youtube", video_id or url, fmt_id, job_mode)
+    cached = await send_cached(client, status.chat.id, cache_key)
+    if cached:
+        await status.edit_text("✅ **Successfully Uploaded!**")
+        if user:
+            try:
+                add_download_stat(user.id, cached.get("size", 0))
+            except Exception:
+                pass
+        YT_SESSIONS.pop(vid_key, None)
+        JOURNAL.finish(vid_key)
         return
 
-    await cq.message.edit_text("⬇️ **Downloading...**")
+    user_id = user.id if user else 0
+    priority = priority_for_role(get_role(user_id)) if user else DEFAULT_PRIORITY
+
+    # >>> ⛔ Cancel button – har in-progress status edit me
+    token = CANCELS.register(vid_key, user_id)
+    markup = cancel_markup(vid_key)
+
+    async def _queue_position(pos: int):
+        if token.detached:
+            return
+        await status.edit_text(
+            f"⏳ **Queue me ho: #{pos}**\n"
+            "Slot free hote hi download shuru ho jayega.",
+            reply_markup=markup,
+        )
+
+    # >>> Journal: restart ho jaye to yahi job resume hoga
+    JOURNAL.start(
+        vid_key, "youtube",
+        chat_id=status.chat.id, message_id=status.id, user_id=user_id,
+        session=session, fmt_id=fmt_id, ext=ext, mode=mode,
+    )
+
+    # >>> Single-flight: same video + format + mode already downloading?
+    flight, leader = DOWNLOAD_FLIGHTS.join(flight_key(video_id or url, fmt_id, job_mode))
+    interrupted = False
+
+    try:
+        if leader:
+            flight.owner = vid_key
+            view = _StatusView(status)
+
+            def _detach() -> bool:
+                # Followers wait kar rahe hain – sirf is chat ka hissa khatam
+                if flight.done or flight.refs <= 1:
+                    return False
+                view.muted = True
+                asyncio.ensure_future(status.edit_text(CANCELLED_TEXT))
+                return True
+
+            token.detach = _detach
+
+            # >>> Scheduler: global + per-user cap, role ke hisaab se priority
+            async with SCHEDULER.slot(user_id, priority, on_position=_queue_position):
+                try:
+                    if resume_media and os.path.exists(resume_media.get("file_path") or ""):
+                        # Restart se pehle download ho chuka tha – seedha upload
+                        media = dict(resume_media, ticket=None)
+                    else:
+                        media = await _fetch_media(view, vid_key, fmt_id, ext, mode, url, video_id, clip)
+                except asyncio.CancelledError:
+                    flight.fail(MediaError("❌ Download beech me ruk gaya. Please dobara try karo."))
+                    raise
+                except Exception as e:
+                    flight.fail(e)
+                    if token.detached:
+                        raise JobCancelled(vid_key) from e
+                    raise
+                flight.resolve(media)
+                if token.detached:
+                    # Download followers ke liye poora hua – is chat me upload nahi
+                    raise JobCancelled(vid_key)
+                JOURNAL.update(
+                    vid_key, stage=STAGE_UPLOAD,
+                    media={k: v for k, v in media.items() if k != "ticket"},
+                )
+                await _send_media(client, status, user, media, mode, cache_key, token)
+        else:
+            await status.edit_text(
+                "⏳ **Ye video abhi download ho raha hai...**\n"
+                "Ready hote hi yahi bhej diya jayega.",
+                reply_markup=markup,
+            )
+            media = await flight.wait()
+            DOWNLOAD_FLIGHTS.add_saved(media.get("filesize"))
+            # Follower bhi upload stage me – shutdown ise deadline tak chalne de
+            JOURNAL.update(
+                vid_key, stage=STAGE_UPLOAD,
+                media={k: v for k, v in media.items() if k != "ticket"},
+            )
+            await _send_media(client, status, user, media, mode, cache_key, token)
+
+    except (asyncio.CancelledError, JobCancelled) as e:
+        if shutdown_interrupt(e, vid_key):
+            # Bot band ho raha hai – journal + staging files resume ke liye rehne do
+            interrupted = True
+            raise
+        # User ne ⛔ Cancel dabaya – slot / reservation / files sab free
+        try:
+            await status.edit_text(CANCELLED_TEXT)
+        except Exception:
+            pass
+
+    except MediaError as e:
+        try:
+            await status.edit_text(str(e))
+        except Exception:
+            pass
+
+    except StageTimeout:
+        LOG.warning("upload stalled twice for %s", vid_key)
+        try:
+            await status.edit_text(STALL_TEXT)
+        except Exception:
+            pass
+
+    except Exception as e:
+        LOG.exception("Download error:")
+        try:
+            await status.edit_text(f"❌ Download error:\n`{e}`")
+        except Exception:
+            pass
+
+    finally:
+        CANCELS.unregister(vid_key)
+        # Last waiting chat ke baad hi shared files hatao
+        if DOWNLOAD_FLIGHTS.release(flight):
+            _cleanup_media(flight.result, keep_files=interrupted)
+        elif not leader and not flight.done and flight.refs == 1:
+            # Sirf detached leader bacha – download ka ab koi wait nahi kar raha
+            CANCELS.stop_detached(flight.owner)
+
+        if not interrupted:
+            JOURNAL.finish(vid_key)
+            # Session used – remove
+            YT_SESSIONS.pop(vid_key, None)
+
+
+async def _resume_job(client: Client, entry: dict):
+    """Journal handler: restart ke baad unfinished YouTube job dobara chalao."""
+    status, user = await revive_status(
+        client, entry, "♻️ **Bot restart hua – aapka download resume ho raha hai...**"
+    )
+    await _run_job(
+        client, status, user, entry["job_id"], entry["fmt_id"], entry["ext"], entry["mode"],
+        entry["session"], resume_media=entry.get("media"),
+    )
+
+
+JOURNAL.register("youtube", _resume_job)
+
+
+async def _fetch_media(status: Message, vid_key: str, fmt_id: str, ext: str,
+                       mode: str, url: str, video_id, clip=None) -> dict:
+    """
+    Download + thumbnail. Scheduler slot ke andar, sirf flight leader chalata hai.
+    Returns media dict jo har waiting chat ke upload me use hota hai.
+    """
+
+    markup = cancel_markup(vid_key)
+    await status.edit_text("⬇️ **Downloading...**", reply_markup=markup)
 
     os.makedirs(DOWNLOAD_DIR, exist_ok=True)
     output = os.path.join(DOWNLOAD_DIR, f"{vid_key}.%(ext)s")
@@ -180,11 +627,8 @@ async def handle_download(client: Client, cq: CallbackQuery):
             "outtmpl": output,
             "quiet": True,
             "cookiefile": "cookies.txt",
-            "postprocessors": [{
-                "key": "FFmpegExtractAudio",
-                "preferredcodec": "mp3",
-                "preferredquality": "192",
-            }],
+            "concurrent_fragment_downloads": Config.DL_CONNECTIONS,
+            # MP3 encode yaha nahi – download ke baad ffmpeg pool me
         }
     else:
         # Selected muxed video+audio format
@@ -193,24 +637,126 @@ async def handle_download(client: Client, cq: CallbackQuery):
             "outtmpl": output,
             "quiet": True,
             "cookiefile": "cookies.txt",
+            # DASH / HLS fragments parallel
+            "concurrent_fragment_downloads": Config.DL_CONNECTIONS,
         }
 
+    # Live % / speed / ETA – throttled edits
+    reporter = ProgressReporter(status, reply_markup=markup)
+    # Size guard: download ke beech limit cross hote hi abort
+    ydl_opts["progress_hooks"] = [reporter.ytdl_hook, size_guard_hook(TELEGRAM_MAX_BYTES)]
+    # ⛔ Cancel: worker thread me chal raha yt-dlp bhi ruk jaye
+    token = CANCELS.get(vid_key)
+    if token is not None:
+        ydl_opts["progress_hooks"].append(token.hook)
+    # Watchdog: bytes aana band = stall (deadline ke alawa)
+    beat = WATCHDOG.heartbeat()
+    ydl_opts["progress_hooks"].append(beat.hook)
+    ydl_opts["socket_timeout"] = Config.YTDL_SOCKET_TIMEOUT
+
     file_path = None
     thumb_path = None
+    ticket = None
 
     try:
-        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-            info = ydl.extract_info(url, download=True)
-            title = info.get("title", "YouTube Video")
-            duration = info.get("duration", 0)
-            thumb_url = info.get("thumbnail")
-            filesize = info.get("filesize") or info.get("filesize_approx")
+        # Format-listing step ka info (cache) – re-extraction skip
+        info, video_id = await _get_info(url, video_id)
+        formats = info.get("formats", [])
+
+        # >>> Preflight size gate – ek byte download hone se pehle
+        if fmt_id == "fit":
+            frac = _clip_fraction(clip, info.get("duration"))
+            best = pick_best_fit(
+                formats + dash_pairs(formats, info.get("duration")),
+                info.get("duration"),
+                TELEGRAM_MAX_BYTES / frac if frac else TELEGRAM_MAX_BYTES,
+            )
+            if best is None:
+                raise MediaError("❌ Koi bhi format Telegram limit (2GB) ke andar nahi mila.")
+            fmt_id, ext = best["format_id"], best.get("ext") or ext
+            ydl_opts["format"] = fmt_id
+
+        estimate = _estimate_job_size(formats, info.get("duration"), fmt_id, ext, mode, clip)
+        if estimate and estimate > TELEGRAM_MAX_BYTES:
+            raise FileTooLarge(estimate)
+
+        # >>> Disk reservation – jagah na ho to wait / refuse
+        disk = _estimate_disk_size(formats, info.get("duration"), fmt_id, ext, mode, clip)
+        ticket = await STORAGE.reserve(disk or Config.STORAGE_DEFAULT_RESERVE_MB * MB, tag=vid_key)
+
+        clip_parts = None
+        if clip:
+            if mode == "audio":
+                clip_parts = [best_audio(formats)]
+            else:
+                clip_parts = [find_format(formats, f) for f in fmt_id.split("+")]
+
+        if clip and clip_inputs_ok(clip_parts):
+            # >>> Clip: ffmpeg pool me remote stream pe seek – sirf range ke bytes,
+            # keyframe pe cut (stream copy). Child process = ⛔ Cancel pe turant kill
+            clip_ext = "mp4" if len(clip_parts) > 1 else (clip_parts[0].get("ext") or ext)
+            file_path = os.path.join(DOWNLOAD_DIR, f"{vid_key}.{clip_ext}")
+            await WATCHDOG.run("download", lambda: cut_clip(clip_parts, clip[0], clip[1], file_path))
+            # Poore video ka size nahi – disk wala size neeche
+            info = dict(info, filesize=None, filesize_approx=None, acodec=clip_parts[-1].get("acodec"))
+        elif clip:
+            # DASH fragment streams (seedha URL nahi) – yt-dlp range download. Yaha
+            # ffmpeg yt-dlp ke andar hai: Cancel current step khatam hone pe lagta hai
+            ydl_opts["download_ranges"] = download_range_func(None, [clip])
+            ydl_opts["force_keyframes_at_cuts"] = False
+            if "+" in fmt_id:
+                ydl_opts["merge_output_format"] = "mp4"
+            # ffmpeg range download bytes report nahi karta – sirf deadline
+            src_info = info
+            info = await WATCHDOG.run("download", lambda: ytdl_process(src_info, ydl_opts))
+        elif "+" in fmt_id:
+            # DASH pair: dono streams parallel download + ffmpeg copy merge
+            info, file_path = await _download_and_merge(status, info, fmt_id, vid_key, ydl_opts, reporter, beat)
+        else:
+            # Progressive format -> multi-connection segmented engine
+            fmt = best_audio(formats) if mode == "audio" else find_format(formats, fmt_id)
+            src_info = info
+            info = await WATCHDOG.run("download", lambda: fetch_format(src_info, fmt, ydl_opts), beat)
+        title = info.get("title", "YouTube Video")
+        duration = info.get("duration", 0)
+        if clip:
+            title = f"{title} ✂️ {clip_label(clip)}"
+            duration = clip[1] - clip[0]
+        thumb_url = info.get("thumbnail")
+        filesize = info.get("filesize") or info.get("filesize_approx")
 
         # Final file path resolution
-        if mode == "audio":
-            file_path = os.path.join(DOWNLOAD_DIR, f"{vid_key}.mp3")
-        else:
-            file_path = os.path.join(DOWNLOAD_DIR, f"{vid_key}.{ext}")
+        if not file_path:
+            file_path = downloaded_file(info, os.path.join(DOWNLOAD_DIR, f"{vid_key}.{ext}"))
+
+        # >>> Audio (original): native stream copy – m4a / ogg, no re-encode
+        if mode == "audio" and ext != "mp3":
+            target = native_audio_ext(info.get("acodec"))
+            native_path = os.path.join(DOWNLOAD_DIR, f"{vid_key}.{target}") if target else file_path
+            if native_path != file_path:
+                await reporter.finish()
+                await status.edit_text("🎛 **Preparing audio (no re-encode)...**", reply_markup=markup)
+                src, file_path = file_path, native_path
+                try:
+                    await WATCHDOG.run("postprocess", lambda: remux_audio(src, native_path))
+                finally:
+                    if os.path.exists(src):
+                        os.remove(src)
+            filesize = os.path.getsize(file_path)
+
+        # >>> MP3 encode (sirf jab user ne MP3 manga) – alag ffmpeg pool me
+        elif mode == "audio":
+            await reporter.finish()
+            await status.edit_text("🎛 **Converting to MP3...**", reply_markup=markup)
+            mp3_path = os.path.join(DOWNLOAD_DIR, f"{vid_key}.mp3")
+            if file_path != mp3_path:
+                src, file_path = file_path, mp3_path
+                try:
+                    await WATCHDOG.run("postprocess", lambda: to_mp3(src, mp3_path, MP3_KBPS))
+                finally:
+                    if os.path.exists(src):
+                        os.remove(src)
+            filesize = os.path.getsize(file_path)
 
         # If filesize missing, try local file size
         if (not filesize) and os.path.exists(file_path):
@@ -218,25 +764,14 @@ async def handle_download(client: Client, cq: CallbackQuery):
 
         # Size safety check
         if filesize and filesize > TELEGRAM_MAX_BYTES:
-            await cq.message.edit_text(
-                "❌ File size 2GB se zyada hai, Telegram limit ke bahar hai.\n"
-                "Chhota format ya chhoti video try karo."
-            )
-            if os.path.exists(file_path):
-                os.remove(file_path)
-            return
-
-        file_size_text = humanbytes(filesize) if filesize else "Unknown"
+            raise FileTooLarge(filesize)
 
         # Thumbnail download
         if thumb_url:
             try:
-                async with aiohttp.ClientSession() as s:
-                    async with s.get(thumb_url) as r:
-                        if r.status == 200:
-                            thumb_path = f"{vid_key}.jpg"
-                            async with aiofiles.open(thumb_path, "wb") as f:
-                                await f.write(await r.read())
+                thumb_path = await WATCHDOG.run(
+                    "thumbnail", lambda: _download_thumb(thumb_url, vid_key), retry=False
+                )
             except Exception as e:
                 LOG.warning("Thumbnail download failed: %s", e)
                 thumb_path = None
@@ -250,60 +785,194 @@ async def handle_download(client: Client, cq: CallbackQuery):
                 LOG.warning("fix_thumb failed: %s", e)
                 thumb_path = None
 
-        await cq.message.edit_text("📤 **Uploading...**")
+    except BaseException as e:
+        # Bot shutdown pe `.part` files rehne do – journal resume karega
+        interrupted = shutdown_interrupt(e, vid_key)
+        _cleanup_media({"file_path": file_path, "thumb_path": thumb_path, "ticket": ticket},
+                       keep_files=interrupted)
+        if not interrupted:
+            _cleanup_staging(vid_key)
+        if isinstance(e, FileTooLarge):
+            raise MediaError(SIZE_LIMIT_TEXT) from e
+        if isinstance(e, InsufficientStorage):
+            raise MediaError("❌ Server disk abhi full hai. Thodi der baad try karo.") from e
+        if isinstance(e, StageTimeout):
+            raise MediaError(STALL_TEXT) from e
+        if isinstance(e, CircuitOpen):
+            raise MediaError(THROTTLED_TEXT.format(wait=time_formatter(e.retry_after))) from e
+        raise
 
-        caption = f"**{title}**\n📦 Size: `{file_size_text}`"
+    finally:
+        await reporter.finish()
+
+    return {
+        "file_path": file_path,
+        "thumb_path": thumb_path,
+        "title": title,
+        "duration": duration,
+        "width": width,
+        "height": height,
+        "filesize": filesize,
+        "ticket": ticket,
+    }
 
+
+async def _download_thumb(thumb_url: str, vid_key: str):
+    """Thumbnail `downloads/<vid_key>.jpg` me – None agar nahi mila."""
+    # Shared connection pool (segmented downloader ka)
+    async with DOWNLOADER.session().get(thumb_url) as r:
+        if r.status != 200:
+            return None
+        thumb_path = os.path.join(DOWNLOAD_DIR, f"{vid_key}.jpg")
+        async with aiofiles.open(thumb_path, "wb") as f:
+            await f.write(await r.read())
+        return thumb_path
+
+
+async def _send_media(client: Client, status: Message, user, media: dict, mode: str, cache_key: str,
+                      token=None):
+    """Downloaded media ko status message ki chat me upload karo (file_id cache bhi update)."""
+
+    file_path = media["file_path"]
+    thumb_path = media["thumb_path"]
+    filesize = media["filesize"]
+    file_size_text = humanbytes(filesize) if filesize else "Unknown"
+
+    markup = cancel_markup(token.job_id) if token else None
+    reporter = ProgressReporter(status, reply_markup=markup)
+    await reporter.edit("📤 **Uploading...**")
+
+    caption = f"**{media['title']}**\n📦 Size: `{file_size_text}`"
+    progress = reporter.upload_progress
+    if token is not None:
+        # Upload ke beech cancel = stop_transmission (task cancel nahi)
+        token.uploading = True
+        progress = token.upload_progress(client, reporter)
+    # Watchdog: upload bytes aana band = stall
+    beat = WATCHDOG.heartbeat()
+    progress = beat.wrap_upload(progress)
+    caption = ("🎵 " if mode == "audio" else "🎬 ") + caption
+
+    def _upload():
         if mode == "audio":
-            await client.send_audio(
-                chat_id=cq.message.chat.id,
+            return client.send_audio(
+                chat_id=status.chat.id,
                 audio=file_path,
-                caption="🎵 " + caption,
-                duration=duration,
-                thumb=thumb_path if thumb_path and os.path.exists(thumb_path) else None,
-            )
-        else:
-            await client.send_video(
-                chat_id=cq.message.chat.id,
-                video=file_path,
-                caption="🎬 " + caption,
-                width=width or None,
-                height=height or None,
-                duration=duration,
+                caption=caption,
+                duration=media["duration"],
                 thumb=thumb_path if thumb_path and os.path.exists(thumb_path) else None,
-                supports_streaming=True
+                progress=progress,
             )
+        return client.send_video(
+            chat_id=status.chat.id,
+            video=file_path,
+            caption=caption,
+            width=media["width"] or None,
+            height=media["height"] or None,
+            duration=media["duration"],
+            thumb=thumb_path if thumb_path and os.path.exists(thumb_path) else None,
+            supports_streaming=True,
+            progress=progress,
+        )
 
-        await cq.message.edit_text("✅ **Successfully Uploaded!**")
+    try:
+        sent = await WATCHDOG.run("upload", _upload, beat)
+    finally:
+        await reporter.finish()
+        if token is not None:
+            token.uploading = False
 
-        # >>> Admin System: download stats update
-        try:
-            if file_path and os.path.exists(file_path) and user:
-                size_bytes = os.path.getsize(file_path)
-                add_download_stat(user.id, size_bytes)
-        except Exception:
-            pass
+    if sent is None:
+        # stop_transmission ke baad Pyrogram None deta hai
+        raise JobCancelled(token.job_id if token else "")
 
-    except Exception as e:
-        LOG.exception("Download error:")
+    FILE_IDS.put(cache_key, sent, caption, filesize)
+
+    await status.edit_text("✅ **Successfully Uploaded!**")
+
+    # >>> Admin System: download stats update
+    try:
+        if file_path and os.path.exists(file_path) and user:
+            size_bytes = os.path.getsize(file_path)
+            add_download_stat(user.id, size_bytes)
+    except Exception:
+        pass
+
+
+async def _download_and_merge(status: Message, info: dict, fmt_id: str, vid_key: str,
+                              base_opts: dict, reporter: ProgressReporter, beat=None):
+    """
+    `<video>+<audio>` format: dono streams ek saath download (alag workers),
+    phir ffmpeg pool me stream-copy merge -> `<vid_key>.mp4` (+faststart).
+    Returns (video info, merged file path).
+    """
+    video_id, audio_id = fmt_id.split("+", 1)
+    # Merged file ka size = dono parts – ek hi guard dono ke bytes jodta hai
+    guard = CombinedSizeGuard(TELEGRAM_MAX_BYTES)
+
+    def part_opts(part: str, part_fmt: str) -> dict:
+        opts = dict(base_opts)
+        opts["format"] = part_fmt
+        opts["outtmpl"] = os.path.join(DOWNLOAD_DIR, f"{vid_key}.{part}.%(ext)s")
+        # Reporter + size guard ki jagah part hooks; cancel / heartbeat hooks same
+        opts["progress_hooks"] = (
+            [reporter.part_hook(part), guard.hook(part)] + base_opts["progress_hooks"][2:]
+        )
+        return opts
+
+    formats = info.get("formats", [])
+
+    async def _both():
+        tasks = [
+            asyncio.ensure_future(fetch_format(info, find_format(formats, video_id), part_opts("v", video_id))),
+            asyncio.ensure_future(fetch_format(info, find_format(formats, audio_id), part_opts("a", audio_id))),
+        ]
         try:
-            await cq.message.edit_text(f"❌ Download error:\n`{e}`")
-        except Exception:
-            pass
+            return await asyncio.gather(*tasks)
+        except BaseException:
+            for t in tasks:
+                t.cancel()
+            raise
+
+    v_info, a_info = await WATCHDOG.run("download", _both, beat)
+
+    v_path = downloaded_file(v_info, "")
+    a_path = downloaded_file(a_info, "")
+    merged = os.path.join(DOWNLOAD_DIR, f"{vid_key}.mp4")
 
+    await reporter.finish()
+    await status.edit_text("🎛 **Merging video + audio (no re-encode)...**", reply_markup=cancel_markup(vid_key))
+    try:
+        await WATCHDOG.run("postprocess", lambda: merge_av(v_path, a_path, merged))
     finally:
-        # Cleanup
-        if file_path and os.path.exists(file_path):
-            try:
-                os.remove(file_path)
-            except Exception:
-                pass
+        for path in (v_path, a_path):
+            if path and os.path.exists(path):
+                os.remove(path)
 
-        if thumb_path and os.path.exists(thumb_path):
+    v_info["filesize"] = os.path.getsize(merged)
+    return v_info, merged
+
+
+def _cleanup_media(media, keep_files: bool = False):
+    if not media:
+        return
+    # Disk reservation wapas
+    if media.get("ticket") is not None:
+        STORAGE.release(media["ticket"])
+    if keep_files:
+        return
+    for path in (media.get("file_path"), media.get("thumb_path")):
+        if path and os.path.exists(path):
             try:
-                os.remove(thumb_path)
+                os.remove(path)
             except Exception:
                 pass
 
-        # Remove from cache
-        YT_CACHE.pop(vid_key, None)
+
+def _cleanup_staging(vid_key: str):
+    """Aborted download ke `.part` / `.ytdl` / partial files hatao."""
+    for path in glob.glob(os.path.join(DOWNLOAD_DIR, f"{glob.escape(vid_key)}.*")):
+        try:
+            os.remove(path)
+        except Exception:
+            pass
@@ -0,0 +1,75 @@
+# ============================================================
+#   Script: Blocklist check microbenchmark
+#   Developer: Tushar Davera
+#   Description:
+#       • Per-check cost vs user count – purana path (har check pe
+#         users.json ka json.load), SQLite PK lookup, in-memory set
+#       • 1/50 users blocked, random ids check hote hain
+#       • Run: python bench/blocklist_bench.py
+# ============================================================
+
+import os
+import sys
+import json
+import random
+import tempfile
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Youtube.user_store import UserStore  # noqa: E402
+from Youtube.blocklist import Blocklist  # noqa: E402
+
+USER_COUNTS = (1_000, 10_000, 100_000)
+CHECKS = 100_000
+# json.load per check bahut slow hai – kam checks, per-check average same
+JSON_CHECKS = 20
+
+
+def _users(n: int) -> dict:
+    return {
+        str(uid): {"joined_at": "2024-01-01 00:00:00", "blocked": uid % 50 == 0}
+        for uid in range(1, n + 1)
+    }
+
+
+def _per_check(func, ids) -> float:
+    it = iter(ids)
+    return timeit.timeit(lambda: func(next(it)), number=len(ids)) / len(ids)
+
+
+def run():
+    rng = random.Random(1)
+    print(f"{'users':>8}  {'json load (old)':>15}  {'sqlite PK':>10}  {'set':>8}")
+    for n in USER_COUNTS:
+        with tempfile.TemporaryDirectory() as tmp:
+            json_path = os.path.join(tmp, "users.json")
+            users = _users(n)
+            with open(json_path, "w", encoding="utf-8") as f:
+                json.dump(users, f)
+
+            def json_check(uid, path=json_path):
+                with open(path, "r", encoding="utf-8") as f:
+                    return bool(json.load(f).get(str(uid), {}).get("blocked"))
+
+            json_cost = _per_check(json_check, [rng.randint(1, n) for _ in range(JSON_CHECKS)])
+
+            # Migration users.json ko rename kar deti hai – copy se chalao
+            legacy = os.path.join(tmp, "legacy.json")
+            with open(legacy, "w", encoding="utf-8") as f:
+                json.dump(users, f)
+            store = UserStore(os.path.join(tmp, "users.db"), legacy)
+            blocklist = Blocklist(store)
+            ids = [rng.randint(1, n) for _ in range(CHECKS)]
+            sqlite_cost = _per_check(store.is_blocked, ids)
+            set_cost = _per_check(blocklist.is_blocked, ids)
+            store.close()
+
+        print(
+            f"{n:>8}  {json_cost * 1e3:>12.2f} ms  {sqlite_cost * 1e6:>7.2f} us  "
+            f"{set_cost * 1e6:>5.2f} us"
+        )
+
+
+if __name__ == "__main__":
+    run()
@@ -6,8 +6,15 @@
 #       Main entry point for the Telegram bot.
 # ============================================================
 
-from pyrogram import Client
+from pyrogram import Client, idle
 from Youtube.config import Config
+from Youtube.storage import STORAGE
+from Youtube.downloader import DOWNLOADER
+from Youtube.journal import JOURNAL
+from Youtube.fileid_cache import FILE_IDS
+from Youtube.lifecycle import LIFECYCLE
+from Youtube.throttle import attach_notifier
+from Youtube.admin_system import ADMINS
 
 # Pyrogram Client (main bot)
 app = Client(
@@ -18,6 +25,38 @@ app = Client(
     plugins=dict(root="Youtube")
 )
 
-if __name__ == "__main__":
+
+async def main():
+    # Restart se pehle ke format sessions wapas (buttons kaam karte rahein)
+    JOURNAL.load_sessions()
+
+    await app.start()
+
+    # Background janitor – downloads/ ke stale / orphan files saaf karta hai
+    STORAGE.start_janitor()
+    JOURNAL.start_flusher()
+    FILE_IDS.start_flusher()
+    # YouTube / Instagram throttling pe breaker trip -> owners ko alert
+    attach_notifier(app, ADMINS)
+
+    # Restart se pehle ke unfinished downloads / uploads resume
+    await JOURNAL.resume(app)
+
     print("🚀 Utubedownload Bot started (Developer: Tushar Davera)")
-    app.run()
+    await idle()
+
+    # Graceful shutdown (SIGTERM / deploy): drain uploads, baaki checkpoint
+    report = await LIFECYCLE.shutdown(app)
+    print(
+        f"🛑 Shutdown: {report['drained']} jobs drained, "
+        f"{report['checkpointed']} checkpointed, {report['cleaned']} staging files cleaned"
+    )
+    JOURNAL.save_sessions()
+    FILE_IDS.save()
+    await app.stop()
+    # Shared HTTP connection pool band
+    await DOWNLOADER.close()
+
+
+if __name__ == "__main__":
+    app.run(main())
@@ -0,0 +1,74 @@
+import asyncio
+import unittest
+
+from Youtube.scheduler import DownloadScheduler
+
+
+class CancelInSameTickTest(unittest.IsolatedAsyncioTestCase):
+    """Active + queued job ek hi tick me cancel (shutdown / abort_all jaisa)."""
+
+    async def test_cancel_active_and_queued_together(self):
+        sched = DownloadScheduler(1, 1)
+        hold = asyncio.Event()
+
+        async def job(user_id):
+            async with sched.slot(user_id):
+                await hold.wait()
+
+        active = asyncio.create_task(job(1))
+        await asyncio.sleep(0)
+        queued = asyncio.create_task(job(2))
+        await asyncio.sleep(0)
+        self.assertEqual((sched.active, sched.queued), (1, 1))
+
+        # Dono futures turant cancel, par cleanup agle tick me – active ka
+        # release (_dispatch) queued wale ke cleanup se pehle chalta hai
+        active.cancel()
+        queued.cancel()
+        results = await asyncio.gather(active, queued, return_exceptions=True)
+
+        for result in results:
+            self.assertIsInstance(result, asyncio.CancelledError)
+        self.assertEqual((sched.active, sched.queued), (0, 0))
+
+        # Slot leak nahi hua – agla job turant chalta hai
+        hold.set()
+        await asyncio.wait_for(job(3), timeout=1)
+        self.assertEqual(sched.active, 0)
+
+
+class TrailingNotifyTest(unittest.IsolatedAsyncioTestCase):
+
+    async def test_throttled_position_change_is_sent_later(self):
+        sched = DownloadScheduler(1, 1, notify_interval=0.1)
+        hold = asyncio.Event()
+        seen = []
+
+        async def job(user_id, on_position=None):
+            async with sched.slot(user_id, on_position=on_position):
+                await hold.wait()
+
+        async def record(pos):
+            seen.append(pos)
+
+        tasks = [asyncio.create_task(job(1)), asyncio.create_task(job(2))]
+        await asyncio.sleep(0)
+        tasks.append(asyncio.create_task(job(3, record)))
+        await asyncio.sleep(0.01)
+        self.assertEqual(seen, [2])
+
+        # Position 2 -> 1 interval ke andar – dabti hai, par baad me aani chahiye
+        tasks[1].cancel()
+        await asyncio.sleep(0.01)
+        self.assertEqual(seen, [2])
+        await asyncio.sleep(0.15)
+        self.assertEqual(seen, [2, 1])
+
+        hold.set()
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+if __name__ == "__main__":
+    unittest.main()